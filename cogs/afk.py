@@ -1,16 +1,13 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
+from core.projections import AFK as AFK_FIELDS
 from datetime import datetime, timedelta
-from config import MONGO_URL
 
 class AFK(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users
-        print("AFK Cog initialized and connected to MongoDB.")
+        self.economy = bot.economy
 
     def format_duration(self, duration: timedelta) -> str:
         days = duration.days
@@ -30,11 +27,7 @@ class AFK(commands.Cog):
         user_id = str(user.id)
         current_time = datetime.utcnow()
 
-        self.db.update_one(
-            {"_id": user_id},
-            {"$set": {"afk": {"reason": reason, "time": current_time}}},
-            upsert=True
-        )
+        await self.economy.update_user(user_id, {"$set": {"afk": {"reason": reason, "time": current_time}}})
 
         afk_message = f"You are now **AFK!**\n"
         if reason:
@@ -77,11 +70,11 @@ class AFK(commands.Cog):
             return
 
         user_id = str(message.author.id)
-        user_data = self.db.find_one({"_id": user_id})
+        user_data = await self.economy.get_user(user_id, AFK_FIELDS)
 
         if user_data and "afk" in user_data and not message.content.lower().startswith(f"{self.bot.command_prefix}afk"):
             # Remove AFK status
-            self.db.update_one({"_id": user_id}, {"$unset": {"afk": ""}})
+            await self.economy.update_user(user_id, {"$unset": {"afk": ""}}, upsert=False)
 
             try:
                 if message.guild.me.guild_permissions.manage_nicknames and message.author.top_role.position < message.guild.me.top_role.position:
@@ -107,7 +100,7 @@ class AFK(commands.Cog):
             if member.bot or member.id in afk_mentioned:
                 continue
 
-            afk_data = self.db.find_one({"_id": str(member.id)})
+            afk_data = await self.economy.get_user(member.id, AFK_FIELDS)
             if afk_data and "afk" in afk_data:
                 reason = afk_data["afk"]["reason"]
                 afk_time = afk_data["afk"]["time"]
@@ -122,9 +115,5 @@ class AFK(commands.Cog):
                 afk_mentioned.add(member.id)
                 break  # Respond only once
 
-    def cog_unload(self):
-        self.client.close()
-        print("AFK MongoDB client closed.")
-
 async def setup(bot):
     await bot.add_cog(AFK(bot))
@@ -1,17 +1,12 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
 import re
-import config
-
-cluster = MongoClient(config.MONGO_URL)
-db = cluster["bot_db"]
-collection = db["autoresponders"]
 
 class AutoResponder(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.collection = bot.db.autoresponders
 
     # Manual message command
     @commands.command(name="autorespond")
@@ -30,7 +25,7 @@ class AutoResponder(commands.Cog):
     @app_commands.command(name="remove_autoresponder", description="Remove an autoresponder keyword")
     @app_commands.describe(keyword="Trigger word to remove")
     async def remove_responder_slash(self, interaction: discord.Interaction, keyword: str):
-        result = collection.delete_one({"guild_id": interaction.guild.id, "keyword": keyword.lower()})
+        result = await self.collection.delete_one({"guild_id": interaction.guild.id, "keyword": keyword.lower()})
         if result.deleted_count > 0:
             await interaction.response.send_message(f"✅ Removed responder for `{keyword}`", ephemeral=True)
         else:
@@ -42,7 +37,7 @@ class AutoResponder(commands.Cog):
         if message.author.bot or not message.guild:
             return
 
-        data = list(collection.find({"guild_id": message.guild.id}))
+        data = await self.collection.find({"guild_id": message.guild.id}).to_list(length=None)
         content = message.content.lower()
 
         for entry in data:
@@ -51,7 +46,7 @@ class AutoResponder(commands.Cog):
                 break
 
     async def _add_responder(self, guild_id, keyword, response):
-        collection.update_one(
+        await self.collection.update_one(
             {"guild_id": guild_id, "keyword": keyword.lower()},
             {"$set": {"response": response}},
             upsert=True
@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
-from config import MONGO_URL
+import re
+from core.dmqueue import DMQueue
 
 TRIO_ID = [879936602414133288, 1275065396705362041, 1092795368556732478]
 MODLOG_CHANNEL_ID = 1364839238960549908  # Replace with your modlog channel ID
@@ -10,7 +10,12 @@ MODLOG_CHANNEL_ID = 1364839238960549908  # Replace with your modlog channel ID
 class Balance(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = MongoClient(MONGO_URL).hxhbot.users
+        self.economy = bot.economy
+        self.top_balances = bot.top_balances
+        self.dm_queue = DMQueue()
+
+    async def cog_load(self):
+        self.dm_queue.start()
 
     @commands.command(name='balance')
     async def balance_text(self, ctx):
@@ -21,11 +26,17 @@ class Balance(commands.Cog):
         await self.show_balance(interaction.user, interaction)
 
     async def show_balance(self, user, ctx_or_interaction):
-        user_data = self.db.find_one({'_id': str(user.id)})
-        balance = user_data['balance'] if user_data and 'balance' in user_data else 0
+        balance = await self.economy.get_balance(user.id)
         emoji = "<:arcadiacoin:1378656679704395796>"
         message = f"Your current balance is ₱{balance:,} {emoji}"
 
+        rank = self.top_balances.rank(user.id)
+        if rank is not None:
+            message += (
+                f"\n-# Rank #{rank:,} of {len(self.top_balances):,} "
+                f"· top {self.top_balances.percentile(user.id):.1f}%"
+            )
+
         if isinstance(ctx_or_interaction, commands.Context):
             await ctx_or_interaction.send(message)
         else:
@@ -50,12 +61,7 @@ class Balance(commands.Cog):
         if amount <= 0:
             return await interaction.response.send_message("❌ Amount must be greater than zero.", ephemeral=True)
 
-        # Update balance by member.id (string)
-        self.db.update_one(
-            {"_id": str(member.id)},
-            {"$inc": {"balance": amount}},
-            upsert=True
-        )
+        await self.economy.credit(member.id, amount)
 
         emoji = "<:arcadiacoin:1378656679704395796>"
         await interaction.response.send_message(
@@ -99,20 +105,12 @@ class Balance(commands.Cog):
         if amount <= 0:
             return await interaction.response.send_message("❌ Amount must be greater than zero.", ephemeral=True)
 
-        user_data = self.db.find_one({'_id': str(member.id)})
-        current_balance = user_data['balance'] if user_data and 'balance' in user_data else 0
-
-        if current_balance < amount:
+        if await self.economy.charge(member.id, amount) is None:
+            current_balance = await self.economy.get_balance(member.id)
             return await interaction.response.send_message(
                 f"❌ {member.mention} only has ₱{current_balance:,}. Cannot remove ₱{amount:,}.", ephemeral=True
             )
 
-        self.db.update_one(
-            {"_id": str(member.id)},
-            {"$inc": {"balance": -amount}},
-            upsert=True
-        )
-
         emoji = "<:arcadiacoin:1378656679704395796>"
         await interaction.response.send_message(
             f"✅ Removed ₱{amount:,} {emoji} from {member.mention}.\n📝 Reason: {reason}"
@@ -136,5 +134,111 @@ class Balance(commands.Cog):
             embed.set_footer(text=f"User ID: {member.id}")
             await modlog.send(embed=embed)
 
+    # --- Bulk payouts ---
+    def resolve_targets(self, guild: discord.Guild, role: discord.Role = None, members: str = None):
+        # A role's members plus any mentions or ids in `members`, without bots or repeats
+        targets = {}
+        if role is not None:
+            for member in role.members:
+                targets[member.id] = member
+        for user_id in re.findall(r"\d{15,20}", members or ""):
+            member = guild.get_member(int(user_id))
+            if member is not None:
+                targets[member.id] = member
+        return [member for member in targets.values() if not member.bot]
+
+    async def bulk_adjust(self, interaction: discord.Interaction, amount, role, members, reason, remove):
+        if interaction.user.id not in TRIO_ID:
+            return await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+
+        if amount <= 0:
+            return await interaction.response.send_message("❌ Amount must be greater than zero.", ephemeral=True)
+
+        targets = self.resolve_targets(interaction.guild, role, members)
+        if not targets:
+            return await interaction.response.send_message("❌ Pick a role or mention at least one member.", ephemeral=True)
+
+        await interaction.response.defer()
+
+        # Every balance change goes out in one bulk write
+        delta = -amount if remove else amount
+        applied = set(await self.economy.bulk_adjust({member.id: delta for member in targets}))
+        done = [member for member in targets if member.id in applied]
+        skipped = [member for member in targets if member.id not in applied]
+
+        emoji = "<:arcadiacoin:1378656679704395796>"
+        target_label = role.mention if role is not None else f"{len(targets):,} member(s)"
+        if remove:
+            summary = f"✅ Removed ₱{amount:,} {emoji} from {len(done):,} member(s) in {target_label}."
+            if skipped:
+                summary += f"\n⚠️ {len(skipped):,} member(s) could not afford it and were skipped."
+        else:
+            summary = f"✅ Gave ₱{amount:,} {emoji} to {len(done):,} member(s) in {target_label}."
+        await interaction.followup.send(f"{summary}\n📝 Reason: {reason}")
+
+        # DMs go out in the background, paced to stay under Discord's rate limits
+        for member in done:
+            if remove:
+                self.dm_queue.enqueue(member, f"⚠️ ₱{amount:,} {emoji} was removed from your balance by {interaction.user.mention}.\n📝 Reason: {reason}")
+            else:
+                self.dm_queue.enqueue(member, f"💰 You received ₱{amount:,} {emoji} from {interaction.user.mention}.\n📝 Reason: {reason}")
+
+        modlog = interaction.guild.get_channel(MODLOG_CHANNEL_ID)
+        if modlog:
+            embed = discord.Embed(
+                title="💸 Money Removed (Bulk)" if remove else "💰 Money Given (Bulk)",
+                color=discord.Color.red() if remove else discord.Color.green()
+            )
+            embed.add_field(name="Staff", value=interaction.user.mention, inline=True)
+            embed.add_field(name="Targets", value=target_label, inline=True)
+            embed.add_field(name="Amount Each", value=f"₱{amount:,} {emoji}", inline=True)
+            embed.add_field(name="Members Affected", value=f"{len(done):,}", inline=True)
+            embed.add_field(name="Total", value=f"₱{amount * len(done):,} {emoji}", inline=True)
+            if skipped:
+                names = ", ".join(member.mention for member in skipped[:20])
+                if len(skipped) > 20:
+                    names += f" and {len(skipped) - 20:,} more"
+                embed.add_field(name="Skipped (insufficient balance)", value=names, inline=False)
+            embed.add_field(name="Reason", value=reason, inline=False)
+            await modlog.send(embed=embed)
+
+    @app_commands.command(name='give-money-bulk', description='Give coins to a role or several members (Staff Only)')
+    @app_commands.describe(
+        amount='Amount of coins to give each member',
+        role='Give to every member of this role',
+        members='Mentions or user IDs of members to give to',
+        reason='Reason for giving (optional)'
+    )
+    async def give_money_bulk(
+        self,
+        interaction: discord.Interaction,
+        amount: int,
+        role: discord.Role = None,
+        members: str = None,
+        reason: str = "No reason provided"
+    ):
+        await self.bulk_adjust(interaction, amount, role, members, reason, remove=False)
+
+    @app_commands.command(name='remove-money-bulk', description='Remove coins from a role or several members (Staff Only)')
+    @app_commands.describe(
+        amount='Amount of coins to remove from each member',
+        role='Remove from every member of this role',
+        members='Mentions or user IDs of members to remove from',
+        reason='Reason for removal (optional)'
+    )
+    async def remove_money_bulk(
+        self,
+        interaction: discord.Interaction,
+        amount: int,
+        role: discord.Role = None,
+        members: str = None,
+        reason: str = "No reason provided"
+    ):
+        await self.bulk_adjust(interaction, amount, role, members, reason, remove=True)
+
+    async def cog_unload(self):
+        await self.dm_queue.stop()
+        await self.economy.flush()
+
 async def setup(bot):
     await bot.add_cog(Balance(bot))
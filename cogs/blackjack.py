@@ -1,26 +1,39 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-import random
-from pymongo import MongoClient
-from config import MONGO_URL  # Your mongo URL here
+import time
+from core.blackjack import TABLE_SEATS, BlackjackSession, BlackjackSessions, BlackjackTable
+from core.games import Outcome, blackjack_payout, hand_score
+from core.ledger import set_source
+from core.wager import Responder, WagerGame
+
+class Blackjack(WagerGame, commands.Cog):
+    game_name = "blackjack"
 
-class Blackjack(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = MongoClient(MONGO_URL).hxhbot.users
+        self.setup_wager(bot)
+        self.sessions = BlackjackSessions(bot.db.blackjack)
+        self.tables = {}  # table id -> BlackjackTable
 
-    def draw_card(self):
-        cards = [2,3,4,5,6,7,8,9,10,10,10,10,11]
-        return random.choice(cards)
+    async def cog_load(self):
+        # Games left open by the last run: resume them, or refund the ones whose message was never
+        # sent and every table seat (a table round is not resumed)
+        resumed = refunded = 0
+        for session in await self.sessions.load():
+            if session.message_id is None or session.table_id is not None:
+                await self.refund(session)
+                refunded += 1
+                continue
+            self.sessions.resume(session)
+            self.bot.add_view(BlackjackView(self, session), message_id=session.message_id)
+            resumed += 1
+        if resumed or refunded:
+            print(f"[Blackjack] Resumed {resumed} open games, refunded {refunded}.")
+        self.expire_sessions.start()
 
     def calculate_score(self, hand):
-        score = sum(hand)
-        ace_count = hand.count(11)
-        while score > 21 and ace_count:
-            score -= 10
-            ace_count -= 1
-        return score
+        return hand_score(hand)
 
     def create_embed(self, player_hand, dealer_hand, reveal_dealer=False):
         def cards_str(hand):
@@ -34,142 +47,404 @@ class Blackjack(commands.Cog):
             embed.add_field(name="Dealer's Hand", value=f"{dealer_hand[0]} ??", inline=False)
         return embed
 
-    async def get_balance(self, user_id):
-        user_data = self.db.find_one({'_id': str(user_id)})
-        return user_data['balance'] if user_data and 'balance' in user_data else 0
-
-    async def update_balance(self, user_id, amount):
-        self.db.update_one({'_id': str(user_id)}, {'$inc': {'balance': amount}}, upsert=True)
-
     @commands.command(name='blackjack')
     async def blackjack_command(self, ctx, bet: int):
-        await self.start_blackjack(ctx, ctx.author, bet)
+        async with self.user_locks.hold(ctx.author.id):
+            await self.start_blackjack(ctx, ctx.author, bet)
 
     @app_commands.command(name='blackjack', description="Play blackjack")
     @app_commands.describe(bet='Amount of coins to bet')
     async def blackjack_slash(self, interaction: discord.Interaction, bet: int):
-        await self.start_blackjack(interaction, interaction.user, bet)
-
-    async def start_blackjack(self, ctx_or_interaction, user, bet):
-        balance = await self.get_balance(user.id)
-        emoji = "<:arcadiacoin:1378656679704395796>"
+        async with self.user_locks.hold(interaction.user.id):
+            await self.start_blackjack(interaction, interaction.user, bet)
 
+    def validate(self, bet, **options):
         if bet <= 0:
-            return await self.send_message(ctx_or_interaction, "❌ Bet must be greater than zero.")
-        if bet > balance:
-            return await self.send_message(ctx_or_interaction, f"❌ You don't have enough coins. Your balance: ₱{balance:,} {emoji}")
-
-        await self.update_balance(user.id, -bet)
-
-        player_hand = [self.draw_card(), self.draw_card()]
-        dealer_hand = [self.draw_card(), self.draw_card()]
-
-        game = {
-            'player': player_hand,
-            'dealer': dealer_hand,
-            'draw': self.draw_card,
-            'score': self.calculate_score,
-            'db': self.db,
-            'bet': bet,
-            'embed_func': self.create_embed,
-        }
+            return "❌ Bet must be greater than zero."
+        return None
 
-        embed = self.create_embed(player_hand, dealer_hand, reveal_dealer=False)
-        view = BlackjackView(user, game, self.bot)
-        message = await self.send_message(ctx_or_interaction, embed=embed, view=view)
-        view.message = message
-
-    async def send_message(self, ctx_or_interaction, content=None, embed=None, view=None):
-        if isinstance(ctx_or_interaction, commands.Context):
-            return await ctx_or_interaction.send(content=content, embed=embed, view=view)
-        else:
-            await ctx_or_interaction.response.defer()
-            return await ctx_or_interaction.followup.send(content=content, embed=embed, view=view)
+    async def reject(self, responder, outcome):
+        emoji = "<:arcadiacoin:1378656679704395796>"
+        balance = await self.economy.get_balance(responder.user.id)
+        await responder.send(f"❌ You don't have enough coins. Your balance: ₱{balance:,} {emoji}")
 
-class BlackjackView(discord.ui.View):
-    def __init__(self, user, game, bot, timeout=60):
-        super().__init__(timeout=timeout)
-        self.user = user
-        self.game = game
-        self.bot = bot
-        self.message = None
-        self.responded = False
+    async def start_blackjack(self, ctx_or_interaction, user, bet):
+        responder = Responder(ctx_or_interaction)
+        error = self.validate(bet)
+        if error:
+            return await responder.send(error, ephemeral=True)
+        # Acknowledge before any database write, so a slow write cannot expire the interaction
+        await responder.defer()
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user != self.user:
-            await interaction.response.send_message("This is not your game!", ephemeral=True)
-            return False
-        return True
+        # Check and deduct the bet in one guarded write; the payout is settled when the hand ends
+        if not await self.open_wager(responder, bet):
+            return
 
-    @discord.ui.button(label="Hit", style=discord.ButtonStyle.green)
-    async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.game['player'].append(self.game['draw']())
-        player_score = self.game['score'](self.game['player'])
-        if player_score > 21:
-            await self.finish_game(interaction, bust=True)
-            self.stop()
-        else:
-            await self.update_message(interaction)
+        session_id = ctx_or_interaction.id if responder.is_slash else ctx_or_interaction.message.id
+        session = BlackjackSession.deal(session_id, user.id, bet)
+        # Checkpointed before the message is sent, so a failed send is refunded rather than lost
+        await self.sessions.save(session)
 
-    @discord.ui.button(label="Stand", style=discord.ButtonStyle.red)
-    async def stand(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.finish_game(interaction, bust=False)
-        self.stop()
-
-    async def update_message(self, interaction: discord.Interaction):
-        embed = self.game['embed_func'](self.game['player'], self.game['dealer'], reveal_dealer=False)
-        if not self.responded:
-            await interaction.response.edit_message(embed=embed, view=self)
-            self.responded = True
-        else:
-            await interaction.followup.edit_message(self.message.id, embed=embed, view=self)
+        embed = self.create_embed(session.player, session.dealer, reveal_dealer=False)
+        try:
+            message = await responder.send(embed=embed, view=BlackjackView(self, session))
+        except discord.HTTPException:
+            if self.sessions.take(session_id):
+                await self.refund(session)
+            raise
+        session.channel_id, session.message_id = message.channel.id, message.id
+        await self.sessions.save(session)
 
-    async def finish_game(self, interaction: discord.Interaction, bust: bool):
-        dealer_hand = self.game['dealer']
-        player_hand = self.game['player']
-        draw = self.game['draw']
-        score = self.game['score']
-        db = self.game['db']
-        bet = self.game['bet']
-        user_id = self.user.id
-        embed_func = self.game['embed_func']
+    async def refund(self, session):
+        set_source("blackjack.refund", session.session_id)
+        await self.economy.credit(session.user_id, session.bet)
+        await self.sessions.delete_many([session.session_id])
+        self.sessions.refunded += 1
+        print(f"[Blackjack] Refunded ₱{session.bet:,} to {session.user_id} (game {session.session_id}).")
 
-        while score(dealer_hand) < 17:
-            dealer_hand.append(draw())
+    async def finish_game(self, session_id, interaction=None, bust=False):
+        """
+        Play the dealer's hand and settle a game. ``interaction`` is the
+        deferred Hit or Stand click; without it the game timed out and stands.
+        """
+        session = self.sessions.take(session_id)
+        if session is None:
+            if interaction:
+                await Responder(interaction).send("This game is already over.", ephemeral=True)
+            return
 
-        player_score = score(player_hand)
-        dealer_score = score(dealer_hand)
+        player_score = session.player_score
+        dealer_score = session.play_dealer()
+        bet = session.bet
+        payout = blackjack_payout(bet, player_score, dealer_score)
+        await self.settle(session.user_id, Outcome(bet, payout))
+        await self.sessions.delete_many([session_id])
 
         emoji = "<:arcadiacoin:1378656679704395796>"
 
         if bust:
             result = f"💥 You busted with **{player_score}**. Dealer wins.\nYou lost ₱{bet:,} {emoji}."
-        elif dealer_score > 21 or player_score > dealer_score:
-            result = f"✅ You win! You earned ₱{bet * 2:,} {emoji}."
-            db.update_one({'_id': str(user_id)}, {'$inc': {'balance': bet * 2}}, upsert=True)
-        elif player_score == dealer_score:
+        elif payout > bet:
+            result = f"✅ You win! You earned ₱{payout:,} {emoji}."
+        elif payout == bet:
             result = f"🤝 It's a tie. You got back ₱{bet:,} {emoji}."
-            db.update_one({'_id': str(user_id)}, {'$inc': {'balance': bet}}, upsert=True)
         else:
             result = f"❌ Dealer wins with **{dealer_score}**. You lost ₱{bet:,} {emoji}."
+        if interaction is None:
+            result = f"⏰ Time's up, so you stood on **{player_score}**.\n{result}"
 
-        final_embed = embed_func(player_hand, dealer_hand, reveal_dealer=True)
+        final_embed = self.create_embed(session.player, session.dealer, reveal_dealer=True)
         final_embed.add_field(name="Result", value=result, inline=False)
 
-        if not self.responded:
-            await interaction.response.edit_message(embed=final_embed, view=None)
-            self.responded = True
+        if interaction:
+            await interaction.edit_original_response(embed=final_embed, view=None)
+            return
+        self.sessions.timed_out += 1
+        message = self.bot.get_partial_messageable(session.channel_id).get_partial_message(session.message_id)
+        try:
+            await message.edit(embed=final_embed, view=None)
+        except discord.HTTPException:
+            pass
+
+    # --- Tables: several players, one dealer hand, one message ---
+    @commands.command(name='blackjacktable')
+    async def blackjack_table_command(self, ctx, bet: int):
+        async with self.user_locks.hold(ctx.author.id):
+            await self.open_table(ctx, bet)
+
+    @app_commands.command(name='blackjack-table', description="Open a blackjack table other players can join")
+    @app_commands.describe(bet='Amount of coins every seat bets')
+    async def blackjack_table_slash(self, interaction: discord.Interaction, bet: int):
+        async with self.user_locks.hold(interaction.user.id):
+            await self.open_table(interaction, bet)
+
+    def create_table_embed(self, table, results=None):
+        """The table's shared message; ``results`` maps user ids to their result once the round is settled."""
+        embed = discord.Embed(title=f"Blackjack Table · ₱{table.bet:,} a seat", color=discord.Color.gold())
+        if not table.dealt:
+            players = "\n".join(f"• <@{user_id}>" for user_id in table.seats)
+            embed.description = (f"{players}\n\n{len(table.seats)}/{TABLE_SEATS} seats taken. Press **Join** to sit down; "
+                                 f"<@{table.host_id}> can deal now, or cards are dealt <t:{int(table.expires_at)}:R>.")
+            return embed
+
+        if results is None:
+            embed.add_field(name="Dealer's Hand", value=f"{table.dealer[0]} ??", inline=False)
         else:
-            await interaction.followup.edit_message(self.message.id, embed=final_embed, view=None)
+            embed.add_field(name="Dealer's Hand",
+                            value=f"{' '.join(str(card) for card in table.dealer)}\nTotal: {self.calculate_score(table.dealer)}",
+                            inline=False)
+        lines = []
+        for user_id, seat in table.seats.items():
+            score = seat.player_score
+            if results is not None:
+                status = results[user_id]
+            elif score > 21:
+                status = "💥 Bust"
+            elif user_id in table.done:
+                status = "✋ Stood"
+            else:
+                status = "🎲 Playing"
+            lines.append(f"<@{user_id}>: {' '.join(str(card) for card in seat.player)} (**{score}**) · {status}")
+        embed.description = "\n".join(lines)
+        if results is None:
+            embed.set_footer(text="Hit or Stand on your own hand; the dealer plays once everyone is done.")
+        else:
+            embed.set_footer(text="Round over. Payouts have been sent.")
+        return embed
+
+    async def open_table(self, ctx_or_interaction, bet):
+        responder = Responder(ctx_or_interaction)
+        error = self.validate(bet)
+        if error:
+            return await responder.send(error, ephemeral=True)
+        await responder.defer()
+        if not await self.open_wager(responder, bet):
+            return
+
+        table_id = ctx_or_interaction.id if responder.is_slash else ctx_or_interaction.message.id
+        table = BlackjackTable(table_id, responder.user.id, bet, responder.channel.id)
+        seat = table.seat(table_id, responder.user.id)
+        await self.sessions.save(seat)
+
+        # Registered before the message is sent, so a Join pressed right away finds the table
+        self.tables[table_id] = table
+        try:
+            message = await responder.send(embed=self.create_table_embed(table), view=BlackjackTableView(self, table))
+        except discord.HTTPException:
+            self.tables.pop(table_id, None)
+            for other in list(table.seats.values()):
+                if self.sessions.take(other.session_id):
+                    await self.refund(other)
+            raise
+        table.message_id = seat.message_id = message.id
+        await self.sessions.save(seat)
+
+    async def join_table(self, table, interaction):
+        user_id = interaction.user.id
+        if table.table_id not in self.tables:
+            return await interaction.response.send_message("This table is closed.", ephemeral=True)
+        if table.dealt:
+            return await interaction.response.send_message("Cards have already been dealt at this table.", ephemeral=True)
+        if user_id in table.seats:
+            return await interaction.response.send_message("You already have a seat at this table.", ephemeral=True)
+        if table.full:
+            return await interaction.response.send_message("This table is full.", ephemeral=True)
+        # Acknowledge the click before taking the bet, so a slow write cannot expire it
+        await interaction.response.defer()
+
+        async with self.user_locks.hold(user_id):
+            if not await self.open_wager(Responder(interaction), table.bet):
+                return
+            seat = BlackjackSession(interaction.id, user_id, table.bet, (), (), table_id=table.table_id)
+            if table.dealt or table.full or user_id in table.seats or table.table_id not in self.tables:
+                # The table changed while the bet was being taken
+                await self.refund(seat)
+                return await interaction.followup.send("Too late, this table is no longer taking players. "
+                                                       "Your bet was refunded.", ephemeral=True)
+            seat = table.seat(interaction.id, user_id)
+            await self.sessions.save(seat)
+
+        if table.full:
+            table.deal()
+        await interaction.edit_original_response(embed=self.create_table_embed(table))
+
+    async def play_table(self, table, interaction, hit):
+        user_id = interaction.user.id
+        if table.table_id not in self.tables:
+            return await interaction.response.send_message("This table's round is already over.", ephemeral=True)
+        seat = table.seats.get(user_id)
+        if seat is None:
+            return await interaction.response.send_message("You don't have a seat at this table.", ephemeral=True)
+        if not table.dealt:
+            return await interaction.response.send_message("Wait for the cards to be dealt.", ephemeral=True)
+        if user_id in table.done:
+            return await interaction.response.send_message("Your hand is already finished.", ephemeral=True)
 
-    async def on_timeout(self):
-        for child in self.children:
-            child.disabled = True
-        if self.message:
+        if hit:
+            table.hit(user_id)
+        else:
+            table.stand(user_id)
+        if table.finished:
+            # The payout is a database write; acknowledge the click first
+            await interaction.response.defer()
+            return await self.finish_table(table.table_id, interaction)
+        await interaction.response.edit_message(embed=self.create_table_embed(table))
+
+    async def finish_table(self, table_id, interaction=None):
+        """
+        Play the dealer's hand and settle every seat with one bulk write.
+        ``interaction`` is the deferred click that ended the round; without
+        it the table timed out, or a payout that failed is being retried.
+        """
+        table = self.tables.pop(table_id, None)
+        if table is None:
+            if interaction:
+                await interaction.followup.send("This table's round is already over.", ephemeral=True)
+            return
+        for seat in table.seats.values():
+            self.sessions.take(seat.session_id)
+
+        dealer_score = table.play_dealer()
+        set_source("blackjack.table", table_id)
+        outcomes = {
+            user_id: Outcome(table.bet, blackjack_payout(table.bet, seat.player_score, dealer_score))
+            for user_id, seat in table.seats.items()
+        }
+        unpaid = {user_id: outcome for user_id, outcome in outcomes.items() if user_id not in table.paid}
+        try:
+            failed = await self.settle_many(unpaid)
+        except Exception as e:
+            print(f"[Blackjack] Settling table {table_id} failed: {e}")
+            failed = set(unpaid)
+        paid = [user_id for user_id in unpaid if user_id not in failed]
+        table.paid.update(paid)
+        if paid:
+            await self.sessions.delete_many(table.seats[user_id].session_id for user_id in paid)
+        if failed:
+            # Put the unpaid seats back for the next sweep; until then they are refunded on a restart
+            print(f"[Blackjack] {len(failed)} seat(s) at table {table_id} were not paid, retrying.")
+            for user_id in failed:
+                self.sessions.restore(table.seats[user_id])
+            table.expires_at = time.time()
+            self.tables[table_id] = table
+            if interaction:
+                await interaction.followup.send("The round is over, but paying out failed. "
+                                                "It will be retried in a few seconds.", ephemeral=True)
+            return
+
+        results = {}
+        for user_id, outcome in outcomes.items():
+            if table.seats[user_id].player_score > 21:
+                results[user_id] = "💥 Bust"
+            elif outcome.won:
+                results[user_id] = f"✅ Won ₱{outcome.payout:,}"
+            elif outcome.payout:
+                results[user_id] = "🤝 Push"
+            else:
+                results[user_id] = f"❌ Lost ₱{table.bet:,}"
+        embed = self.create_table_embed(table, results)
+
+        if interaction:
+            await interaction.edit_original_response(embed=embed, view=None)
+            return
+        self.sessions.timed_out += len(table.seats) - len(table.done)
+        message = self.bot.get_partial_messageable(table.channel_id).get_partial_message(table.message_id)
+        try:
+            await message.edit(embed=embed, view=None)
+        except discord.HTTPException:
+            pass
+
+    # Games nobody finished are settled as a stand, including ones resumed after a restart.
+    # Tables deal when joining closes and settle when nobody has acted for a while.
+    @tasks.loop(seconds=5)
+    async def expire_sessions(self):
+        await self.sessions.retry_deletes()
+        for session_id in self.sessions.expired():
+            set_source("blackjack.timeout", session_id)
+            try:
+                await self.finish_game(session_id)
+            except Exception as e:
+                print(f"[Blackjack] Failed to settle timed-out game {session_id}: {e}")
+
+        now = time.time()
+        for table in [table for table in self.tables.values() if table.expires_at <= now]:
             try:
-                await self.message.edit(view=self)
-            except:
-                pass
+                if table.dealt:
+                    await self.finish_table(table.table_id)
+                    continue
+                table.deal()
+                message = self.bot.get_partial_messageable(table.channel_id).get_partial_message(table.message_id)
+                await message.edit(embed=self.create_table_embed(table))
+            except Exception as e:
+                print(f"[Blackjack] Failed to advance table {table.table_id}: {e}")
+
+    @expire_sessions.before_loop
+    async def before_expire_sessions(self):
+        await self.bot.wait_until_ready()
+
+    async def cog_unload(self):
+        # Open games stay in the session store and are resumed on the next load
+        self.expire_sessions.cancel()
+        await self.economy.flush()
+
+class BlackjackView(discord.ui.View):
+    """
+    Hit and Stand for one game. Persistent: the buttons' custom ids carry
+    the session id and the view never times out by itself, so it can be
+    re-registered after a restart; BlackjackSessions expires the game.
+    """
+
+    def __init__(self, cog, session):
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.session_id = session.session_id
+        self.user_id = session.user_id
+        for label, style, callback in (("Hit", discord.ButtonStyle.green, self.hit),
+                                       ("Stand", discord.ButtonStyle.red, self.stand)):
+            button = discord.ui.Button(label=label, style=style, custom_id=f"blackjack:{label.lower()}:{self.session_id}")
+            button.callback = callback
+            self.add_item(button)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("This is not your game!", ephemeral=True)
+            return False
+        set_source("blackjack", interaction.id)
+        return True
+
+    async def hit(self, interaction: discord.Interaction):
+        session = self.cog.sessions.get(self.session_id)
+        if session is None:
+            return await interaction.response.send_message("This game is already over.", ephemeral=True)
+        # Acknowledge the click before the checkpoint or payout, so a slow write cannot expire it
+        await interaction.response.defer()
+        if session.hit() > 21:
+            return await self.cog.finish_game(self.session_id, interaction, bust=True)
+
+        # Checkpoint the new card (and restart the timeout) before showing it
+        await self.cog.sessions.save(session)
+        embed = self.cog.create_embed(session.player, session.dealer, reveal_dealer=False)
+        await interaction.edit_original_response(embed=embed, view=self)
+
+    async def stand(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        await self.cog.finish_game(self.session_id, interaction)
+
+class BlackjackTableView(discord.ui.View):
+    """
+    The buttons of a table's shared message, one view for every seat. Each
+    player's clicks act on their own hand; the table is expired by the cog.
+    """
+
+    def __init__(self, cog, table):
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.table = table
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        set_source("blackjack.table", interaction.id)
+        return True
+
+    @discord.ui.button(label="Join", style=discord.ButtonStyle.blurple)
+    async def join(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cog.join_table(self.table, interaction)
+
+    @discord.ui.button(label="Deal", style=discord.ButtonStyle.gray)
+    async def deal(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.table.host_id:
+            return await interaction.response.send_message("Only the player who opened the table can deal.", ephemeral=True)
+        if self.table.dealt:
+            return await interaction.response.send_message("Cards have already been dealt.", ephemeral=True)
+        self.table.deal()
+        await interaction.response.edit_message(embed=self.cog.create_table_embed(self.table))
+
+    @discord.ui.button(label="Hit", style=discord.ButtonStyle.green)
+    async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cog.play_table(self.table, interaction, hit=True)
+
+    @discord.ui.button(label="Stand", style=discord.ButtonStyle.red)
+    async def stand(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cog.play_table(self.table, interaction, hit=False)
 
 async def setup(bot):
     await bot.add_cog(Blackjack(bot))
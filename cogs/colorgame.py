@@ -2,9 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import random
-import asyncio
-from pymongo import MongoClient
-from config import MONGO_URL  # Your MongoDB config
+from core.games import roll_colors
+from core.wager import WagerGame
 
 # Define animated emojis
 GREEN_EMOJI = "<a:greencg:1378660883089330298>"
@@ -16,60 +15,44 @@ COLORS = {
     "yellow": YELLOW_EMOJI,
     "pink": PINK_EMOJI,
 }
-ROLLABLE_COLORS = list(COLORS.keys())
 
-class ColorGame(commands.Cog):
+class ColorGame(WagerGame, commands.Cog):
+    game_name = "colorgame"
+
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users
-
-    async def play_color_game(self, ctx, user, bet_amount, chosen_colors, send_func):
-        user_id = str(user.id)
-        chosen_colors = list(dict.fromkeys([c.lower() for c in chosen_colors if c.lower() in COLORS]))
+        self.setup_wager(bot)
+        self.animator = bot.animator
 
+    def validate(self, bet_amount, chosen_colors=()):
         if not chosen_colors:
-            return await send_func("❌ Invalid color choices. Choose from: `green`, `yellow`, or `pink`.")
-
+            return "❌ Invalid color choices. Choose from: `green`, `yellow`, or `pink`."
         if bet_amount <= 0:
-            return await send_func("❌ You must bet a positive amount.")
+            return "❌ You must bet a positive amount."
+        return None
 
-        user_data = self.db.find_one({"_id": user_id})
-        current_balance = int(user_data.get("balance", 0)) if user_data else 0
-        total_bet = bet_amount * len(chosen_colors)
+    def resolve(self, bet_amount, chosen_colors):
+        return roll_colors(bet_amount, chosen_colors)
 
-        if total_bet > current_balance:
-            return await send_func(
-                f"❌ Not enough balance. You bet ₱{total_bet:,}, but you only have ₱{current_balance:,}.")
+    async def reject(self, responder, outcome):
+        current_balance = await self.economy.get_balance(responder.user.id)
+        await responder.send(
+            f"❌ Not enough balance. You bet ₱{outcome.stake:,}, but you only have ₱{current_balance:,}.")
 
-        emoji_display = [COLORS[c] for c in chosen_colors]
-        await send_func(f"{user.mention} is betting ₱{bet_amount:,} on {', '.join(emoji_display)}!\n"
-                        f"Total bet: ₱{total_bet:,}. Rolling the colors!")
+    async def present(self, responder, outcome, user_data):
+        per_color = outcome.detail["per_color"]
+        bet_amount = outcome.stake // len(per_color)
+        final_emojis = [COLORS[c] for c in outcome.detail["roll"]]
+        net_change, new_balance = outcome.net, user_data["balance"]
 
-        roll_message = await ctx.channel.send("Rolling... 🎲")
+        emoji_display = [COLORS[c] for c in per_color]
+        announcement = (f"{responder.user.mention} is betting ₱{bet_amount:,} on {', '.join(emoji_display)}!\n"
+                        f"Total bet: ₱{outcome.stake:,}. Rolling the colors!")
+
+        frames = [{"content": f"{announcement}\nRolling... 🎲"}]
         for _ in range(5):
             temp_emojis = [random.choice(list(COLORS.values())) for _ in range(3)]
-            await roll_message.edit(content=f"Rolling... {temp_emojis[0]} {temp_emojis[1]} {temp_emojis[2]}")
-            await asyncio.sleep(0.7)
-
-        final_roll = [random.choice(ROLLABLE_COLORS) for _ in range(3)]
-        final_emojis = [COLORS[c] for c in final_roll]
-
-        winnings = 0
-        result_summary = {}
-        for color in chosen_colors:
-            count = final_roll.count(color)
-            if count > 0:
-                won = bet_amount * count
-                winnings += won
-                result_summary[color] = f"Won ₱{won:,} ({count}x)"
-            else:
-                result_summary[color] = f"Lost ₱{bet_amount:,}"
-
-        net_change = winnings - total_bet
-        new_balance = current_balance + net_change
-
-        self.db.update_one({"_id": user_id}, {"$inc": {"balance": net_change}}, upsert=True)
+            frames.append({"content": f"{announcement}\nRolling... {temp_emojis[0]} {temp_emojis[1]} {temp_emojis[2]}"})
 
         embed = discord.Embed(
             title="🎲 Color Game Results! 🎲",
@@ -77,7 +60,8 @@ class ColorGame(commands.Cog):
             color=discord.Color.orange()
         )
 
-        for color, result in result_summary.items():
+        for color, won in per_color.items():
+            result = f"Won ₱{won:,} ({won // bet_amount}x)" if won else f"Lost ₱{bet_amount:,}"
             embed.add_field(name=f"{COLORS[color]} {color.capitalize()}", value=f"• {result}", inline=True)
 
         if net_change > 0:
@@ -91,8 +75,13 @@ class ColorGame(commands.Cog):
             embed.color = discord.Color.gold()
 
         embed.set_footer(text=f"Your new balance: ₱{new_balance:,}")
-        await roll_message.delete()
-        await send_func(embed=embed)
+        # The results carry the roll's pre-rendered GIF, or the rolling message turns into them
+        await self.animator.show(responder.channel.id, responder.send, self.game_name, outcome.detail["roll"],
+                                 frames, {"content": announcement, "embed": embed}, delay=0.7)
+
+    async def play_color_game(self, target, bet_amount, chosen_colors):
+        chosen_colors = list(dict.fromkeys([c.lower() for c in chosen_colors if c.lower() in COLORS]))
+        await self.play(target, bet_amount, chosen_colors=chosen_colors)
 
     # Slash command
     @app_commands.command(name="colorgame", description="Bet on colors in a perya-style game!")
@@ -115,18 +104,11 @@ class ColorGame(commands.Cog):
     )
     async def colorgame(self, interaction: discord.Interaction, bet_amount: int, color1: str,
                         color2: str = None, color3: str = None):
-        await interaction.response.defer()
         colors = [color1]
         if color2: colors.append(color2)
         if color3: colors.append(color3)
 
-        await self.play_color_game(
-            ctx=interaction,
-            user=interaction.user,
-            bet_amount=bet_amount,
-            chosen_colors=colors,
-            send_func=interaction.followup.send
-        )
+        await self.play_color_game(interaction, bet_amount, colors)
 
     # Manual (prefix) command
     @commands.command(name="colorgame")
@@ -134,17 +116,7 @@ class ColorGame(commands.Cog):
         if bet_amount is None or not colors:
             return await ctx.send("❌ Usage: `$colorgame <bet_amount> <color1> [color2] [color3]`\n"
                                   "Example: `$colorgame 100 green yellow pink`")
-        await self.play_color_game(
-            ctx=ctx,
-            user=ctx.author,
-            bet_amount=bet_amount,
-            chosen_colors=colors,
-            send_func=ctx.send
-        )
-
-    def cog_unload(self):
-        self.client.close()
-        print("ColorGame MongoDB client closed.")
+        await self.play_color_game(ctx, bet_amount, colors)
 
 async def setup(bot):
     await bot.add_cog(ColorGame(bot))
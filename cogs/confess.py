@@ -1,8 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
-from config import MONGO_URL
 
 CONFESS_CHANNEL_ID = 1364848318034739220
 CONFESSION_LOG_CHANNEL_ID = 1364839238960549908
@@ -10,12 +8,10 @@ CONFESSION_LOG_CHANNEL_ID = 1364839238960549908
 class Confess(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.mongo = MongoClient(MONGO_URL)
-        self.db = self.mongo.hxhbot.confessions
-        print("Confess Cog initialized with MongoDB.")
+        self.db = bot.db.confessions
 
     async def post_confession(self, source, message, author):
-        counter = self.db.find_one_and_update(
+        counter = await self.db.find_one_and_update(
             {"_id": "confession_count"},
             {"$inc": {"count": 1}},
             upsert=True,
@@ -75,9 +71,5 @@ class Confess(commands.Cog):
         await self.post_confession(interaction, message, interaction.user)
         await interaction.followup.send("✅ Your confession has been anonymously posted.", ephemeral=True)
 
-    def cog_unload(self):
-        self.mongo.close()
-        print("Confess MongoDB connection closed.")
-
 async def setup(bot):
     await bot.add_cog(Confess(bot))
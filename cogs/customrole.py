@@ -1,14 +1,13 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-from pymongo import MongoClient
 from datetime import datetime, timedelta
-from config import MONGO_URL, CHANNEL_ID_TO_NOTIFY
+from config import CHANNEL_ID_TO_NOTIFY
 
 class CustomRole(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = MongoClient(MONGO_URL).hxhbot.customroles
+        self.db = bot.db.customroles
         self.trio_role = {879936602414133288, 1275065396705362041, 1092795368556732478}
         self.check_expiry.start()
 
@@ -24,7 +23,7 @@ class CustomRole(commands.Cog):
         role_name = role_name.lower()
         created_at = datetime.utcnow()
 
-        self.db.update_one(
+        await self.db.update_one(
             {"_id": f"{member.id}_{role_name}"},
             {
                 "$set": {
@@ -49,12 +48,12 @@ class CustomRole(commands.Cog):
         old_role_name = old_role_name.lower()
         new_role_name = new_role_name.lower()
 
-        existing = self.db.find_one({"_id": f"{member.id}_{old_role_name}"})
+        existing = await self.db.find_one({"_id": f"{member.id}_{old_role_name}"})
         if not existing:
             return await interaction.response.send_message(f"❌ No role entry found for {member.mention} with role **{old_role_name}**.", ephemeral=True)
 
-        self.db.delete_one({"_id": f"{member.id}_{old_role_name}"})
-        self.db.insert_one({
+        await self.db.delete_one({"_id": f"{member.id}_{old_role_name}"})
+        await self.db.insert_one({
             "_id": f"{member.id}_{new_role_name}",
             "member_id": member.id,
             "member_name": str(member),
@@ -72,7 +71,7 @@ class CustomRole(commands.Cog):
             return await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
 
         role_name = role_name.lower()
-        result = self.db.delete_one({"_id": f"{member.id}_{role_name}"})
+        result = await self.db.delete_one({"_id": f"{member.id}_{role_name}"})
 
         if result.deleted_count == 0:
             return await interaction.response.send_message(f"❌ No entry found for {member.mention} with role **{role_name}**.", ephemeral=True)
@@ -81,7 +80,7 @@ class CustomRole(commands.Cog):
 
     @app_commands.command(name="role-view", description="View all custom role assignments (visible to everyone)")
     async def role_view(self, interaction: discord.Interaction):
-        results = list(self.db.find({}))
+        results = await self.db.find({}).to_list(length=None)
         if not results:
             return await interaction.response.send_message("No custom role entries found.", ephemeral=True)
 
@@ -134,7 +133,7 @@ class CustomRole(commands.Cog):
     @tasks.loop(hours=1)
     async def check_expiry(self):
         now = datetime.utcnow()
-        expired = list(self.db.find({"expires_at": {"$lte": now}}))
+        expired = await self.db.find({"expires_at": {"$lte": now}}).to_list(length=None)
 
         if not expired:
             return
@@ -149,7 +148,7 @@ class CustomRole(commands.Cog):
             await channel.send(f"⏰ Custom role **{role_name}** for **{member_name}** has expired.")
 
             # Remove expired entry
-            self.db.delete_one({"_id": entry["_id"]})
+            await self.db.delete_one({"_id": entry["_id"]})
 
     @check_expiry.before_loop
     async def before_check_expiry(self):
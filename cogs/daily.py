@@ -1,14 +1,13 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, timedelta
-from pymongo import MongoClient
-from config import MONGO_URL
+from core.schema import DAILY_COOLDOWN_SECONDS
 
 class Daily(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = MongoClient(MONGO_URL).hxhbot.users  # Make sure this points to your 'users' collection
+        self.economy = bot.economy
+        self.cooldowns = bot.cooldowns
 
     @commands.command(name='daily')
     async def daily_text(self, ctx):
@@ -19,29 +18,18 @@ class Daily(commands.Cog):
         await self.handle_daily(interaction.user, interaction)
 
     async def handle_daily(self, user, ctx_or_interaction):
-        now = datetime.utcnow()
-        user_data = self.db.find_one({'_id': str(user.id)})
-
         amount = 500
         emoji = "<:arcadiacoin:1378656679704395796>"
 
-        if user_data and 'last_claim' in user_data:
-            last_claim = user_data['last_claim']
-            next_claim_time = last_claim + timedelta(days=1)
-            if now < next_claim_time:
-                remaining = next_claim_time - now
-                hours, remainder = divmod(int(remaining.total_seconds()), 3600)
-                minutes = remainder // 60
-                message = f"❌ You've already claimed your daily. Try again in {hours}h {minutes}m."
-                return await self.send_response(ctx_or_interaction, message)
-
-        new_balance = (user_data['balance'] if user_data else 0) + amount
+        # Checked and started in memory; written to the user document in the background
+        remaining = self.cooldowns.claim(user.id, "daily", DAILY_COOLDOWN_SECONDS)
+        if remaining:
+            hours, remainder = divmod(remaining, 3600)
+            minutes = remainder // 60
+            message = f"❌ You've already claimed your daily. Try again in {hours}h {minutes}m."
+            return await self.send_response(ctx_or_interaction, message)
 
-        self.db.update_one(
-            {'_id': str(user.id)},
-            {'$set': {'last_claim': now, 'balance': new_balance}},
-            upsert=True
-        )
+        await self.economy.credit(user.id, amount)
 
         message = f"You received **__₱ {amount} {emoji}__**\n You Beggar Daily Reward Claimed!"
         await self.send_response(ctx_or_interaction, message)
@@ -55,5 +43,8 @@ class Daily(commands.Cog):
             else:
                 await ctx_or_interaction.response.send_message(message)
 
+    async def cog_unload(self):
+        await self.economy.flush()
+
 async def setup(bot):
     await bot.add_cog(Daily(bot))
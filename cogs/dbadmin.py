@@ -0,0 +1,163 @@
+import traceback
+import discord
+from discord.ext import commands
+from core.indexes import audit_indexes
+from core.wager import WAGER_METRICS
+
+class DatabaseAdmin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.economy = bot.economy
+
+    # $cachestats - user document cache and write buffer counters (bot owner only)
+    @commands.command(name="cachestats", help="Show user cache and write buffer statistics (Owner only)")
+    @commands.is_owner()
+    async def cache_stats(self, ctx):
+        cache = self.economy.cache.stats()
+        buffer = self.economy.buffer
+
+        embed = discord.Embed(title="🗄️ Database Cache", color=discord.Color.blurple())
+        embed.add_field(
+            name="User Cache",
+            value=(
+                f"Entries: {cache['size']:,} / {cache['maxsize']:,}\n"
+                f"Hits: {cache['hits']:,}\n"
+                f"Misses: {cache['misses']:,}\n"
+                f"Hit rate: {cache['hit_rate']:.1%}\n"
+                f"Evictions: {cache['evictions']:,}"
+            ),
+            inline=True
+        )
+        embed.add_field(
+            name="Write Buffer",
+            value=(
+                f"Increments buffered: {buffer.ops_buffered:,}\n"
+                f"Bulk writes: {buffer.bulk_writes:,}\n"
+                f"Documents written: {buffer.docs_written:,}\n"
+                f"Pending users: {len(buffer.pending):,}"
+            ),
+            inline=True
+        )
+        ledger = self.economy.ledger
+        if ledger is not None:
+            embed.add_field(
+                name="Ledger",
+                value=(
+                    f"Entries recorded: {ledger.entries_recorded:,}\n"
+                    f"Entries written: {ledger.entries_written:,}\n"
+                    f"Batches: {ledger.batches:,}\n"
+                    f"Pending: {len(ledger.pending):,}"
+                ),
+                inline=True
+            )
+        cooldowns = self.bot.cooldowns
+        embed.add_field(
+            name="Cooldowns",
+            value=(
+                f"Running: {len(cooldowns):,}\n"
+                f"Rejected from memory: {cooldowns.rejections:,}\n"
+                f"Expired: {cooldowns.expired:,}\n"
+                f"Bulk writes: {cooldowns.bulk_writes:,}"
+            ),
+            inline=True
+        )
+        locks = self.bot.user_locks
+        embed.add_field(
+            name="User locks",
+            value=(
+                f"Held or awaited: {len(locks):,}\n"
+                f"Acquisitions: {locks.acquisitions:,}\n"
+                f"Contended: {locks.contended:,}\n"
+                f"Avg wait: {locks.wait_seconds / max(locks.acquisitions, 1) * 1000:.1f} ms "
+                f"(max {locks.max_wait_seconds * 1000:.0f} ms)"
+            ),
+            inline=True
+        )
+        await ctx.send(embed=embed)
+
+    # $indexaudit - explain() every hot query and flag collection scans (bot owner only)
+    @commands.command(name="indexaudit", help="Explain the hot queries and report collection scans (Owner only)")
+    @commands.is_owner()
+    async def index_audit(self, ctx):
+        report = await audit_indexes(self.bot.db)
+
+        lines = []
+        for entry in report:
+            if "error" in entry:
+                lines.append(f"⚠️ **{entry['query']}** — explain failed: {entry['error']}")
+                continue
+            icon = "🔴" if entry["collscan"] else "🟢"
+            lines.append(
+                f"{icon} **{entry['query']}** — {' → '.join(entry['stages']) or 'unknown plan'}\n"
+                f"Keys examined: {entry['keys_examined']}, docs examined: {entry['docs_examined']}"
+            )
+
+        scans = sum(1 for entry in report if entry.get("collscan"))
+        embed = discord.Embed(
+            title="🔎 Index Audit",
+            description="\n\n".join(lines),
+            color=discord.Color.red() if scans else discord.Color.green()
+        )
+        embed.set_footer(text=f"{scans} collection scan(s) across {len(report)} hot queries")
+        await ctx.send(embed=embed)
+
+    # $gamestats - rounds, money flow and settle latency per wager game (bot owner only)
+    @commands.command(name="gamestats", help="Show per-game wager statistics (Owner only)")
+    @commands.is_owner()
+    async def game_stats(self, ctx):
+        embed = discord.Embed(title="🎲 Wager Games", color=discord.Color.blurple())
+        for name, metrics in sorted(WAGER_METRICS.items()):
+            embed.add_field(
+                name=name.capitalize(),
+                value=(
+                    f"Rounds: {metrics.rounds:,} ({metrics.wins:,} won)\n"
+                    f"Refused: {metrics.rejected:,}\n"
+                    f"Wagered: ₱{metrics.wagered:,}\n"
+                    f"Paid out: ₱{metrics.paid_out:,} ({metrics.return_to_player:.1%} RTP)\n"
+                    f"DB writes: {metrics.db_ops:,}, avg "
+                    f"{metrics.db_seconds / max(metrics.db_ops, 1) * 1000:.1f} ms"
+                ),
+                inline=True
+            )
+        animator = self.bot.animator
+        embed.add_field(
+            name="Animations",
+            value=(
+                f"Played: {animator.animations:,} ({animator.active} running)\n"
+                f"Single-message fallbacks: {animator.fallbacks:,}\n"
+                f"Frames shown: {animator.frames_shown:,}\n"
+                f"Frames dropped: {animator.frames_dropped:,}\n"
+                f"Pre-rendered sends: {animator.prerendered:,}"
+            ),
+            inline=False
+        )
+        blackjack = self.bot.get_cog("Blackjack")
+        if blackjack:
+            sessions = blackjack.sessions
+            embed.add_field(
+                name="Blackjack sessions",
+                value=(
+                    f"Open: {len(sessions):,} hands, {len(blackjack.tables):,} tables\n"
+                    f"Checkpoints: {sessions.checkpoints:,}\n"
+                    f"Timed out: {sessions.timed_out:,}\n"
+                    f"Resumed: {sessions.resumed:,}, refunded: {sessions.refunded:,}"
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @cache_stats.error
+    @index_audit.error
+    @game_stats.error
+    async def admin_command_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("❌ Only the bot owner can use this command.", delete_after=6)
+            return
+        # This handler replaces discord.py's default logging, so report the failure here
+        original = getattr(error, "original", error)
+        print(f"[DatabaseAdmin] ${ctx.command} failed: {original!r}")
+        traceback.print_exception(type(original), original, original.__traceback__)
+        await ctx.send(f"❌ `${ctx.command}` failed: {original}")
+
+async def setup(bot):
+    await bot.add_cog(DatabaseAdmin(bot))
@@ -0,0 +1,104 @@
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+from core.econstats import HISTOGRAM_EDGES, compute_economy_stats
+
+TRIO_ID = [879936602414133288, 1275065396705362041, 1092795368556732478]
+REFRESH_MINUTES = 15
+BAR_WIDTH = 16
+
+def bucket_label(low, high):
+    def short(value):
+        for size, suffix in ((1_000_000, "M"), (1_000, "k")):
+            if value >= size:
+                return f"{value // size:g}{suffix}"
+        return str(value)
+    if high is None:
+        return f"₱{short(low)}+"
+    if high - low == 1:
+        return f"₱{short(low)}"
+    return f"₱{short(low)}–{short(high - 1)}"
+
+class EconomyStats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.economy = bot.economy
+        self.stats = None  # last result of compute_economy_stats
+
+    async def cog_load(self):
+        self.refresh_stats.start()
+
+    # The whole collection is scanned here on a schedule, never per command
+    @tasks.loop(minutes=REFRESH_MINUTES)
+    async def refresh_stats(self):
+        try:
+            # Buffered payouts first, so the supply matches what users see
+            await self.economy.flush()
+            stats = await compute_economy_stats(self.bot.db.users)
+            stats["custom_roles_active"] = await self.bot.db.customroles.count_documents({})
+            self.stats = stats
+            print(f"[EconomyStats] Refreshed over {stats['users']:,} users in {stats['seconds']:.2f}s.")
+        except Exception as e:
+            print(f"[EconomyStats] Refresh failed: {e}")
+
+    def create_embed(self, stats):
+        embed = discord.Embed(
+            title="📊 Arcadia Economy",
+            color=discord.Color.gold(),
+            timestamp=stats["computed_at"]
+        )
+        embed.add_field(
+            name="Money Supply",
+            value=(
+                f"Total: ₱{stats['supply']:,}\n"
+                f"Users: {stats['users']:,} ({stats['broke']:,} broke)\n"
+                f"Mean: ₱{stats['mean']:,.0f} · Median: ₱{stats['median']:,.0f}\n"
+                f"P90: ₱{stats['p90']:,.0f} · P99: ₱{stats['p99']:,.0f}\n"
+                f"Richest: ₱{stats['max']:,}"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Inequality",
+            value=(
+                f"Gini: **{stats['gini']:.3f}**\n"
+                f"Top 1% hold {stats['top1_share']:.1%}\n"
+                f"Top 10% hold {stats['top10_share']:.1%}"
+            ),
+            inline=True
+        )
+        holders = stats["holders"]
+        embed.add_field(
+            name="Items",
+            value=(
+                f"🐔 Chickens: {holders['chickens'][1]:,} ({holders['chickens'][0]:,} owners)\n"
+                f"🛡️ Anti-Rob: {holders['anti_rob'][1]:,} ({holders['anti_rob'][0]:,} owners)\n"
+                f"🎨 Role tokens: {holders['custom_role_tokens'][1]:,} ({holders['custom_role_tokens'][0]:,} owners)\n"
+                f"Active custom roles: {stats['custom_roles_active']:,}"
+            ),
+            inline=True
+        )
+
+        peak = max(stats["histogram"]) or 1
+        edges = HISTOGRAM_EDGES + [None]
+        lines = []
+        for index, count in enumerate(stats["histogram"]):
+            bar = "█" * round(count / peak * BAR_WIDTH)
+            lines.append(f"{bucket_label(edges[index], edges[index + 1]):>10} {bar} {count:,}")
+        embed.add_field(name="Balance Distribution", value="```\n" + "\n".join(lines) + "\n```", inline=False)
+        embed.set_footer(text=f"Refreshed every {REFRESH_MINUTES} minutes · computed in {stats['seconds']:.2f}s")
+        return embed
+
+    @app_commands.command(name="economy-stats", description="Money supply and wealth distribution (Staff Only)")
+    async def economy_stats(self, interaction: discord.Interaction):
+        if interaction.user.id not in TRIO_ID:
+            return await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+        if self.stats is None:
+            return await interaction.response.send_message("⏳ Statistics are still being computed, try again shortly.", ephemeral=True)
+        await interaction.response.send_message(embed=self.create_embed(self.stats))
+
+    async def cog_unload(self):
+        self.refresh_stats.cancel()
+
+async def setup(bot):
+    await bot.add_cog(EconomyStats(bot))
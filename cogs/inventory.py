@@ -1,9 +1,9 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
 from datetime import datetime
-from config import MONGO_URL
+from core.projections import INVENTORY, CUSTOM_ROLE_TOKENS
+from core.schema import from_epoch, to_epoch
 
 CHICKEN_EMOJI = "<:cockfight:1378658097954033714>"
 ANTI_ROB_EMOJI = "<:lock:1378669263325495416>"
@@ -13,8 +13,7 @@ CUSTOM_ROLE_CHANNEL_ID = 1357656511974871202  # Replace with your actual channel
 class Inventory(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users
+        self.economy = bot.economy
 
     @app_commands.command(name="inventory", description="View your owned items and protection status.")
     async def inventory(self, interaction: discord.Interaction):
@@ -22,12 +21,12 @@ class Inventory(commands.Cog):
         current_time = datetime.utcnow()
         await interaction.response.defer(ephemeral=False)
 
-        user_data = self.db.find_one({"_id": user_id})
+        user_data = await self.economy.get_user(user_id, INVENTORY)
         balance = int(user_data.get("balance", 0)) if user_data else 0
         chickens_owned = int(user_data.get("chickens_owned", 0)) if user_data else 0
         anti_rob_items_owned = int(user_data.get("anti_rob_items", 0)) if user_data else 0
         custom_role_items = int(user_data.get("custom_role_items", 0)) if user_data else 0
-        anti_rob_expires_at = user_data.get("anti_rob_expires_at") if user_data else None
+        anti_rob_expires_at = from_epoch(user_data.get("cooldowns", {}).get("anti_rob")) if user_data else None
 
         # Anti-Rob status
         anti_rob_status = "Inactive"
@@ -41,9 +40,9 @@ class Inventory(commands.Cog):
             if hours: time_parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
             if minutes: time_parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
             time_str = ", ".join(time_parts) or "a few seconds"
-            anti_rob_status = f"Active! Ends in **{time_str}** (<t:{int(anti_rob_expires_at.timestamp())}:R>)"
+            anti_rob_status = f"Active! Ends in **{time_str}** (<t:{to_epoch(anti_rob_expires_at)}:R>)"
         elif anti_rob_expires_at:
-            self.db.update_one({"_id": user_id}, {"$unset": {"anti_rob_expires_at": ""}})
+            await self.economy.update_user(user_id, {"$unset": {"cooldowns.anti_rob": ""}}, upsert=False)
 
         # Create Embed
         embed = discord.Embed(
@@ -70,7 +69,7 @@ class Inventory(commands.Cog):
         item = item.lower()
 
         await interaction.response.defer(ephemeral=True)
-        user_data = self.db.find_one({"_id": user_id})
+        user_data = await self.economy.get_user(user_id, CUSTOM_ROLE_TOKENS)
         if not user_data:
             return await interaction.followup.send("❌ You don't have any items to use.")
 
@@ -79,7 +78,7 @@ class Inventory(commands.Cog):
             if custom_role_items <= 0:
                 return await interaction.followup.send("❌ You don't own any Custom Role Tokens.")
             
-            self.db.update_one({"_id": user_id}, {"$inc": {"custom_role_items": -1}})
+            await self.economy.update_user(user_id, {"$inc": {"custom_role_items": -1}}, upsert=False)
             channel = self.bot.get_channel(CUSTOM_ROLE_CHANNEL_ID)
             if channel:
                 await channel.send(
@@ -89,9 +88,5 @@ class Inventory(commands.Cog):
         else:
             await interaction.followup.send("❌ That item cannot be used or does not exist.")
 
-    def cog_unload(self):
-        self.client.close()
-        print("Inventory MongoDB client closed.")
-
 async def setup(bot):
     await bot.add_cog(Inventory(bot))
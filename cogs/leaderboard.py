@@ -1,120 +1,297 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from pymongo import MongoClient
-from config import MONGO_URL
+import time
+from datetime import datetime, timezone
+from core.members import GuildMembers
+from core.leaderboard import keyset_page
+
+PER_PAGE = 8
+SNAPSHOT_PAGES = 13  # whole pages, so keyset browsing picks up right after the last one
+SNAPSHOT_REFRESH_SECONDS = 30
+SNAPSHOT_IDLE_SECONDS = 600
+
+class LeaderboardSnapshot:
+    """One rendering of a leaderboard, shared by every view showing it until the next refresh."""
+
+    def __init__(self, pages, rows, built_at, page_count, bounds):
+        self.pages = pages  # pre-rendered page embeds
+        self.rows = rows
+        self.built_at = built_at
+        self.page_count = page_count  # can exceed len(pages) for the global board
+        self.bounds = bounds  # per page: (first, last) (balance, user id) seek keys
+        self.last_used = time.monotonic()
+
+def seek_key(user):
+    return user.get("balance", 0), user["_id"]
+
+class JumpModal(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page number", placeholder="e.g. 250", max_length=9)
+
+    def __init__(self, view):
+        super().__init__()
+        self.view = view
+
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            page = int(self.page.value.replace(",", "")) - 1
+        except ValueError:
+            return await interaction.response.send_message("❌ Enter a page number.", ephemeral=True)
+        await self.view.show(interaction, page)
+
+class LeaderboardView(discord.ui.View):
+    # Holds only a page number and the seek keys of the page on screen. The
+    # first pages come from the cog's shared snapshot; pages past it are read
+    # eight rows at a time with a keyset query.
+    def __init__(self, cog, key, author_id):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.key = key
+        self.author_id = author_id
+        self.page = 0
+        self.bounds = None
+        self.message = None
+
+    def update_buttons(self, page_count):
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page + 1 >= page_count
+        self.jump.disabled = page_count <= 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("This is not your interaction.", ephemeral=True)
+            return False
+        return True
+
+    async def show(self, interaction: discord.Interaction, page, step=0):
+        snapshot = await self.cog.get_snapshot(self.key)
+        page = min(max(page, 0), snapshot.page_count - 1)
+        if page < len(snapshot.pages):
+            embed = snapshot.pages[page]
+            self.bounds = snapshot.bounds[page]
+        else:
+            # Next/Prev seek from the page on screen; a jump seeks from the rank index
+            after = self.bounds[1] if step == 1 and self.bounds else None
+            before = self.bounds[0] if step == -1 and self.bounds else None
+            embed, self.bounds = await self.cog.render_deep_page(
+                self.cog.bot.get_guild(self.key[1]) if self.key[1] else None, page, snapshot.page_count, after, before)
+        self.page = page
+        self.update_buttons(snapshot.page_count)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.gray)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1, step=-1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.gray)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1, step=1)
+
+    @discord.ui.button(label="Jump", style=discord.ButtonStyle.gray)
+    async def jump(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(JumpModal(self))
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except Exception as e:
+                print(f"[Leaderboard] Timeout edit failed: {e}")
 
 class Leaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users
+        self.top_balances = bot.top_balances
+        self.members = GuildMembers()
+        self.snapshots = {}  # (scope, guild id) -> LeaderboardSnapshot
         self.embed_color = discord.Color.from_rgb(0, 0, 0)
         self.title = "🏆 ARCADIA LEADERBOARD 🏆"
         self.quote = "_“Fortune favors the bold. Here are the richest among us.”_"
 
-    async def fetch_top_users(self):
-        # Fetch top 100 users to allow buffer for pagination
-        return list(self.db.find({"balance": {"$exists": True}}).sort("balance", -1).limit(100))
+    async def fetch_top_users(self, guild: discord.Guild = None):
+        # The first pages' worth of users, served from memory.
+        # With a guild, only its members are ranked.
+        count = SNAPSHOT_PAGES * PER_PAGE
+        if guild is None:
+            return self.top_balances.top(count)
+        member_ids = self.members.get(guild.id)
+        if member_ids is None:
+            self.members.load(guild)
+            member_ids = self.members.get(guild.id)
+        return self.top_balances.page_within(member_ids, 0, count)
 
-    def generate_embed(self, guild: discord.Guild, users, page: int, per_page=8):
-        start = page * per_page
-        end = start + per_page
-        selected_users = users[start:end]
+    async def cog_load(self):
+        self.refresh_snapshots.start()
+        if self.bot.is_ready():
+            for guild in self.bot.guilds:
+                self.members.load(guild)
 
-        embed = discord.Embed(
-            title=self.title,
-            description=self.quote + "\n\n",
-            color=self.embed_color
-        )
+    # --- Member id sets for guild-scoped leaderboards ---
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            self.members.load(guild)
 
-        if not selected_users:
-            embed.description += "No users found on this page."
-            return embed
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        if not guild.chunked:
+            await guild.chunk()
+        self.members.load(guild)
 
-        for idx, user in enumerate(selected_users, start=start + 1):
-            try:
-                user_id = int(user["_id"])
-                member = guild.get_member(user_id)
-                name = member.display_name if member else f"<@{user_id}>"
-                balance = user.get("balance", 0)
-                embed.description += f"**{idx}.** {name} — ₱{balance:,}\n\n"
-            except Exception as e:
-                print(f"[Leaderboard] Skipped user #{idx} — Error: {e}")
-                continue
-
-        embed.set_footer(text=f"Page {page + 1} / {((len(users) - 1) // per_page) + 1}")
-        return embed
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.members.forget(guild.id)
+        for key in [key for key in self.snapshots if key[1] == guild.id]:
+            del self.snapshots[key]
 
-    async def show_leaderboard(self, target, guild, users, author_id):
-        class LeaderboardView(discord.ui.View):
-            def __init__(self):
-                super().__init__(timeout=60)
-                self.page = 0
-                self.message = None
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.members.add(member.guild.id, member.id)
 
-            async def on_timeout(self):
-                for item in self.children:
-                    item.disabled = True
-                if self.message:
-                    try:
-                        await self.message.edit(view=self)
-                    except Exception as e:
-                        print(f"[Leaderboard] Timeout edit failed: {e}")
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.members.discard(member.guild.id, member.id)
 
-        view = LeaderboardView()
+    # --- Shared page snapshots ---
+    def render_page(self, guild: discord.Guild, users, page, page_count, built_at):
+        lines = []
+        for idx, user in enumerate(users, start=page * PER_PAGE + 1):
+            user_id = int(user["_id"])
+            member = guild.get_member(user_id) if guild else None
+            name = member.display_name if member else f"<@{user_id}>"
+            lines.append(f"**{idx:,}.** {name} — ₱{user.get('balance', 0):,}")
 
-        prev_button = discord.ui.Button(label="◀ Prev", style=discord.ButtonStyle.gray, custom_id="prev")
-        next_button = discord.ui.Button(label="Next ▶", style=discord.ButtonStyle.gray, custom_id="next")
+        embed = discord.Embed(
+            title=self.title,
+            description=self.quote + "\n\n" + ("\n\n".join(lines) or "No users found on this page."),
+            color=self.embed_color,
+            timestamp=built_at
+        )
+        embed.set_footer(text=f"Page {page + 1:,} / {page_count:,}")
+        return embed
 
-        prev_button.disabled = True
-        if len(users) <= 8:
-            next_button.disabled = True
+    def count_pages(self, rows):
+        return max((rows - 1) // PER_PAGE + 1, 1)
 
-        async def button_callback(interaction: discord.Interaction):
-            if interaction.user.id != author_id:
-                return await interaction.response.send_message("This is not your interaction.", ephemeral=True)
+    async def render_deep_page(self, guild: discord.Guild, page, page_count, after=None, before=None):
+        """
+        Embed and seek keys for a global page past the snapshot. Reads only
+        that page's eight rows from ``hxhbot.users``: seeking from the
+        neighbouring page when flipping, or from the rank index's key for
+        the page's first row when jumping.
+        """
+        users = self.bot.db.users
+        rows = []
+        if after is not None or before is not None:
+            rows = await keyset_page(users, after=after, before=before, limit=PER_PAGE)
+        if not rows:
+            at = self.top_balances.key_at(page * PER_PAGE)
+            if at is not None:
+                rows = await keyset_page(users, at=at, limit=PER_PAGE)
+        bounds = (seek_key(rows[0]), seek_key(rows[-1])) if rows else None
+        return self.render_page(guild, rows, page, page_count, datetime.now(timezone.utc)), bounds
 
-            if interaction.data["custom_id"] == "prev":
-                if view.page > 0:
-                    view.page -= 1
-            elif interaction.data["custom_id"] == "next":
-                if (view.page + 1) * 8 < len(users):
-                    view.page += 1
+    async def build_snapshot(self, key):
+        scope, guild_id = key
+        guild = self.bot.get_guild(guild_id) if guild_id else None
+        users = await self.fetch_top_users(guild if scope == "server" else None)
+        built_at = datetime.now(timezone.utc)
 
-            new_embed = self.generate_embed(guild, users, view.page)
-            prev_button.disabled = (view.page == 0)
-            next_button.disabled = (view.page + 1) * 8 >= len(users)
+        page_count = self.count_pages(len(users))
+        if scope == "global":
+            # The global board browses on past the snapshot with keyset pages
+            page_count = max(page_count, self.count_pages(len(self.top_balances)))
+        pages, bounds = [], []
+        for page in range(self.count_pages(len(users))):
+            rows = users[page * PER_PAGE:(page + 1) * PER_PAGE]
+            pages.append(self.render_page(guild, rows, page, page_count, built_at))
+            bounds.append((seek_key(rows[0]), seek_key(rows[-1])) if rows else None)
+        snapshot = LeaderboardSnapshot(pages, len(users), built_at, page_count, bounds)
+        self.snapshots[key] = snapshot
+        return snapshot
 
-            await interaction.response.edit_message(embed=new_embed, view=view)
+    async def get_snapshot(self, key):
+        snapshot = self.snapshots.get(key) or await self.build_snapshot(key)
+        snapshot.last_used = time.monotonic()
+        return snapshot
 
-        prev_button.callback = button_callback
-        next_button.callback = button_callback
+    @tasks.loop(seconds=SNAPSHOT_REFRESH_SECONDS)
+    async def refresh_snapshots(self):
+        now = time.monotonic()
+        for key, snapshot in list(self.snapshots.items()):
+            if now - snapshot.last_used > SNAPSHOT_IDLE_SECONDS:
+                # Nobody has opened this leaderboard for a while; build it again on demand
+                del self.snapshots[key]
+                continue
+            try:
+                last_used = snapshot.last_used
+                (await self.build_snapshot(key)).last_used = last_used
+            except Exception as e:
+                print(f"[Leaderboard] Snapshot refresh failed for {key}: {e}")
 
-        view.add_item(prev_button)
-        view.add_item(next_button)
+    async def show_leaderboard(self, target, scope, guild, author_id):
+        key = (scope, guild.id if guild else None)
+        snapshot = await self.get_snapshot(key)
+        if not snapshot.rows:
+            return await target.send("❌ There are no rich people yet!")
 
-        embed = self.generate_embed(guild, users, view.page)
-        view.message = await target.send(embed=embed, view=view)
+        view = LeaderboardView(self, key, author_id)
+        view.bounds = snapshot.bounds[0]
+        view.update_buttons(snapshot.page_count)
+        view.message = await target.send(embed=snapshot.pages[0], view=view)
 
     @app_commands.command(name="leaderboard", description="View the top richest members")
-    async def leaderboard_slash(self, interaction: discord.Interaction):
+    @app_commands.describe(scope="Rank this server's members only, or everyone the bot knows")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="This server", value="server"),
+        app_commands.Choice(name="Global", value="global"),
+    ])
+    async def leaderboard_slash(self, interaction: discord.Interaction, scope: str = "server"):
         await interaction.response.defer()
-        users = await self.fetch_top_users()
-        if not users:
-            return await interaction.followup.send("❌ There are no rich people yet!")
-        await self.show_leaderboard(interaction.followup, interaction.guild, users, interaction.user.id)
+        await self.show_leaderboard(interaction.followup, scope, interaction.guild, interaction.user.id)
 
     @commands.command(name="leaderboard")
-    async def leaderboard_prefix(self, ctx):
-        users = await self.fetch_top_users()
-        if not users:
-            return await ctx.send("❌ There are no rich people yet!")
-        await self.show_leaderboard(ctx, ctx.guild, users, ctx.author.id)
-
-    def cog_unload(self):
-        self.client.close()
-        print("Leaderboard MongoDB client closed.")
+    async def leaderboard_prefix(self, ctx, scope: str = "server"):
+        # $leaderboard ranks this server's members; $leaderboard global ranks everyone
+        scope = "global" if scope.lower() == "global" else "server"
+        await self.show_leaderboard(ctx, scope, ctx.guild, ctx.author.id)
+
+    def generate_rank_embed(self, guild: discord.Guild, member: discord.abc.User):
+        around = self.top_balances.around(member.id, radius=2)
+        if around is None:
+            return None
+
+        rank = self.top_balances.rank(member.id)
+        first_rank, rows = around
+        embed = discord.Embed(
+            title=f"🏅 {member.display_name}'s Rank",
+            description=(
+                f"**#{rank:,}** of {len(self.top_balances):,} — "
+                f"top {self.top_balances.percentile(member.id):.1f}%\n\n"
+            ),
+            color=self.embed_color
+        )
+        for idx, user in enumerate(rows, start=first_rank):
+            user_id = int(user["_id"])
+            found = guild.get_member(user_id) if guild else None
+            name = found.display_name if found else f"<@{user_id}>"
+            line = f"**{idx}.** {name} — ₱{user['balance']:,}"
+            embed.description += (f"__{line}__" if user_id == member.id else line) + "\n"
+        return embed
+
+    @app_commands.command(name="rank", description="See where you (or another member) stand in the economy")
+    @app_commands.describe(member="The member to look up (defaults to you)")
+    async def rank_slash(self, interaction: discord.Interaction, member: discord.Member = None):
+        member = member or interaction.user
+        embed = self.generate_rank_embed(interaction.guild, member)
+        if embed is None:
+            return await interaction.response.send_message(f"❌ {member.display_name} has no coins yet!", ephemeral=True)
+        await interaction.response.send_message(embed=embed)
+
+    async def cog_unload(self):
+        self.refresh_snapshots.cancel()
 
 async def setup(bot):
     await bot.add_cog(Leaderboard(bot))
@@ -3,9 +3,9 @@ from discord.ext import commands
 from discord import app_commands
 import random
 import asyncio
-from pymongo import MongoClient
 from datetime import datetime, timedelta # Ensure datetime and timedelta are imported
-from config import MONGO_URL # Assuming config.py is in the same directory
+from core.projections import ROB_TARGET
+from core.schema import from_epoch, to_epoch
 
 # Configuration for rob amounts and cooldown
 ROB_COOLDOWN_HOURS = 24 # 1 day cooldown
@@ -29,14 +29,14 @@ ROB_TIERS = {
 class Rob(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users # Connect to the 'users' collection
+        self.economy = bot.economy
+        self.cooldowns = bot.cooldowns
 
     @app_commands.command(name="rob", description="Attempt to rob another member!")
     @app_commands.describe(target_member="The member you want to rob.")
     async def rob(self, interaction: discord.Interaction, target_member: discord.Member):
-        robber_id = str(interaction.user.id)
-        target_id = str(target_member.id)
+        robber_id = interaction.user.id
+        target_id = target_member.id
         current_time = datetime.utcnow() # Use UTC time for consistency
 
         # Defer the response as we'll be interacting with the database and potentially waiting.
@@ -49,12 +49,8 @@ class Rob(commands.Cog):
         if target_member.bot:
             return await interaction.followup.send("❌ You cannot rob a bot!", ephemeral=True)
 
-        # --- Fetch Robber's Data ---
-        robber_data = self.db.find_one({"_id": robber_id})
-        robber_balance = int(robber_data.get("balance", 0)) if robber_data else 0
-        rob_cooldown_until = robber_data.get("rob_cooldown") if robber_data else None
-
-        # --- Check Cooldown for Robber ---
+        # --- Check Cooldown for Robber (answered from memory) ---
+        rob_cooldown_until = from_epoch(self.cooldowns.ends_at(robber_id, "rob"))
         if rob_cooldown_until and current_time < rob_cooldown_until:
             remaining_time = rob_cooldown_until - current_time
             # Format cooldown message (days, hours, minutes)
@@ -79,11 +75,11 @@ class Rob(commands.Cog):
             )
 
         # --- Fetch Target's Data ---
-        target_data = self.db.find_one({"_id": target_id})
+        target_data = await self.economy.get_user(target_id, ROB_TARGET)
         target_balance = int(target_data.get("balance", 0)) if target_data else 0
 
         # --- NEW ADDITION: Check if target has active Anti-Rob protection ---
-        target_anti_rob_expires_at = target_data.get("anti_rob_expires_at") if target_data else None
+        target_anti_rob_expires_at = from_epoch(target_data.get("cooldowns", {}).get("anti_rob")) if target_data else None
         if target_anti_rob_expires_at and current_time < target_anti_rob_expires_at:
             remaining_protection_time = target_anti_rob_expires_at - current_time
             hours, remainder = divmod(remaining_protection_time.seconds, 3600)
@@ -138,22 +134,32 @@ class Rob(commands.Cog):
              return await interaction.followup.send(f"❌ {target_member.display_name} is too poor to rob any meaningful amount!", ephemeral=True)
 
         # --- Perform the Robbery ---
-        # Update robber's balance and set cooldown
-        self.db.update_one(
-            {"_id": robber_id},
-            {"$inc": {"balance": rob_amount}, "$set": {"rob_cooldown": current_time + timedelta(hours=ROB_COOLDOWN_HOURS)}},
-            upsert=True
+        # Debit the target and credit the robber in one transfer. The shield and
+        # cooldown checks above are repeated as guards so a shield activated or a
+        # second rob started in the meantime cannot slip through.
+        now_epoch = to_epoch(current_time)
+        cooldown_ends_at = to_epoch(current_time + timedelta(hours=ROB_COOLDOWN_HOURS))
+        result = await self.economy.transfer(
+            target_id,
+            robber_id,
+            rob_amount,
+            extra_updates={"$set": {"cooldowns.rob": cooldown_ends_at}},
+            require={"$or": [{"cooldowns.anti_rob": {"$exists": False}}, {"cooldowns.anti_rob": {"$lte": now_epoch}}]},
+            recipient_require={"$or": [{"cooldowns.rob": {"$exists": False}}, {"cooldowns.rob": {"$lte": now_epoch}}]}
         )
+        if result is None:
+            return await interaction.followup.send(
+                f"❌ The robbery fell through! {target_member.display_name}'s wallet or shield changed, "
+                f"or you are already on cooldown. Try again.",
+                ephemeral=True
+            )
 
-        # Update target's balance
-        self.db.update_one(
-            {"_id": target_id},
-            {"$inc": {"balance": -rob_amount}},
-            upsert=True # In case target has no document yet
-        )
+        # The transfer already wrote the cooldown; only the in-memory copy needs it
+        self.cooldowns.set(robber_id, "rob", cooldown_ends_at, persist=False)
 
-        new_robber_balance = robber_balance + rob_amount
-        new_target_balance = target_balance - rob_amount
+        target_data, robber_data = result
+        new_robber_balance = int(robber_data.get("balance", 0))
+        new_target_balance = int(target_data.get("balance", 0))
 
         await interaction.followup.send(
             f"{ROB_EMOJI} You successfully robbed ₱{rob_amount:,} from {target_member.mention}!\n"
@@ -162,9 +168,5 @@ class Rob(commands.Cog):
             f"You are now on cooldown for {ROB_COOLDOWN_HOURS} hours."
         )
 
-    def cog_unload(self):
-        self.client.close()
-        print("Rob MongoDB client closed.")
-
 async def setup(bot):
     await bot.add_cog(Rob(bot))
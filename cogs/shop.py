@@ -1,8 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
-from config import MONGO_URL
 
 # Define item emojis and costs
 CHICKEN_EMOJI = "<:cockfight:1378658097954033714>"
@@ -30,8 +28,7 @@ STAFF_CHANNEL_ID = 1357656511974871202
 class Shop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users
+        self.economy = bot.economy
 
     @app_commands.command(name="shop", description="View items available for purchase.")
     async def shop(self, interaction: discord.Interaction):
@@ -67,61 +64,48 @@ class Shop(commands.Cog):
 
         await interaction.response.defer(ephemeral=False)
 
-        user_data = self.db.find_one({"_id": user_id}) or {}
-        current_balance = int(user_data.get("balance", 0))
-
         if amount <= 0:
             return await interaction.followup.send("❌ You need to buy at least 1 item.", ephemeral=True)
 
         # Chicken purchase
         if item == "chicken":
             total_cost = CHICKEN_COST * amount
-            if current_balance < total_cost:
+            user_data = await self.economy.charge(user_id, total_cost, inc={"chickens_owned": amount})
+            if user_data is None:
+                current_balance = await self.economy.get_balance(user_id)
                 return await interaction.followup.send(
                     f"❌ You don't have enough money! You need ₱{total_cost:,} but only have ₱{current_balance:,}.",
                     ephemeral=True
                 )
-            self.db.update_one(
-                {"_id": user_id},
-                {"$inc": {"balance": -total_cost, "chickens_owned": amount}},
-                upsert=True
-            )
             return await interaction.followup.send(
                 f"✅ You bought {amount} {CHICKEN_EMOJI} **Chicken(s)** for ₱{total_cost:,}!\n"
-                f"New balance: ₱{current_balance - total_cost:,}."
+                f"New balance: ₱{user_data['balance']:,}."
             )
 
         # Anti-rob purchase
         elif item == "anti rob":
             total_cost = ANTI_ROB_COST * amount
-            if current_balance < total_cost:
+            user_data = await self.economy.charge(user_id, total_cost, inc={"anti_rob_items": amount})
+            if user_data is None:
+                current_balance = await self.economy.get_balance(user_id)
                 return await interaction.followup.send(
                     f"❌ You need ₱{total_cost:,} but only have ₱{current_balance:,}.",
                     ephemeral=True
                 )
-            self.db.update_one(
-                {"_id": user_id},
-                {"$inc": {"balance": -total_cost, "anti_rob_items": amount}},
-                upsert=True
-            )
             return await interaction.followup.send(
                 f"✅ You bought {amount} {ANTI_ROB_EMOJI} **Anti-Rob Shield(s)** for ₱{total_cost:,}!\n"
-                f"New balance: ₱{current_balance - total_cost:,}."
+                f"New balance: ₱{user_data['balance']:,}."
             )
 
         # Custom role purchase
         elif item == "custom role":
             total_cost = CUSTOM_ROLE_COST * amount
-            if current_balance < total_cost:
+            if await self.economy.charge(user_id, total_cost, inc={"custom_roles": amount}) is None:
+                current_balance = await self.economy.get_balance(user_id)
                 return await interaction.followup.send(
                     f"❌ You need ₱{total_cost:,} but only have ₱{current_balance:,}.",
                     ephemeral=True
                 )
-            self.db.update_one(
-                {"_id": user_id},
-                {"$inc": {"balance": -total_cost, "custom_roles": amount}},
-                upsert=True
-            )
             await interaction.followup.send(
                 f"🎨 You bought {amount} {CUSTOM_ROLE_EMOJI} **Custom Role(s)** for ₱{total_cost:,}!\n"
                 f"Staff will reach out to you soon."
@@ -136,16 +120,12 @@ class Shop(commands.Cog):
         # Role shop purchase
         elif item in ROLE_ITEMS:
             total_cost = ROLE_COST * amount
-            if current_balance < total_cost:
+            if await self.economy.charge(user_id, total_cost) is None:
+                current_balance = await self.economy.get_balance(user_id)
                 return await interaction.followup.send(
                     f"❌ You need ₱{total_cost:,} but only have ₱{current_balance:,}.",
                     ephemeral=True
                 )
-            self.db.update_one(
-                {"_id": user_id},
-                {"$inc": {"balance": -total_cost}},
-                upsert=True
-            )
             await interaction.followup.send(
                 f"🎭 You bought {amount} {ROLE_ITEMS[item]} **{item.title()}** role(s) for ₱{total_cost:,}.\n"
                 f"Staff will assign it to you shortly!"
@@ -165,9 +145,5 @@ class Shop(commands.Cog):
                 ephemeral=True
             )
 
-    def cog_unload(self):
-        self.client.close()
-        print("Shop MongoDB client closed.")
-
 async def setup(bot):
     await bot.add_cog(Shop(bot))
@@ -1,54 +1,29 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
-import random
-from pymongo import MongoClient
-from config import MONGO_URL
+from core.games import spin_slots
+from core.wager import WagerGame
+
+class Slots(WagerGame, commands.Cog):
+    game_name = "slots"
 
-class Slots(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = MongoClient(MONGO_URL).hxhbot.users
+        self.setup_wager(bot)
+        self.animator = bot.animator
         self.emoji = "<:arcadiacoin:1378656679704395796>"
-        self.symbols = ["🍒", "🍋", "💎", "🍀", "7️⃣"]
-        self.payouts = {
-            "🍒": 2,
-            "🍋": 2,
-            "💎": 5,
-            "🍀": 3,
-            "7️⃣": 10,
-        }
-
-    async def spin_slots(self, user, amount):
-        user_data = self.db.find_one({'_id': str(user.id)})
-        balance = user_data['balance'] if user_data and 'balance' in user_data else 0
 
+    def validate(self, amount):
         if amount <= 0:
-            return None, "❌ Bet must be more than 0."
-        if balance < amount:
-            return None, f"❌ Not enough coins! Your balance is ₱{balance:,} {self.emoji}"
-
-        # Deduct bet
-        self.db.update_one({'_id': str(user.id)}, {'$inc': {'balance': -amount}}, upsert=True)
+            return "❌ Bet must be more than 0."
+        return None
 
-        # Spin results
-        result = [random.choice(self.symbols) for _ in range(3)]
+    def resolve(self, amount):
+        return spin_slots(amount)
 
-        # Determine win
-        if result.count(result[0]) == 3:
-            win_symbol = result[0]
-            winnings = amount * self.payouts.get(win_symbol, 2)
-            self.db.update_one({'_id': str(user.id)}, {'$inc': {'balance': winnings}}, upsert=True)
-            message = f"🎉 **Jackpot!** You won ₱{winnings:,} {self.emoji}"
-        elif result.count(result[0]) == 2 or result.count(result[1]) == 2:
-            winnings = int(amount * 1.5)
-            self.db.update_one({'_id': str(user.id)}, {'$inc': {'balance': winnings}}, upsert=True)
-            message = f"✨ You got a pair! You won ₱{winnings:,} {self.emoji}"
-        else:
-            message = f"💔 You lost ₱{amount:,} {self.emoji}"
-
-        return result, message
+    async def reject(self, responder, outcome):
+        balance = await self.economy.get_balance(responder.user.id)
+        await responder.send(f"❌ Not enough coins! Your balance is ₱{balance:,} {self.emoji}", ephemeral=True)
 
     def animated_display(self, result):
         stages = [
@@ -59,39 +34,36 @@ class Slots(commands.Cog):
         ]
         return stages
 
+    async def present(self, responder, outcome, user_data):
+        if outcome.detail["kind"] == "jackpot":
+            message = f"🎉 **Jackpot!** You won ₱{outcome.payout:,} {self.emoji}"
+        elif outcome.detail["kind"] == "pair":
+            message = f"✨ You got a pair! You won ₱{outcome.payout:,} {self.emoji}"
+        else:
+            message = f"💔 You lost ₱{outcome.stake:,} {self.emoji}"
+
+        # A pre-rendered GIF when there is one; otherwise edits, dropped when the channel is busy
+        stages = self.animated_display(outcome.detail["reels"])
+        await self.animator.show(
+            responder.channel.id,
+            responder.send,
+            self.game_name,
+            outcome.detail["reels"],
+            [{"content": "🎰 Rolling...\n" + stage} for stage in stages],
+            {"content": f"🎰 Final Result:\n{stages[-1]}\n\n{message}"},
+            delay=0.5
+        )
+
     # $slot command
     @commands.command(name="slot")
     async def slot_text(self, ctx, amount: int):
-        result, outcome = await self.spin_slots(ctx.author, amount)
-        if result is None:
-            return await ctx.send(outcome)
-
-        stages = self.animated_display(result)
-        msg = await ctx.send("🎰 Rolling...\n" + stages[0])
-        for stage in stages[1:]:
-            await asyncio.sleep(0.5)
-            await msg.edit(content="🎰 Rolling...\n" + stage)
-
-        await asyncio.sleep(0.5)
-        await msg.edit(content=f"🎰 Final Result:\n{stages[-1]}\n\n{outcome}")
+        await self.play(ctx, amount)
 
     # /slots command
     @app_commands.command(name="slots", description="Spin the slot machine and win coins!")
     @app_commands.describe(amount="The amount you want to bet")
     async def slot_slash(self, interaction: discord.Interaction, amount: int):
-        await interaction.response.defer()
-        result, outcome = await self.spin_slots(interaction.user, amount)
-        if result is None:
-            return await interaction.followup.send(outcome, ephemeral=True)
-
-        stages = self.animated_display(result)
-        msg = await interaction.followup.send("🎰 Rolling...\n" + stages[0])
-        for stage in stages[1:]:
-            await asyncio.sleep(0.5)
-            await msg.edit(content="🎰 Rolling...\n" + stage)
-
-        await asyncio.sleep(0.5)
-        await msg.edit(content=f"🎰 Final Result:\n{stages[-1]}\n\n{outcome}")
+        await self.play(interaction, amount)
 
 async def setup(bot):
     await bot.add_cog(Slots(bot))
@@ -1,15 +1,11 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import motor.motor_asyncio
-from config import MONGO_URL
 
 class StickyCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URL)
-        self.db = self.client["sticky_db"]
-        self.collection = self.db["stickies"]
+        self.collection = bot.db.stickies
 
     # Fetch sticky data
     async def get_sticky(self, channel_id: int):
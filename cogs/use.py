@@ -2,9 +2,9 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import random
-from pymongo import MongoClient
 from datetime import datetime, timedelta
-from config import MONGO_URL # Assuming config.py is in the same directory
+from core.projections import USE_ITEM
+from core.schema import from_epoch, to_epoch
 
 # Re-use Anti-Rob emoji from shop.py for consistency
 ANTI_ROB_EMOJI = "<:antirob:1376801124656349214>"
@@ -12,8 +12,8 @@ ANTI_ROB_EMOJI = "<:antirob:1376801124656349214>"
 class Use(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = MongoClient(MONGO_URL)
-        self.db = self.client.hxhbot.users # Connect to the 'users' collection
+        self.economy = bot.economy
+        self.cooldowns = bot.cooldowns
 
     @app_commands.command(name="use", description="Use an item from your inventory.")
     @app_commands.describe(item="The item you wish to use.")
@@ -30,13 +30,13 @@ class Use(commands.Cog):
         # Defer the response immediately
         await interaction.response.defer(ephemeral=False)
 
-        user_data = self.db.find_one({"_id": user_id})
+        user_data = await self.economy.get_user(user_id, USE_ITEM)
         
         # Initialize item counts for safety
         anti_rob_items_owned = int(user_data.get("anti_rob_items", 0)) if user_data else 0
         
         # Get existing anti-rob expiry time if any
-        anti_rob_expires_at = user_data.get("anti_rob_expires_at") if user_data else None
+        anti_rob_expires_at = from_epoch(user_data.get("cooldowns", {}).get("anti_rob")) if user_data else None
 
         if item == "anti-rob":
             # --- Check if user owns Anti-Rob Shields ---
@@ -76,18 +76,18 @@ class Use(commands.Cog):
             new_expiry_time = current_time + timedelta(days=protection_days)
 
             # Update database: Decrement anti_rob_items and set expiry time
-            self.db.update_one(
-                {"_id": user_id},
-                {"$inc": {"anti_rob_items": -1}, "$set": {"anti_rob_expires_at": new_expiry_time}},
-                upsert=True # Upsert for safety, though user should exist from prior commands
+            await self.economy.update_user(
+                user_id,
+                {"$inc": {"anti_rob_items": -1}, "$set": {"cooldowns.anti_rob": to_epoch(new_expiry_time)}}
             )
+            self.cooldowns.set(user_id, "anti_rob", to_epoch(new_expiry_time), persist=False)
 
             new_anti_rob_items_owned = anti_rob_items_owned - 1
 
             await interaction.followup.send(
                 f"✅ You used one {ANTI_ROB_EMOJI} **Anti-Rob Shield**!\n"
                 f"You are now protected from being robbed for **{protection_days} day{'s' if protection_days > 1 else ''}**."
-                f"Protection expires on: <t:{int(new_expiry_time.timestamp())}:F> (Discord Timestamp)\n" # Discord timestamp
+                f"Protection expires on: <t:{to_epoch(new_expiry_time)}:F> (Discord Timestamp)\n" # Discord timestamp
                 f"You have {new_anti_rob_items_owned} {ANTI_ROB_EMOJI} Anti-Rob Shield(s) left."
             )
 
@@ -98,9 +98,5 @@ class Use(commands.Cog):
                 ephemeral=True
             )
 
-    def cog_unload(self):
-        self.client.close()
-        print("Use MongoDB client closed.")
-
 async def setup(bot):
     await bot.add_cog(Use(bot))
\ No newline at end of file
@@ -1,15 +1,13 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
-from config import MONGO_URL
 import random
-import time
 
 class Work(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = MongoClient(MONGO_URL).hxhbot.users
+        self.economy = bot.economy
+        self.cooldowns = bot.cooldowns
 
         self.emoji = "<:arcadiacoin:1378656679704395796>"
         self.messages = [
@@ -30,66 +28,39 @@ class Work(commands.Cog):
             "You earned ₱{salary} {emoji} for your efforts today.\nNew balance: ₱{balance} {emoji}."
         ]
 
-    def is_on_cooldown(self, user_id):
-        user_data = self.db.find_one({'_id': str(user_id)})
-        now = time.time()
-
-        if not user_data or 'next_work_time' not in user_data:
-            return False, 0
-
-        next_time = user_data['next_work_time']
-        remaining = next_time - now
-
-        if remaining > 0:
-            return True, round(remaining)
-        return False, 0
-
-    def set_new_cooldown(self, user_id):
-        # Random cooldown: 3 minutes to 2 hours (180–7200 seconds)
+    def start_cooldown(self, user_id):
+        # Random cooldown: 3 minutes to 2 hours (180–7200 seconds). Started before
+        # the payout, from memory, so a double /work can never pay twice.
         cooldown_duration = random.randint(180, 7200)
-        next_time = time.time() + cooldown_duration
-        self.db.update_one(
-            {'_id': str(user_id)},
-            {'$set': {'next_work_time': next_time}},
-            upsert=True
-        )
-        return cooldown_duration
+        return self.cooldowns.claim(user_id, "work", cooldown_duration), cooldown_duration
 
     @commands.command(name='work')
     async def work_text(self, ctx):
-        is_cooldown, remaining = self.is_on_cooldown(ctx.author.id)
-        if is_cooldown:
+        remaining, cooldown_duration = self.start_cooldown(ctx.author.id)
+        if remaining:
             await ctx.send(f"You're tired! You can work again in {remaining} seconds.")
             return
-        await self.handle_work(ctx.author, ctx)
+        await self.handle_work(ctx.author, ctx, cooldown_duration)
 
     @app_commands.command(name='work', description='Work to earn a salary (cooldown: 3m–2h, random)')
     async def work_slash(self, interaction: discord.Interaction):
-        is_cooldown, remaining = self.is_on_cooldown(interaction.user.id)
-        if is_cooldown:
+        remaining, cooldown_duration = self.start_cooldown(interaction.user.id)
+        if remaining:
             await interaction.response.send_message(
                 f"You're tired! You can work again in {remaining} seconds.", ephemeral=True
             )
             return
 
         await interaction.response.defer()  # prevent the timeout
-        await self.handle_work(interaction.user, interaction)
+        await self.handle_work(interaction.user, interaction, cooldown_duration)
 
-    async def handle_work(self, user, ctx_or_interaction):
+    async def handle_work(self, user, ctx_or_interaction, cooldown_duration):
         salary = random.randint(1, 200)
 
-        user_data = self.db.find_one({'_id': str(user.id)})
-        balance = user_data['balance'] if user_data and 'balance' in user_data else 0
+        balance = await self.economy.get_balance(user.id)
         new_balance = balance + salary
 
-        self.db.update_one({'_id': str(user.id)}, {
-            '$set': {
-                'balance': new_balance
-            }
-        }, upsert=True)
-
-        # Set random cooldown
-        cooldown_duration = self.set_new_cooldown(user.id)
+        await self.economy.credit(user.id, salary)
 
         # Choose a random message
         message_template = random.choice(self.messages)
@@ -104,5 +75,8 @@ class Work(commands.Cog):
         else:
             await ctx_or_interaction.followup.send(message)
 
+    async def cog_unload(self):
+        await self.economy.flush()
+
 async def setup(bot):
     await bot.add_cog(Work(bot))
\ No newline at end of file
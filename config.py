@@ -2,6 +2,16 @@ import os
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 MONGO_URL = os.getenv("MONGO_URL")
+# "mongo" in production; "sqlite" (single file at SQLITE_PATH) or "memory" to run without MongoDB
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "arcadia.sqlite3")
+# Migrate string-id user documents on first touch; set to False once tools/migrate_users.py has finished
+USER_SCHEMA_COMPAT = True
+# How slots and colorgame show a spin: "edits" animates by editing a message; "file" uploads the
+# outcome's GIF pre-rendered by tools/build_animations.py, "url" links it under ANIMATION_BASE_URL
+ANIMATION_MODE = os.getenv("ANIMATION_MODE", "edits")
+ANIMATION_BASE_URL = os.getenv("ANIMATION_BASE_URL", "")
+ANIMATION_DIR = "assets/animations"
 VANITY_LINK = "discord.gg/warcadia"
 ROLE_ID = 1361732154584858724
 VANITY_LOG_CHANNEL_ID = 1363396246663860356
@@ -0,0 +1,160 @@
+import asyncio
+import io
+import json
+import os
+import time
+import discord
+
+# File-safe names of the outcome symbols; a pre-rendered outcome is <game>/<name>-<name>-<name>.gif
+SYMBOL_NAMES = {"🍒": "cherry", "🍋": "lemon", "💎": "diamond", "🍀": "clover", "7️⃣": "seven"}
+
+
+def animation_name(game, symbols):
+    """Path of an outcome's GIF relative to the animation directory, e.g. ``colorgame/green-pink-pink.gif``."""
+    return f"{game}/{'-'.join(SYMBOL_NAMES.get(symbol, symbol) for symbol in symbols)}.gif"
+
+
+class AnimationAssets:
+    """
+    Outcome GIFs pre-rendered by tools/build_animations.py.
+
+    Only outcomes listed in the directory's manifest are served. In ``file``
+    mode the GIF is uploaded with the message (its bytes are kept in memory
+    after the first send); in ``url`` mode it is linked under ``base_url``,
+    where the directory was uploaded to a CDN.
+    """
+
+    def __init__(self, directory, mode="file", base_url=""):
+        self.directory = directory
+        self.mode = mode
+        self.base_url = base_url.rstrip("/")
+        self.available = set()
+        self._data = {}  # name -> GIF bytes
+
+        manifest_path = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.available = set(json.load(f)["files"])
+        else:
+            print(f"[Animation] No manifest in {directory}; run `python -m tools.build_animations`.")
+
+    def __len__(self):
+        return len(self.available)
+
+    def attachment(self, game, symbols):
+        """``(image url, discord.File or None)`` for an outcome, or None if it was not pre-rendered."""
+        name = animation_name(game, symbols)
+        if name not in self.available:
+            return None
+        if self.mode == "url":
+            return f"{self.base_url}/{name}", None
+
+        data = self._data.get(name)
+        if data is None:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                data = self._data[name] = f.read()
+        filename = name.replace("/", "-")
+        return f"attachment://{filename}", discord.File(io.BytesIO(data), filename=filename)
+
+
+class Animator:
+    """
+    Plays message animations (a first frame, edits, a final frame) within a
+    per-channel budget of message operations.
+
+    Attached to the bot as ``bot.animator``. Each channel gets a token bucket
+    of ``rate`` operations per ``per`` seconds, mirroring Discord's
+    per-channel message limits, and every send or edit made through it
+    spends a token. When a channel runs low, intermediate frames are dropped
+    so the next one shown is the latest; a channel that cannot afford even
+    the first and final frame, or more than ``max_active`` animations at
+    once, gets the final frame alone. The final frame is always delivered.
+
+    With ``assets``, :meth:`show` sends an outcome's pre-rendered GIF with
+    the final frame instead, so the round is a single message.
+    """
+
+    def __init__(self, rate=5, per=5.0, max_active=10, assets=None):
+        self.rate = rate
+        self.per = per
+        self.max_active = max_active
+        self.assets = assets
+        self._budgets = {}  # channel id -> [tokens, last refill (monotonic)]
+        self.active = 0
+
+        self.animations = 0
+        self.fallbacks = 0
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.prerendered = 0
+
+    def _budget(self, channel_id):
+        now = time.monotonic()
+        budget = self._budgets.get(channel_id)
+        if budget is None:
+            if len(self._budgets) >= 1024:
+                # Forget channels whose bucket has refilled; they start full again anyway
+                for key in [key for key, (_, updated) in self._budgets.items() if now - updated > self.per]:
+                    del self._budgets[key]
+            budget = self._budgets[channel_id] = [float(self.rate), now]
+        budget[0] = min(self.rate, budget[0] + (now - budget[1]) * self.rate / self.per)
+        budget[1] = now
+        return budget
+
+    def _spend(self, channel_id, keep=0, force=False):
+        """Spend a token if ``keep`` more would still be left (or regardless with ``force``)."""
+        budget = self._budget(channel_id)
+        if not force and budget[0] - 1 < keep:
+            return False
+        budget[0] -= 1
+        return True
+
+    async def play(self, channel_id, send, frames, final, delay=0.5):
+        """
+        ``send(**kwargs)`` posts the first frame and returns the message;
+        ``frames`` are the message kwargs of each frame shown ``delay``
+        seconds apart, the first one sent and the rest edited in; ``final``
+        is the kwargs of the last edit. Returns the message.
+        """
+        if self.active >= self.max_active or not self._spend(channel_id, keep=1):
+            # Too busy to animate: show the result in one message
+            self.fallbacks += 1
+            self._spend(channel_id, force=True)
+            return await send(**final)
+
+        self.active += 1
+        self.animations += 1
+        try:
+            message = await send(**frames[0])
+            self.frames_shown += 1
+            for frame in frames[1:]:
+                await asyncio.sleep(delay)
+                # Keep a token for the final frame; skipped frames are superseded by the next
+                if not self._spend(channel_id, keep=1):
+                    self.frames_dropped += 1
+                    continue
+                await message.edit(**frame)
+                self.frames_shown += 1
+
+            await asyncio.sleep(delay)
+            self._spend(channel_id, force=True)
+            await message.edit(**final)
+            return message
+        finally:
+            self.active -= 1
+
+    async def show(self, channel_id, send, game, symbols, frames, final, delay=0.5):
+        """
+        Show the outcome ``symbols`` of ``game``: one message carrying its
+        pre-rendered GIF as the embed image, or :meth:`play` when there is none.
+        """
+        asset = self.assets.attachment(game, symbols) if self.assets else None
+        if asset is None:
+            return await self.play(channel_id, send, frames, final, delay=delay)
+
+        url, file = asset
+        embed = final.get("embed") or discord.Embed()
+        embed.set_image(url=url)
+        self.prerendered += 1
+        self._spend(channel_id, force=True)
+        return await send(**{**final, "embed": embed, "file": file})
@@ -0,0 +1,228 @@
+import time
+from array import array
+from core.games import draw_card, hand_score, play_dealer
+
+# Seconds a game stays open without a Hit or Stand
+SESSION_TIMEOUT = 60
+# Most players at one table, and how long a table waits for them before dealing
+TABLE_SEATS = 6
+TABLE_JOIN_SECONDS = 30
+
+
+class BlackjackSession:
+    """
+    One open blackjack game: a few ints and two byte arrays of card values,
+    so an open game costs a few hundred bytes whatever the hands hold.
+
+    ``session_id`` is the snowflake of the command that opened it, and the
+    buttons' custom ids carry it, so a restarted bot can route clicks back
+    to the game (see :class:`BlackjackSessions`). A seat at a
+    :class:`BlackjackTable` is a session with ``table_id`` set.
+    """
+
+    __slots__ = ("session_id", "user_id", "bet", "player", "dealer", "channel_id", "message_id", "expires_at",
+                 "table_id")
+
+    def __init__(self, session_id, user_id, bet, player, dealer, channel_id=None, message_id=None, expires_at=0.0,
+                 table_id=None):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.bet = bet
+        self.player = array("b", player)
+        self.dealer = array("b", dealer)
+        self.channel_id = channel_id
+        self.message_id = message_id  # None until the game message is sent
+        self.expires_at = expires_at
+        self.table_id = table_id
+
+    @classmethod
+    def deal(cls, session_id, user_id, bet):
+        return cls(session_id, user_id, bet, (draw_card(), draw_card()), (draw_card(), draw_card()))
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls(doc["_id"], doc["u"], doc["bet"], doc["p"], doc["d"], doc.get("c"), doc.get("m"), doc.get("exp", 0.0),
+                   doc.get("t"))
+
+    def to_doc(self):
+        return {
+            "u": self.user_id,
+            "bet": self.bet,
+            "p": self.player.tolist(),
+            "d": self.dealer.tolist(),
+            "c": self.channel_id,
+            "m": self.message_id,
+            "exp": self.expires_at,
+            "t": self.table_id,
+        }
+
+    @property
+    def player_score(self):
+        return hand_score(self.player)
+
+    @property
+    def dealer_score(self):
+        return hand_score(self.dealer)
+
+    def hit(self):
+        """Draw a card for the player; returns the new score."""
+        self.player.append(draw_card())
+        return self.player_score
+
+    def play_dealer(self):
+        play_dealer(self.dealer)
+        return self.dealer_score
+
+    def touch(self, timeout=SESSION_TIMEOUT):
+        self.expires_at = time.time() + timeout
+
+
+class BlackjackSessions:
+    """
+    Every open blackjack game, in memory and checkpointed to
+    ``hxhbot.blackjack``.
+
+    Attached to the blackjack cog. A game is written when it is dealt and
+    after each action, and deleted once it is settled, so the stake debited
+    up front is never lost to a restart: :meth:`load` returns the games that
+    were open, to be resumed or refunded.
+    """
+
+    def __init__(self, collection, timeout=SESSION_TIMEOUT):
+        self.collection = collection
+        self.timeout = timeout
+        self.open = {}  # session id -> BlackjackSession
+        self.undeleted = set()  # settled session ids still in the store
+
+        self.checkpoints = 0
+        self.timed_out = 0
+        self.refunded = 0
+        self.resumed = 0
+
+    def __len__(self):
+        return len(self.open)
+
+    def get(self, session_id):
+        return self.open.get(session_id)
+
+    async def load(self):
+        """Every game saved by an earlier run. Run once at startup, before :meth:`save` is used."""
+        return [BlackjackSession.from_doc(doc) async for doc in self.collection.find({})]
+
+    async def save(self, session):
+        """Track ``session`` and checkpoint it, restarting its timeout."""
+        session.touch(self.timeout)
+        self.open[session.session_id] = session
+        await self.collection.update_one({"_id": session.session_id}, {"$set": session.to_doc()}, upsert=True)
+        self.checkpoints += 1
+
+    def resume(self, session):
+        """Track a game from :meth:`load` again, with a fresh timeout for the player to come back to it."""
+        session.touch(self.timeout)
+        self.open[session.session_id] = session
+        self.resumed += 1
+
+    def take(self, session_id):
+        """
+        Stop tracking a game so exactly one caller settles it. Returns the
+        session, or None if it was already taken (e.g. by the timeout sweep).
+        """
+        return self.open.pop(session_id, None)
+
+    def restore(self, session):
+        """Track a session again after :meth:`take`, when settling it failed."""
+        self.open[session.session_id] = session
+
+    async def delete_many(self, session_ids):
+        """Delete settled sessions; ids that could not be deleted are retried by :meth:`retry_deletes`."""
+        session_ids = list(session_ids)
+        try:
+            await self.collection.delete_many({"_id": {"$in": session_ids}})
+        except Exception as e:
+            # Left in the store they would be refunded after a restart
+            print(f"[Blackjack] Could not delete {len(session_ids)} settled session(s), retrying later: {e}")
+            self.undeleted.update(session_ids)
+
+    async def retry_deletes(self):
+        if self.undeleted:
+            session_ids, self.undeleted = self.undeleted, set()
+            await self.delete_many(session_ids)
+
+    def expired(self, now=None):
+        """Single games past their timeout; table seats expire with their table."""
+        now = time.time() if now is None else now
+        return [session.session_id for session in self.open.values()
+                if session.table_id is None and session.expires_at <= now]
+
+
+class BlackjackTable:
+    """
+    Up to :data:`TABLE_SEATS` players against one dealer hand, shown in one
+    shared message.
+
+    Each seat is a :class:`BlackjackSession` holding the table's dealer
+    hand. A seat is saved when its bet is taken and deleted when the table
+    settles; table rounds are not resumed after a restart, so their seats
+    are refunded rather than checkpointed on every card.
+
+    Players join until the host deals, the table fills or
+    :data:`TABLE_JOIN_SECONDS` pass; the round ends when every seat has
+    stood or bust, or after ``SESSION_TIMEOUT`` seconds without an action.
+    """
+
+    __slots__ = ("table_id", "host_id", "bet", "channel_id", "message_id", "dealer", "seats", "done", "paid", "dealt",
+                 "expires_at")
+
+    def __init__(self, table_id, host_id, bet, channel_id):
+        self.table_id = table_id
+        self.host_id = host_id
+        self.bet = bet
+        self.channel_id = channel_id
+        self.message_id = None
+        self.dealer = array("b")
+        self.seats = {}  # user id -> BlackjackSession, in joining order
+        self.done = set()  # user ids that stood or bust
+        self.paid = set()  # user ids settled; the rest are retried if a payout fails
+        self.dealt = False
+        self.expires_at = time.time() + TABLE_JOIN_SECONDS
+
+    @property
+    def full(self):
+        return len(self.seats) >= TABLE_SEATS
+
+    @property
+    def finished(self):
+        return self.dealt and len(self.done) == len(self.seats)
+
+    def seat(self, session_id, user_id):
+        seat = BlackjackSession(session_id, user_id, self.bet, (), (), self.channel_id, self.message_id,
+                                table_id=self.table_id)
+        seat.dealer = self.dealer  # shared, not copied
+        self.seats[user_id] = seat
+        return seat
+
+    def deal(self):
+        self.dealer.extend((draw_card(), draw_card()))
+        for seat in self.seats.values():
+            seat.player.extend((draw_card(), draw_card()))
+        self.dealt = True
+        self.touch()
+
+    def hit(self, user_id):
+        """Draw for a seat; a bust ends its hand. Returns the new score."""
+        score = self.seats[user_id].hit()
+        if score > 21:
+            self.done.add(user_id)
+        self.touch()
+        return score
+
+    def stand(self, user_id):
+        self.done.add(user_id)
+        self.touch()
+
+    def play_dealer(self):
+        play_dealer(self.dealer)
+        return hand_score(self.dealer)
+
+    def touch(self, timeout=SESSION_TIMEOUT):
+        self.expires_at = time.time() + timeout
@@ -0,0 +1,178 @@
+import copy
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+def apply_update(user_data, update):
+    """
+    Apply a ``$set`` / ``$unset`` / ``$inc`` update to a document in place,
+    the way MongoDB would. Dotted field names are followed into subdocuments.
+    Returns False if the update uses anything else, so the caller can drop
+    the entry instead of guessing.
+    """
+    if set(update) - {"$set", "$unset", "$inc"}:
+        return False
+
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            *parents, field = path.split(".")
+            target = user_data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+                if not isinstance(target, dict):
+                    return False
+
+            if operator == "$set":
+                target[field] = value
+            elif operator == "$unset":
+                target.pop(field, None)
+            else:
+                target[field] = target.get(field, 0) + value
+    return True
+
+
+class UserCache:
+    """
+    Bounded LRU cache of ``hxhbot.users`` documents with a time-to-live.
+
+    Entries may be partial: a projected read caches only the fields it
+    fetched, and a later read is a hit only if those fields cover what it
+    asks for. Missing users are cached too (as ``None``), so the AFK listener
+    does not query the database for every message from someone with no
+    document. Every write path patches or drops the entry, and ``version`` is
+    bumped on each change so a read that raced a write never stores a stale
+    document. Users with a write in flight are fenced: nothing read for them
+    is stored until the write has returned.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # user id -> (expires_at, document or None, fetched fields or None for the whole document)
+        self._entries = OrderedDict()
+        self.version = 0
+        self._fenced = set()  # user ids whose write is in flight
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, user_id, fields=None):
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[user_id]
+            entry = None
+
+        if entry is None or not self._covers(entry, fields):
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    @staticmethod
+    def _covers(entry, fields):
+        _, user_data, cached_fields = entry
+        if user_data is None or cached_fields is None:
+            return True
+        return fields is not None and fields <= cached_fields
+
+    def fill(self, user_id, user_data, version, fields=None):
+        """
+        Store a document read from the database, unless a write happened
+        since ``version``. A projected read is merged into a partial entry.
+        """
+        if version == self.version and user_id not in self._fenced:
+            self._merge(user_id, user_data, fields)
+
+    def fence(self, user_ids):
+        """Refuse fills for ``user_ids`` until :meth:`unfence`: a read made now may predate their write."""
+        self._fenced.update(user_ids)
+
+    def unfence(self, user_ids):
+        self.version += 1
+        self._fenced.difference_update(user_ids)
+
+    def put(self, user_id, user_data, fields=None):
+        """
+        Store a document returned by a write. A projected result must include
+        every field the write touched; it is merged into the cached entry.
+        """
+        self.version += 1
+        self._merge(user_id, user_data, fields)
+
+    def _merge(self, user_id, user_data, fields):
+        entry = self._entries.get(user_id)
+        if fields is not None and user_data is not None and entry is not None and entry[1] is not None:
+            user_data = {**entry[1], **user_data}
+            fields = None if entry[2] is None else fields | entry[2]
+        self._store(user_id, user_data, None if user_data is None else fields)
+
+    def patch(self, user_id, update, upsert=False):
+        """Mirror a write onto the cached document, if there is one. Returns True if it was."""
+        self.version += 1
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False
+
+        expires_at, user_data, fields = entry
+        if user_data is None:
+            if not upsert:
+                return True
+            user_data, fields = {"_id": user_id}, None
+        else:
+            user_data = copy.deepcopy(user_data)
+
+        if fields is not None:
+            # A partial entry can only absorb writes whose result it knows:
+            # whole fields being set or unset, or fields it already holds
+            learned = set()
+            for operator, paths in update.items():
+                for path in paths:
+                    top = path.split(".")[0]
+                    if top in fields:
+                        continue
+                    if operator in ("$set", "$unset") and "." not in path:
+                        learned.add(top)
+                        continue
+                    del self._entries[user_id]
+                    return False
+            fields = fields | learned
+
+        if apply_update(user_data, update):
+            self._entries[user_id] = (expires_at, user_data, fields)
+            return True
+        del self._entries[user_id]
+        return False
+
+    def invalidate(self, user_id):
+        self.version += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+
+    def _store(self, user_id, user_data, fields):
+        self._entries[user_id] = (time.monotonic() + self.ttl, user_data, fields)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,196 @@
+import asyncio
+import heapq
+import time
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from core.schema import LEGACY_COOLDOWNS, normalize_user
+
+
+class Cooldowns:
+    """
+    Every running cooldown, held in memory and written behind to
+    ``hxhbot.users``.
+
+    Attached to the bot as ``bot.cooldowns``. Cooldowns live under
+    ``cooldowns.<name>`` as the epoch second they end at (see core/schema.py),
+    are loaded once at startup and answered from memory afterwards, so
+    turning away a user who is still cooling down costs no database traffic.
+    A min-heap of end times drops expired cooldowns as they run out.
+
+    New and cleared cooldowns are merged per user and written with one
+    unordered ``bulk_write`` every ``interval`` seconds; the cached user
+    document is patched straight away so ``Economy.get_user`` agrees.
+    """
+
+    def __init__(self, users, cache=None, interval=1.0, max_ops=500):
+        self.users = users
+        self.cache = cache
+        self.interval = interval
+        self.max_ops = max_ops
+
+        self._ends = {}  # (user id, name) -> epoch second the cooldown ends
+        self._heap = []  # (ends at, user id, name); entries superseded in _ends are skipped
+        self.pending = {}  # user id -> {name: ends at, or None to clear}
+        self.queued_ops = 0
+
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+
+        self.rejections = 0
+        self.expired = 0
+        self.bulk_writes = 0
+
+    def __len__(self):
+        return len(self._ends)
+
+    async def load(self):
+        """Read every cooldown that has not ended yet. Run once at startup."""
+        now = int(time.time())
+        query = {"$or": [{"cooldowns": {"$exists": True}}] + [{field: {"$exists": True}} for field in LEGACY_COOLDOWNS]}
+        projection = {"cooldowns": 1, **{field: 1 for field in LEGACY_COOLDOWNS}}
+
+        self._ends, self._heap = {}, []
+        async for doc in self.users.find(query, projection):
+            # Legacy string-id documents still waiting for the migration keep
+            # their cooldowns in the old top-level fields
+            doc = normalize_user(doc)
+            for name, ends_at in doc.get("cooldowns", {}).items():
+                key = (doc["_id"], name)
+                if ends_at and ends_at > max(now, self._ends.get(key, 0)):
+                    self._ends[key] = int(ends_at)
+        self._heap = [(ends_at, user_id, name) for (user_id, name), ends_at in self._ends.items()]
+        heapq.heapify(self._heap)
+        print(f"[Cooldowns] Loaded {len(self._ends):,} running cooldowns.")
+
+    def ends_at(self, user_id, name):
+        """Epoch second a cooldown ends, or ``None`` if it is not running."""
+        ends_at = self._ends.get((int(user_id), name))
+        if ends_at is None or ends_at <= time.time():
+            return None
+        return ends_at
+
+    def remaining(self, user_id, name):
+        """Whole seconds left on a cooldown, 0 if it is not running."""
+        ends_at = self.ends_at(user_id, name)
+        return max(int(ends_at - time.time()), 1) if ends_at else 0
+
+    def claim(self, user_id, name, duration):
+        """
+        Start a cooldown unless it is already running.
+
+        Returns 0 when the cooldown was started, otherwise the seconds left on
+        the running one. The check and the start happen without awaiting, so
+        two commands racing for the same cooldown cannot both get through.
+        """
+        remaining = self.remaining(user_id, name)
+        if remaining:
+            self.rejections += 1
+            return remaining
+        self.set(user_id, name, int(time.time()) + duration)
+        return 0
+
+    def set(self, user_id, name, ends_at, persist=True):
+        """
+        Make a cooldown end at ``ends_at`` (epoch seconds). With ``persist``
+        off the caller has already written it, e.g. as part of a transfer.
+        """
+        user_id, ends_at = int(user_id), int(ends_at)
+        self._ends[(user_id, name)] = ends_at
+        heapq.heappush(self._heap, (ends_at, user_id, name))
+        if persist:
+            self._queue(user_id, name, ends_at)
+
+    def clear(self, user_id, name):
+        user_id = int(user_id)
+        if self._ends.pop((user_id, name), None) is not None:
+            self._queue(user_id, name, None)
+
+    def _queue(self, user_id, name, ends_at):
+        self.pending.setdefault(user_id, {})[name] = ends_at
+        if self.cache is not None:
+            self.cache.patch(user_id, self._update({name: ends_at}))
+        self.queued_ops += 1
+        if self.queued_ops >= self.max_ops:
+            self._wake.set()
+
+    @staticmethod
+    def _update(changes):
+        update = {}
+        for name, ends_at in changes.items():
+            if ends_at is None:
+                update.setdefault("$unset", {})[f"cooldowns.{name}"] = ""
+            else:
+                update.setdefault("$set", {})[f"cooldowns.{name}"] = ends_at
+        return update
+
+    def expire(self):
+        """Drop cooldowns that have ended from memory; the stored epochs simply lie in the past."""
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            ends_at, user_id, name = heapq.heappop(self._heap)
+            if self._ends.get((user_id, name)) == ends_at:
+                del self._ends[(user_id, name)]
+                self.expired += 1
+
+    def _requeue(self, user_id, changes):
+        # Changes made since the failed write take precedence
+        entry = self.pending.setdefault(user_id, {})
+        for name, ends_at in changes.items():
+            entry.setdefault(name, ends_at)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            batch, self.pending = self.pending, {}
+            self.queued_ops = 0
+            user_ids = list(batch)
+            ops = [UpdateOne({"_id": user_id}, self._update(batch[user_id]), upsert=True) for user_id in user_ids]
+            try:
+                await self.users.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = [error["index"] for error in e.details.get("writeErrors", [])]
+                print(f"[Cooldowns] {len(failed)} of {len(ops)} updates failed, requeueing them.")
+                for index in failed:
+                    self._requeue(user_ids[index], batch[user_ids[index]])
+            except asyncio.CancelledError:
+                # Cancelled mid-write (e.g. by stop()): keep the batch for the next flush
+                for user_id, changes in batch.items():
+                    self._requeue(user_id, changes)
+                raise
+            except Exception as e:
+                print(f"[Cooldowns] Flush failed, requeueing {len(ops)} updates: {e}")
+                for user_id, changes in batch.items():
+                    self._requeue(user_id, changes)
+            finally:
+                self.bulk_writes += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self.expire()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[Cooldowns] Unexpected flush error: {e}")
+
+    async def start(self):
+        await self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
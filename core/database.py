@@ -0,0 +1,28 @@
+from core.storage import open_backend
+
+
+class Database:
+    """
+    The bot's single storage connection.
+
+    One backend is opened at startup and attached to the bot as ``bot.db``;
+    every cog takes its collections from here instead of opening its own
+    client, so database latency never blocks the event loop. ``backend``
+    picks MongoDB (through a pooled Motor client), SQLite or process memory.
+    """
+
+    def __init__(self, url, backend="mongo", sqlite_path=None, max_pool_size=50):
+        self.backend_name = backend
+        self.backend = open_backend(backend, url, sqlite_path=sqlite_path, max_pool_size=max_pool_size)
+
+        self.users = self.backend.collection("hxhbot", "users")
+        self.confessions = self.backend.collection("hxhbot", "confessions")
+        self.customroles = self.backend.collection("hxhbot", "customroles")
+        self.ledger = self.backend.collection("hxhbot", "ledger")
+        self.blackjack = self.backend.collection("hxhbot", "blackjack")
+        self.autoresponders = self.backend.collection("bot_db", "autoresponders")
+        self.stickies = self.backend.collection("sticky_db", "stickies")
+
+    def close(self):
+        self.backend.close()
+        print(f"[Database] {self.backend_name} storage closed.")
@@ -0,0 +1,54 @@
+import asyncio
+import discord
+
+
+class DMQueue:
+    """
+    Background queue for direct messages, sent one every ``interval`` seconds.
+
+    Bulk staff commands queue one DM per member instead of awaiting hundreds
+    of sends in the command itself, which would hit Discord's DM rate limits
+    and keep the interaction waiting. Members with DMs closed are skipped.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._queue = asyncio.Queue()
+        self._task = None
+
+        self.sent = 0
+        self.failed = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def enqueue(self, user, content=None, embed=None):
+        self._queue.put_nowait((user, content, embed))
+
+    async def _run(self):
+        while True:
+            user, content, embed = await self._queue.get()
+            try:
+                await user.send(content, embed=embed)
+                self.sent += 1
+            except discord.Forbidden:
+                self.failed += 1
+            except discord.HTTPException as e:
+                self.failed += 1
+                print(f"[DMQueue] Could not DM {user}: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if len(self):
+            print(f"[DMQueue] Stopped with {len(self)} DM(s) unsent.")
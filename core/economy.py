@@ -0,0 +1,390 @@
+from collections import OrderedDict
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from core.cache import MISSING, UserCache
+from core.ledger import MIGRATION
+from core.projections import BALANCE
+from core.schema import migration_filter, migration_update, normalize_user
+from core.writebehind import BalanceBuffer
+
+
+# Most user ids remembered as already migrated; older ones are checked again if they come back
+MIGRATED_MEMORY = 50000
+
+
+class _GuardFailed(Exception):
+    """Aborts a transfer transaction whose sender or recipient did not match its guard."""
+
+
+class Economy:
+    """
+    Balance operations on ``hxhbot.users`` shared by every economy cog.
+
+    Attached to the bot as ``bot.economy``. Wagers and purchases go through
+    :meth:`charge`, which checks and updates the balance in one
+    ``find_one_and_update`` so two concurrent bets can never spend the same
+    coins. Plain payouts go through :meth:`credit`, which is write-behind:
+    increments are coalesced per user and flushed in bulk. Money moving
+    between two users goes through :meth:`transfer`. With a ``ledger``, every
+    balance change is also recorded there, attributed to the running command.
+
+    User documents are read through a shared LRU cache; every write made
+    through this class patches the cached copy, so cogs must not write to
+    ``hxhbot.users`` directly.
+
+    Users are keyed by their int64 Discord id. With ``compat`` on, a user
+    still stored under the legacy string id is migrated the first time they
+    are touched, so the bot keeps working while ``tools/migrate_users.py``
+    runs.
+    """
+
+    def __init__(self, users, ledger=None, compat=False):
+        self.users = users
+        self.ledger = ledger
+        self.compat = compat
+        self.cache = UserCache()
+        self.buffer = BalanceBuffer(users, cache=self.cache)
+        self._migrated = OrderedDict()  # user ids known to have no legacy document, oldest first
+        self._transactions = None
+        self._listeners = []
+
+    def start(self):
+        self.buffer.start()
+        if self.ledger is not None:
+            self.ledger.start()
+
+    async def flush(self):
+        await self.buffer.flush()
+        if self.ledger is not None:
+            await self.ledger.flush()
+
+    async def close(self):
+        await self.buffer.stop()
+        if self.ledger is not None:
+            await self.ledger.stop()
+
+    def add_balance_listener(self, listener):
+        """Call ``listener(user_id, delta)`` after every balance change made through this class."""
+        self._listeners.append(listener)
+
+    def _balance_changed(self, user_id, delta):
+        if not delta:
+            return
+        if self.ledger is not None:
+            self.ledger.record(user_id, delta)
+        for listener in self._listeners:
+            listener(user_id, delta)
+
+    def _mark_migrated(self, user_id):
+        self._migrated[user_id] = None
+        self._migrated.move_to_end(user_id)
+        if len(self._migrated) > MIGRATED_MEMORY:
+            self._migrated.popitem(last=False)
+
+    async def _ensure_migrated(self, user_id):
+        if not self.compat or user_id in self._migrated:
+            return
+        legacy = await self.users.find_one({"_id": str(user_id)})
+        if legacy is not None:
+            await self._merge_legacy(user_id, legacy)
+        self._mark_migrated(user_id)
+
+    async def _ensure_migrated_many(self, user_ids):
+        """:meth:`_ensure_migrated` for many users, with one lookup for their legacy documents."""
+        if not self.compat:
+            return
+        unknown = [user_id for user_id in user_ids if user_id not in self._migrated]
+        if not unknown:
+            return
+        async for legacy in self.users.find({"_id": {"$in": [str(user_id) for user_id in unknown]}}):
+            await self._merge_legacy(int(legacy["_id"]), legacy)
+        for user_id in unknown:
+            self._mark_migrated(user_id)
+
+    async def _merge_legacy(self, user_id, legacy):
+        try:
+            await self.users.update_one(migration_filter(legacy), migration_update(legacy), upsert=True)
+            # New money to the ledger only: listeners such as TopBalances already
+            # count the legacy document under the user's int id
+            balance = int(normalize_user(legacy).get("balance", 0))
+            if self.ledger is not None and balance:
+                self.ledger.record(user_id, balance, source=MIGRATION)
+        except DuplicateKeyError:
+            pass  # already merged by the migration tool or a concurrent command
+        await self.users.delete_one({"_id": str(user_id)})
+        self.cache.invalidate(user_id)
+        print(f"[Economy] Migrated legacy user document {user_id}.")
+
+    def _apply_pending(self, user_id, user_data):
+        pending = self.buffer.peek(user_id)
+        if not pending:
+            return dict(user_data) if user_data else None
+
+        user_data = dict(user_data) if user_data else {"_id": user_id}
+        for field, delta in pending.items():
+            user_data[field] = user_data.get(field, 0) + delta
+        return user_data
+
+    async def get_user(self, user_id, fields=None):
+        """
+        Fetch a user document (or ``None``) with any buffered increments applied.
+
+        ``fields`` is a :class:`core.projections.Fields` naming what the caller
+        reads; only those fields are fetched. Without it the whole document is
+        returned.
+        """
+        user_id = int(user_id)
+        user_data = self.cache.get(user_id, fields)
+        if user_data is MISSING:
+            await self._ensure_migrated(user_id)
+            version = self.cache.version
+            user_data = await self.users.find_one({"_id": user_id}, fields.spec if fields else None)
+            self.cache.fill(user_id, user_data, version, fields)
+        return self._apply_pending(user_id, user_data)
+
+    async def get_balance(self, user_id):
+        user_data = await self.get_user(user_id, BALANCE)
+        return int(user_data.get("balance", 0)) if user_data else 0
+
+    async def update_user(self, user_id, update, upsert=True):
+        """``update_one`` on a user document, mirrored onto the cached copy."""
+        user_id = int(user_id)
+        await self._ensure_migrated(user_id)
+        result = await self.users.update_one({"_id": user_id}, update, upsert=upsert)
+        self.cache.patch(user_id, update, upsert=upsert)
+        if result.matched_count or result.upserted_id is not None:
+            self._balance_changed(user_id, update.get("$inc", {}).get("balance", 0))
+        return result
+
+    async def charge(self, user_id, cost, delta=None, inc=None, require=None):
+        """
+        Atomically take ``cost`` from a user who can afford it.
+
+        ``delta`` is the net balance change to write (``-cost`` by default), so
+        a game that already knows its outcome can debit the bet and pay out in
+        the same round trip. ``inc`` bumps other counters in the same write and
+        ``require`` adds extra filter conditions (e.g. owning a chicken).
+
+        Returns the updated balance plus the ``inc`` and ``require`` fields, or
+        ``None`` when the user cannot afford ``cost`` or ``require`` did not
+        match.
+        """
+        user_id = int(user_id)
+        await self._ensure_migrated(user_id)
+
+        # Fold the user's buffered payouts into this write so they count
+        # towards what the user can afford
+        pending = self.buffer.take(user_id)
+        pending_balance = pending.get("balance", 0)
+
+        query = {"_id": user_id, "balance": {"$gte": cost - pending_balance}}
+        if require:
+            query.update(require)
+
+        update = {"$inc": dict(pending)}
+        update["$inc"]["balance"] = pending_balance + (-cost if delta is None else delta)
+        for field, value in (inc or {}).items():
+            update["$inc"][field] = update["$inc"].get(field, 0) + value
+
+        # Only the fields this write touches or checks come back
+        fields = frozenset(update["$inc"]) | frozenset(key for key in require or () if not key.startswith("$"))
+
+        try:
+            user_data = await self.users.find_one_and_update(
+                query, update, projection={field: 1 for field in fields},
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception:
+            self.buffer.restore(user_id, pending)
+            raise
+
+        if user_data is not None:
+            self.cache.put(user_id, user_data, fields)
+            self._balance_changed(user_id, -cost if delta is None else delta)
+        elif pending:
+            # The user may have no document yet beyond buffered payouts;
+            # write those out and try once more against the real balance
+            self.buffer.restore(user_id, pending)
+            await self.buffer.flush()
+            return await self.charge(user_id, cost, delta, inc, require)
+        return user_data
+
+    async def _supports_transactions(self):
+        # Multi-document transactions need a Motor client on a replica set or
+        # sharded cluster; the SQLite and in-memory backends have no sessions
+        if self._transactions is None:
+            client = getattr(getattr(self.users, "database", None), "client", None)
+            self._transactions = False
+            if client is not None and hasattr(client, "start_session"):
+                try:
+                    hello = await client.admin.command("hello")
+                    self._transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+                except PyMongoError as e:
+                    print(f"[Economy] Could not detect transaction support: {e}")
+        return self._transactions
+
+    async def transfer(self, from_id, to_id, amount, extra_updates=None, require=None, recipient_require=None):
+        """
+        Move ``amount`` from one user to another as one logical operation.
+
+        The sender must afford ``amount`` and match ``require``; the recipient
+        must match ``recipient_require`` (a recipient with no document yet
+        always does). ``extra_updates`` is an update applied to the recipient
+        in the same write, e.g. setting a cooldown.
+
+        Runs in a transaction when the deployment supports one. Otherwise the
+        guarded debit is written first and refunded if the credit does not go
+        through, so a failure can never create or destroy money.
+
+        Returns ``(sender, recipient)`` with their updated balances, or
+        ``None`` if a guard did not match and nothing changed.
+        """
+        from_id, to_id = int(from_id), int(to_id)
+        await self._ensure_migrated(from_id)
+        await self._ensure_migrated(to_id)
+
+        credit = {"$inc": {"balance": amount}}
+        for operator, fields in (extra_updates or {}).items():
+            credit.setdefault(operator, {}).update(fields)
+
+        if await self._supports_transactions():
+            result = await self._transfer_in_transaction(from_id, to_id, amount, credit, require, recipient_require)
+        else:
+            result = await self._transfer_compensated(from_id, to_id, amount, credit, require, recipient_require)
+        if result is None:
+            return None
+
+        self.cache.patch(to_id, credit, upsert=True)
+        self._balance_changed(to_id, amount)
+        sender, recipient = result
+        return self._apply_pending(from_id, sender), self._apply_pending(to_id, recipient)
+
+    async def _credit_recipient(self, to_id, credit, recipient_require, session=None):
+        try:
+            return await self.users.find_one_and_update(
+                {"_id": to_id, **(recipient_require or {})}, credit, projection=BALANCE.spec,
+                upsert=True, return_document=ReturnDocument.AFTER, session=session
+            )
+        except DuplicateKeyError:
+            # The recipient exists but failed the guard, so the upsert tried to insert them again
+            return None
+
+    async def _transfer_in_transaction(self, from_id, to_id, amount, credit, require, recipient_require):
+        pending = self.buffer.take(from_id)
+        pending_balance = pending.get("balance", 0)
+        debit = {"$inc": dict(pending)}
+        debit["$inc"]["balance"] = pending_balance - amount
+        query = {"_id": from_id, "balance": {"$gte": amount - pending_balance}, **(require or {})}
+
+        async def settle(session):
+            sender = await self.users.find_one_and_update(
+                query, debit, projection=BALANCE.spec, return_document=ReturnDocument.AFTER, session=session
+            )
+            if sender is None:
+                raise _GuardFailed
+            recipient = await self._credit_recipient(to_id, credit, recipient_require, session=session)
+            if recipient is None:
+                raise _GuardFailed
+            return sender, recipient
+
+        try:
+            async with await self.users.database.client.start_session() as session:
+                sender, recipient = await session.with_transaction(settle)
+        except _GuardFailed:
+            self.buffer.restore(from_id, pending)
+            return None
+        except Exception:
+            self.buffer.restore(from_id, pending)
+            raise
+
+        self.cache.patch(from_id, debit)
+        self._balance_changed(from_id, -amount)
+        return sender, recipient
+
+    async def _transfer_compensated(self, from_id, to_id, amount, credit, require, recipient_require):
+        sender = await self.charge(from_id, amount, require=require)
+        if sender is None:
+            return None
+
+        try:
+            recipient = await self._credit_recipient(to_id, credit, recipient_require)
+        except Exception:
+            await self.update_user(from_id, {"$inc": {"balance": amount}})
+            raise
+        if recipient is None:
+            await self.update_user(from_id, {"$inc": {"balance": amount}})
+            return None
+        return sender, recipient
+
+    async def bulk_adjust(self, deltas):
+        """
+        Apply ``{user id: balance delta}`` to many users with one unordered
+        ``bulk_write``, e.g. a staff payout to a whole role.
+
+        Credits always apply. A debit only applies if the user can afford it:
+        its update is guarded on the balance and upserts, so a user who
+        cannot pay fails with a duplicate key error for that op alone, the
+        way :meth:`transfer` guards its recipient. Users with no document
+        can only pay from their buffered payouts.
+
+        Returns the list of user ids whose change was applied.
+        """
+        deltas = {int(user_id): delta for user_id, delta in deltas.items() if delta}
+        await self._ensure_migrated_many(deltas)
+
+        debtors = [user_id for user_id, delta in deltas.items() if delta < 0]
+        stored = set()
+        if debtors:
+            async for doc in self.users.find({"_id": {"$in": debtors}}, {"_id": 1}):
+                stored.add(doc["_id"])
+
+        user_ids, ops, updates, taken = [], [], [], {}
+        for user_id, delta in deltas.items():
+            # Fold buffered payouts into the write, as charge() does
+            pending = taken[user_id] = self.buffer.take(user_id)
+            pending_balance = pending.get("balance", 0)
+            if delta < 0 and user_id not in stored and pending_balance + delta < 0:
+                continue
+
+            update = {"$inc": dict(pending)}
+            update["$inc"]["balance"] = pending_balance + delta
+            query = {"_id": user_id}
+            if delta < 0 and user_id in stored:
+                query["balance"] = {"$gte": -delta - pending_balance}
+            user_ids.append(user_id)
+            ops.append(UpdateOne(query, update, upsert=True))
+            updates.append(update)
+
+        failed = set()
+        if ops:
+            try:
+                await self.users.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: only the reported ops were not applied
+                failed = {user_ids[error["index"]] for error in e.details.get("writeErrors", [])}
+            except Exception:
+                for user_id, pending in taken.items():
+                    self.buffer.restore(user_id, pending)
+                raise
+
+        applied = []
+        for user_id, update in zip(user_ids, updates):
+            if user_id in failed:
+                continue
+            self.cache.patch(user_id, update, upsert=True)
+            self._balance_changed(user_id, deltas[user_id])
+            applied.append(user_id)
+        for user_id, pending in taken.items():
+            if user_id not in applied:
+                self.buffer.restore(user_id, pending)
+        return applied
+
+    async def credit(self, user_id, amount, inc=None):
+        """Queue ``amount`` (and any other ``inc`` counters) for a user's next buffered flush."""
+        user_id = int(user_id)
+        await self._ensure_migrated(user_id)
+        update = {"balance": amount}
+        if inc:
+            update.update(inc)
+        self.buffer.add(user_id, update)
+        self._balance_changed(user_id, amount)
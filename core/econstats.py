@@ -0,0 +1,86 @@
+import time
+from array import array
+from datetime import datetime, timezone
+import numpy as np
+from core.projections import ECONOMY_STATS
+
+# Balance histogram edges: 0, then one bucket per power of ten
+HISTOGRAM_EDGES = [0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+# Player accounts: int64 documents, and legacy string-id documents awaiting
+# migration, which count towards the same user as TopBalances does
+PLAYER_QUERY = {"balance": {"$exists": True}, "_id": {"$type": "number"}}
+LEGACY_QUERY = {"balance": {"$exists": True}, "_id": {"$type": "string"}}
+
+
+def gini(values):
+    """Gini coefficient of non-negative values: 0 is perfect equality, 1 is one user holding everything."""
+    values = np.sort(np.clip(values, 0, None)).astype(np.float64)
+    total = values.sum()
+    if len(values) == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, len(values) + 1)
+    return float(2 * np.dot(ranks, values) / (len(values) * total) - (len(values) + 1) / len(values))
+
+
+def top_share(values, fraction):
+    """Share of all money held by the richest ``fraction`` of users."""
+    total = values.sum()
+    if len(values) == 0 or total <= 0:
+        return 0.0
+    count = max(int(len(values) * fraction), 1)
+    return float(np.sort(values)[-count:].sum() / total)
+
+
+async def compute_economy_stats(users):
+    """
+    Money supply, balance distribution and item holdings over the player
+    accounts of ``hxhbot.users``, with legacy documents added to their
+    int64 counterpart (see :data:`LEGACY_QUERY`).
+
+    Streams a projection of the counter fields into packed int64 arrays and
+    reduces them with NumPy, so it runs the same on every storage backend
+    and never holds whole documents in memory.
+    """
+    started = time.perf_counter()
+    columns = {field: array("q") for field in sorted(ECONOMY_STATS)}
+    # Legacy documents first: only unmigrated users are held, by int id
+    legacy = {}
+    async for doc in users.find(LEGACY_QUERY, ECONOMY_STATS.spec):
+        counters = legacy.setdefault(int(doc["_id"]), dict.fromkeys(columns, 0))
+        for field in columns:
+            counters[field] += int(doc.get(field) or 0)
+    async for doc in users.find(PLAYER_QUERY, ECONOMY_STATS.spec):
+        merged = legacy.pop(int(doc["_id"]), None)
+        for field, column in columns.items():
+            column.append(int(doc.get(field) or 0) + (merged[field] if merged else 0))
+    for counters in legacy.values():
+        for field, column in columns.items():
+            column.append(counters[field])
+    data = {field: np.frombuffer(column, dtype=np.int64) if column else np.zeros(0, np.int64)
+            for field, column in columns.items()}
+
+    balances = data["balance"]
+    counts, _ = np.histogram(np.clip(balances, 0, None), bins=HISTOGRAM_EDGES + [max(int(balances.max(initial=0)) + 1, 10_000_001)])
+    tokens = data["custom_roles"] + data["custom_role_items"]
+
+    return {
+        "users": len(balances),
+        "supply": int(balances.sum()),
+        "mean": float(balances.mean()) if len(balances) else 0.0,
+        "median": float(np.median(balances)) if len(balances) else 0.0,
+        "p90": float(np.percentile(balances, 90)) if len(balances) else 0.0,
+        "p99": float(np.percentile(balances, 99)) if len(balances) else 0.0,
+        "max": int(balances.max(initial=0)),
+        "broke": int((balances <= 0).sum()),
+        "gini": gini(balances),
+        "top1_share": top_share(balances, 0.01),
+        "top10_share": top_share(balances, 0.10),
+        "histogram": [int(count) for count in counts],
+        "holders": {
+            "chickens": (int((data["chickens_owned"] > 0).sum()), int(data["chickens_owned"].sum())),
+            "anti_rob": (int((data["anti_rob_items"] > 0).sum()), int(data["anti_rob_items"].sum())),
+            "custom_role_tokens": (int((tokens > 0).sum()), int(tokens.sum())),
+        },
+        "computed_at": datetime.now(timezone.utc),
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,114 @@
+"""
+Rules of the wager games, free of Discord and the database.
+
+Each game resolves a bet to an :class:`Outcome` up front, so the cogs can
+settle it in one write (see core/wager.py). Every function takes the random
+source as ``rng`` so rounds can be replayed with a seeded ``random.Random``
+or simulated in bulk.
+"""
+import random
+
+
+class Outcome:
+    """What a round costs and pays: ``stake`` is debited, ``payout`` credited back in the same write."""
+
+    __slots__ = ("stake", "payout", "inc", "detail")
+
+    def __init__(self, stake, payout, inc=None, detail=None):
+        self.stake = stake
+        self.payout = payout
+        self.inc = inc  # other counters changed by the round, e.g. a lost chicken
+        self.detail = detail or {}  # game-specific results for the message
+
+    @property
+    def net(self):
+        return self.payout - self.stake
+
+    @property
+    def won(self):
+        return self.payout > self.stake
+
+
+# --- Coinflip ---
+COIN_SIDES = ("head", "tail")
+
+
+def flip_coin(choice, amount, rng=random):
+    side = rng.choice(COIN_SIDES)
+    return Outcome(amount, 2 * amount if side == choice else 0, detail={"side": side})
+
+
+# --- Slots ---
+SLOT_SYMBOLS = ["🍒", "🍋", "💎", "🍀", "7️⃣"]
+SLOT_PAYOUTS = {"🍒": 2, "🍋": 2, "💎": 5, "🍀": 3, "7️⃣": 10}
+SLOT_PAIR_PAYOUT = 1.5
+
+
+def spin_slots(amount, rng=random):
+    reels = [rng.choice(SLOT_SYMBOLS) for _ in range(3)]
+    if reels.count(reels[0]) == 3:
+        kind, winnings = "jackpot", amount * SLOT_PAYOUTS.get(reels[0], 2)
+    elif reels.count(reels[0]) == 2 or reels.count(reels[1]) == 2:
+        kind, winnings = "pair", int(amount * SLOT_PAIR_PAYOUT)
+    else:
+        kind, winnings = "loss", 0
+    return Outcome(amount, winnings, detail={"reels": reels, "kind": kind})
+
+
+# --- Color game ---
+COLOR_NAMES = ["green", "yellow", "pink"]
+
+
+def roll_colors(bet_amount, chosen_colors, rng=random):
+    """``bet_amount`` on each of ``chosen_colors``; each color pays the bet once per die that shows it."""
+    roll = [rng.choice(COLOR_NAMES) for _ in range(3)]
+    per_color = {color: bet_amount * roll.count(color) for color in chosen_colors}
+    return Outcome(
+        bet_amount * len(chosen_colors),
+        sum(per_color.values()),
+        detail={"roll": roll, "per_color": per_color},
+    )
+
+
+# --- Cockfight ---
+def fight(amount, rng=random):
+    """Even odds; a lost fight also costs one chicken."""
+    if rng.choice([True, False]):
+        return Outcome(amount, 2 * amount)
+    return Outcome(amount, 0, inc={"chickens_owned": -1})
+
+
+# --- Blackjack ---
+CARDS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]
+
+
+def draw_card(rng=random):
+    return rng.choice(CARDS)
+
+
+def hand_score(hand):
+    """Hand total, counting aces (11) as 1 while the hand would bust."""
+    score = sum(hand)
+    aces = hand.count(11)
+    while score > 21 and aces:
+        score -= 10
+        aces -= 1
+    return score
+
+
+def play_dealer(dealer_hand, rng=random):
+    """The dealer draws to 17."""
+    while hand_score(dealer_hand) < 17:
+        dealer_hand.append(draw_card(rng))
+    return dealer_hand
+
+
+def blackjack_payout(bet, player_score, dealer_score):
+    """Credit owed for a finished hand whose bet was already debited: 2x on a win, the bet back on a tie."""
+    if player_score > 21:
+        return 0
+    if dealer_score > 21 or player_score > dealer_score:
+        return 2 * bet
+    if player_score == dealer_score:
+        return bet
+    return 0
@@ -0,0 +1,99 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+
+# Indexes each cog relies on, keyed by the Database attribute of the collection
+INDEXES = {
+    "users": [
+        # core.leaderboard.keyset_page seeks on (balance, _id) and only projects
+        # those two fields, so deep leaderboard pages are covered by this index
+        {"keys": [("balance", DESCENDING), ("_id", ASCENDING)], "name": "balance_desc_id"},
+    ],
+    "ledger": [
+        # tools/ledger.py replays one user's entries in order
+        {"keys": [("u", ASCENDING), ("t", ASCENDING)], "name": "user_time"},
+    ],
+    "customroles": [
+        # CustomRole.check_expiry scans for expired entries every hour
+        {"keys": [("expires_at", ASCENDING)], "name": "expires_at"},
+    ],
+    "autoresponders": [
+        # AutoResponder.on_message loads a guild's keywords on every message
+        {"keys": [("guild_id", ASCENDING), ("keyword", ASCENDING)], "name": "guild_keyword", "unique": True},
+    ],
+    "stickies": [
+        # StickyCog.get_sticky looks up the channel on every message
+        {"keys": [("channel_id", ASCENDING)], "name": "channel_id", "unique": True},
+    ],
+}
+
+# The queries that run often enough that a collection scan would hurt:
+# (label, collection, filter, sort, limit)
+HOT_QUERIES = [
+    ("Leaderboard deep page (keyset)", "users",
+     {"$or": [{"balance": {"$lt": 0}}, {"balance": 0, "_id": {"$gt": 0}}]}, [("balance", DESCENDING), ("_id", ASCENDING)], 8),
+    ("Economy.get_user", "users", {"_id": 0}, None, 1),
+    ("CustomRole.check_expiry", "customroles", {"expires_at": {"$lte": 0}}, None, 0),
+    ("AutoResponder.on_message", "autoresponders", {"guild_id": 0}, None, 0),
+    ("StickyCog.get_sticky", "stickies", {"channel_id": 0}, None, 1),
+]
+
+
+async def ensure_indexes(db):
+    """Create every declared index. Run once at startup; existing indexes are left alone."""
+    for collection_name, indexes in INDEXES.items():
+        collection = getattr(db, collection_name)
+        for index in indexes:
+            try:
+                await collection.create_index(
+                    index["keys"], name=index["name"], unique=index.get("unique", False)
+                )
+            except PyMongoError as e:
+                # e.g. existing duplicates blocking a unique index; the bot still works without it
+                print(f"[Indexes] Could not create {collection_name}.{index['name']}: {e}")
+    print("[Indexes] Index bootstrap complete.")
+
+
+def _plan_stages(plan):
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+async def audit_indexes(db):
+    """
+    Run ``explain()`` on every hot query and report how it was executed.
+
+    Returns one dict per query with the stages of the winning plan, whether
+    it fell back to a collection scan, and the keys/documents examined.
+    """
+    report = []
+    for label, collection_name, query, sort, limit in HOT_QUERIES:
+        cursor = getattr(db, collection_name).find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        try:
+            plan = await cursor.explain()
+        except PyMongoError as e:
+            report.append({"query": label, "error": str(e)})
+            continue
+
+        stages = _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+        stats = plan.get("executionStats", {})
+        report.append({
+            "query": label,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "keys_examined": stats.get("totalKeysExamined"),
+            "docs_examined": stats.get("totalDocsExamined"),
+        })
+    return report
@@ -0,0 +1,207 @@
+import asyncio
+from core.ranking import BalanceRanks
+
+
+class TopBalances:
+    """
+    Every user's balance, kept ranked in memory for the leaderboard and
+    ``/rank``.
+
+    Seeded once from ``hxhbot.users`` at startup and then kept current from
+    the balance changes ``Economy`` reports, so ``/leaderboard`` never
+    queries the database. Writes made outside ``Economy`` (tools, manual
+    fixes) are picked up by a full reload every ``reconcile_interval``
+    seconds. Changes made while a reload streams the collection are carried
+    into the new copy for users it has already read; only a change racing
+    the read of that very user by less than the write buffer's flush interval
+    can be off until the next reconcile.
+    """
+
+    def __init__(self, users, economy, reconcile_interval=600):
+        self.users = users
+        self.economy = economy
+        self.reconcile_interval = reconcile_interval
+
+        self._balances = {}  # user id -> balance
+        self._ranks = BalanceRanks()
+        self._loading = None  # balances read so far by a running reload
+        self._task = None
+        self.ready = False
+
+        self.reconciles = 0
+        self.drift = 0  # users whose balance was off at the last reconcile
+
+        economy.add_balance_listener(self.apply)
+
+    def __len__(self):
+        return len(self._ranks)
+
+    async def _load(self):
+        # Get buffered payouts into the database so the read below sees them
+        await self.economy.flush()
+
+        balances = self._loading = {}
+        try:
+            cursor = self.users.find({"balance": {"$exists": True}}, {"balance": 1})
+            async for doc in cursor:
+                user_id = int(doc["_id"])
+                balances[user_id] = balances.get(user_id, 0) + int(doc.get("balance", 0))
+        finally:
+            self._loading = None
+        return balances
+
+    async def reload(self):
+        balances = await self._load()
+        if self.ready:
+            self.drift = sum(1 for user_id, balance in balances.items() if self._balances.get(user_id) != balance)
+            self.reconciles += 1
+        ranks = BalanceRanks()
+        for user_id, balance in balances.items():
+            ranks.add(user_id, balance)
+        self._balances, self._ranks = balances, ranks
+        self.ready = True
+        print(f"[TopBalances] Loaded {len(ranks):,} balances (drift: {self.drift}).")
+
+    def apply(self, user_id, delta):
+        """Economy balance listener: move a user to their new position."""
+        if not delta:
+            return
+        if self._loading is not None and user_id in self._loading:
+            self._loading[user_id] += delta
+        if not self.ready:
+            return
+        old = self._balances.get(user_id)
+        if old is not None:
+            self._ranks.remove(user_id, old)
+        new = (old or 0) + delta
+        self._balances[user_id] = new
+        self._ranks.add(user_id, new)
+
+    def page(self, start, count):
+        """``count`` users from the ``start``-th richest (0-based) as ``{"_id", "balance"}`` dicts."""
+        return [{"_id": user_id, "balance": balance} for user_id, balance in self._ranks.slice(start, count)]
+
+    def top(self, count):
+        """The ``count`` richest users, richest first."""
+        return self.page(0, count)
+
+    def page_within(self, user_ids, start, count):
+        """Like :meth:`page`, counting only users in the set ``user_ids`` (e.g. a guild's members)."""
+        if len(user_ids) * 8 < len(self._ranks):
+            # A small set: rank its own members rather than walk past everyone else
+            rows = sorted(
+                (-balance, user_id) for user_id in user_ids
+                if (balance := self._balances.get(user_id)) is not None
+            )
+            return [{"_id": user_id, "balance": -negative} for negative, user_id in rows[start:start + count]]
+
+        rows, skipped, index = [], 0, 0
+        while len(rows) < count and index < len(self._ranks):
+            for user_id, balance in self._ranks.slice(index, 256):
+                if user_id not in user_ids:
+                    continue
+                if skipped < start:
+                    skipped += 1
+                elif len(rows) < count:
+                    rows.append({"_id": user_id, "balance": balance})
+            index += 256
+        return rows
+
+    def key_at(self, index):
+        """
+        ``(balance, user id)`` of the ``index``-th richest user (0-based), the
+        seek key :func:`keyset_page` starts a page from, or ``None`` past the end.
+        """
+        try:
+            user_id, balance = self._ranks.select(index)
+        except IndexError:
+            return None
+        return balance, user_id
+
+    def balance(self, user_id):
+        return self._balances.get(int(user_id))
+
+    def rank(self, user_id):
+        """1-based rank of a user, or ``None`` if they have no balance yet."""
+        user_id = int(user_id)
+        balance = self._balances.get(user_id)
+        if balance is None:
+            return None
+        return self._ranks.rank(user_id, balance)
+
+    def around(self, user_id, radius=2):
+        """
+        ``(rank of the first row, rows)`` for the users ranked up to ``radius``
+        places above and below a user, or ``None`` if they have no balance.
+        """
+        rank = self.rank(user_id)
+        if rank is None:
+            return None
+        first = max(rank - 1 - radius, 0)
+        return first + 1, self.page(first, 2 * radius + 1)
+
+    def percentile(self, user_id):
+        """Share of users (0-100] ranked at or above a user: 1.0 means the top 1%."""
+        rank = self.rank(user_id)
+        if rank is None:
+            return None
+        return 100 * rank / len(self._ranks)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"[TopBalances] Reconcile failed: {e}")
+
+    async def start(self):
+        await self.reload()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# --- Keyset pagination over hxhbot.users, richest first ---
+# Pages are read with a seek on the (balance desc, _id asc) index rather than
+# skip(), so page 10,000 costs the same as page one: at most ``limit``
+# index entries, and the projection is covered by the index.
+KEYSET_SORT = [("balance", -1), ("_id", 1)]
+
+
+async def keyset_page(users, after=None, before=None, at=None, limit=8):
+    """
+    One page of ``{"_id", "balance"}`` rows in leaderboard order.
+
+    ``after`` / ``before`` are the ``(balance, _id)`` of the row just above /
+    below the wanted page; ``at`` is the key of the page's first row (from
+    ``BalanceRanks.select`` when jumping to a page). With none of them the
+    first page is returned.
+    """
+    if before is not None:
+        balance, user_id = before
+        query = {"$or": [{"balance": {"$gt": balance}}, {"balance": balance, "_id": {"$lt": user_id}}]}
+        sort = [(field, -direction) for field, direction in KEYSET_SORT]
+    else:
+        sort = KEYSET_SORT
+        if after is not None:
+            balance, user_id = after
+            query = {"$or": [{"balance": {"$lt": balance}}, {"balance": balance, "_id": {"$gt": user_id}}]}
+        elif at is not None:
+            balance, user_id = at
+            query = {"$or": [{"balance": {"$lt": balance}}, {"balance": balance, "_id": {"$gte": user_id}}]}
+        else:
+            query = {"balance": {"$exists": True}}
+
+    rows = await users.find(query, {"balance": 1}).sort(sort).limit(limit).to_list(length=limit)
+    if before is not None:
+        rows.reverse()
+    return rows
@@ -0,0 +1,108 @@
+import asyncio
+from contextvars import ContextVar
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+
+# (source, ref) of the command currently running: the command name and the
+# interaction or message id that triggered it. Set by the hooks in main.py,
+# so every balance change made while handling a command is attributed to it.
+_source = ContextVar("ledger_source", default=("unknown", None))
+
+# Source of the entry that adds a legacy string-id document's balance when it
+# is merged into the int64 one (core/economy.py, tools/migrate_users.py)
+MIGRATION = "migration"
+
+
+def set_source(source, ref=None):
+    _source.set((source, ref))
+
+
+def current_source():
+    return _source.get()
+
+
+class Ledger:
+    """
+    Append-only record of every balance change, in ``hxhbot.ledger``.
+
+    Each entry is ``{u: user id, d: balance delta, s: source, r: interaction
+    or message id, t: UTC time}``. Summing ``d`` per user gives their balance
+    (``tools/ledger.py`` rebuilds or verifies ``hxhbot.users`` that way).
+    Entries are buffered and written with unordered ``insert_many``; a batch
+    that fails is kept and retried on the next flush, never dropped.
+    """
+
+    def __init__(self, collection, interval=1.0, max_entries=1000):
+        self.collection = collection
+        self.interval = interval
+        self.max_entries = max_entries
+        self.pending = []
+
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+
+        self.entries_recorded = 0
+        self.entries_written = 0
+        self.batches = 0
+
+    def record(self, user_id, delta, source=None, ref=None):
+        if not delta:
+            return
+        if source is None:
+            source, ref = current_source()
+        self.pending.append({"u": int(user_id), "d": delta, "s": source, "r": ref, "t": datetime.utcnow()})
+        self.entries_recorded += 1
+        if len(self.pending) >= self.max_entries:
+            self._wake.set()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            batch, self.pending = self.pending, []
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self.entries_written += len(batch)
+            except BulkWriteError as e:
+                # Unordered: only the reported entries are missing
+                failed = [error["index"] for error in e.details.get("writeErrors", [])]
+                print(f"[Ledger] {len(failed)} of {len(batch)} entries failed, requeueing them.")
+                self.entries_written += len(batch) - len(failed)
+                self.pending[:0] = [batch[index] for index in failed]
+            except asyncio.CancelledError:
+                # Cancelled mid-write (e.g. by stop()): keep the batch for the next flush
+                self.pending[:0] = batch
+                raise
+            except Exception as e:
+                print(f"[Ledger] Flush failed, requeueing {len(batch)} entries: {e}")
+                self.pending[:0] = batch
+            finally:
+                self.batches += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[Ledger] Unexpected flush error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
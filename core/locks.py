@@ -0,0 +1,63 @@
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+
+class UserLocks:
+    """
+    One ``asyncio.Lock`` per user id, so a user's economy commands run one at
+    a time while different users never wait on each other.
+
+    Attached to the bot as ``bot.user_locks``. Cogs hold a user's lock around
+    a whole bet (charge, animation, result), so firing ten bets at once plays
+    them one after another. Locks are held in a ``WeakValueDictionary``: a
+    lock disappears as soon as nobody holds or waits on it, so memory only
+    grows with the number of users currently playing.
+
+    Locks are not re-entrant and ``Economy`` never takes them itself; only
+    cogs do, once per command.
+    """
+
+    def __init__(self):
+        self._locks = weakref.WeakValueDictionary()  # user id -> asyncio.Lock
+
+        self.acquisitions = 0
+        self.contended = 0  # acquisitions that had to wait for another command
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def __len__(self):
+        return len(self._locks)
+
+    def get(self, user_id):
+        user_id = int(user_id)
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def hold(self, *user_ids):
+        """
+        Hold the locks of one or more users. Several locks are always taken
+        in id order, so two commands locking the same pair cannot deadlock.
+        """
+        locks = [self.get(user_id) for user_id in sorted({int(user_id) for user_id in user_ids})]
+        acquired = []
+        try:
+            for lock in locks:
+                started = time.perf_counter()
+                if lock.locked():
+                    self.contended += 1
+                await lock.acquire()
+                acquired.append(lock)
+
+                waited = time.perf_counter() - started
+                self.acquisitions += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
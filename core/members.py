@@ -0,0 +1,31 @@
+class GuildMembers:
+    """
+    Member ids of every guild the bot is in, as plain sets.
+
+    Seeded from each guild's member cache and kept current from join and
+    leave events (see the Leaderboard cog), so guild-scoped rankings can
+    filter the global balance ordering with set lookups.
+    """
+
+    def __init__(self):
+        self._members = {}  # guild id -> {member id}
+
+    def load(self, guild):
+        self._members[guild.id] = {member.id for member in guild.members}
+
+    def forget(self, guild_id):
+        self._members.pop(guild_id, None)
+
+    def add(self, guild_id, member_id):
+        members = self._members.get(guild_id)
+        if members is not None:
+            members.add(member_id)
+
+    def discard(self, guild_id, member_id):
+        members = self._members.get(guild_id)
+        if members is not None:
+            members.discard(member_id)
+
+    def get(self, guild_id):
+        """The member id set of a guild, or ``None`` if it has not been loaded."""
+        return self._members.get(guild_id)
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import TypedDict
+
+
+class AfkStatus(TypedDict):
+    reason: str | None
+    time: datetime
+
+
+class Cooldowns(TypedDict, total=False):
+    """Epoch second each cooldown ends at."""
+    work: int
+    daily: int
+    rob: int
+    anti_rob: int
+
+
+class UserDocument(TypedDict, total=False):
+    """Shape of a document in ``hxhbot.users`` (see ``core.schema`` for the legacy shape)."""
+    _id: int
+    balance: int
+    afk: AfkStatus
+    cooldowns: Cooldowns
+    legacy_merged: bool
+    anti_rob_items: int
+    chickens_owned: int
+    custom_roles: int
+    custom_role_items: int
+
+
+class Fields(frozenset):
+    """
+    The user document fields a command reads.
+
+    Passed to ``Economy.get_user`` so only those fields travel over the wire
+    and get decoded. Unknown field names fail at import time rather than
+    silently coming back empty.
+    """
+
+    def __new__(cls, *names):
+        unknown = set(names) - set(UserDocument.__annotations__)
+        if unknown:
+            raise ValueError(f"Unknown user document field(s): {', '.join(sorted(unknown))}")
+        return super().__new__(cls, names)
+
+    @property
+    def spec(self):
+        return {name: 1 for name in self}
+
+
+BALANCE = Fields("balance")
+AFK = Fields("afk")
+WORK = Fields("balance", "cooldowns")
+DAILY = Fields("cooldowns")
+ROBBER = Fields("cooldowns")
+ROB_TARGET = Fields("balance", "cooldowns")
+COCKFIGHT = Fields("balance", "chickens_owned")
+USE_ITEM = Fields("anti_rob_items", "cooldowns")
+INVENTORY = Fields(
+    "balance", "chickens_owned", "anti_rob_items", "custom_role_items", "cooldowns"
+)
+CUSTOM_ROLE_TOKENS = Fields("custom_role_items")
+ECONOMY_STATS = Fields(
+    "balance", "chickens_owned", "anti_rob_items", "custom_roles", "custom_role_items"
+)
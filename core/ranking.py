@@ -0,0 +1,111 @@
+from bisect import bisect_left, insort
+
+# Balances below 256 get a bucket each; above that, each power of two is
+# split into 128 buckets, so a bucket never spans more than 1/128 of its
+# values and every bucket stays small no matter how skewed balances get.
+EXACT_BUCKETS = 256
+SUB_BUCKETS = 128
+BUCKETS = EXACT_BUCKETS + 64 * SUB_BUCKETS
+
+
+def bucket_of(balance):
+    """Bucket index for a balance; larger balances never map to smaller buckets."""
+    if balance < EXACT_BUCKETS:
+        return max(balance, 0)
+    shift = balance.bit_length() - 8
+    top = balance >> shift  # the leading 8 bits, 128..255
+    return min(EXACT_BUCKETS + (shift - 1) * SUB_BUCKETS + (top - SUB_BUCKETS), BUCKETS - 1)
+
+
+class BalanceRanks:
+    """
+    Order-statistic index over balances, richest first, ties by user id.
+
+    Users are grouped into logarithmic balance buckets, each a small sorted
+    list, and a Fenwick tree counts users per bucket. Rank lookups, moving a
+    user and selecting the k-th richest user all cost O(log buckets) plus a
+    bisect within one bucket.
+    """
+
+    def __init__(self):
+        self._tree = [0] * (BUCKETS + 1)
+        self._buckets = {}  # bucket -> sorted [(-balance, user id)]
+        self._size = 0
+        self._top_bit = 1 << (BUCKETS.bit_length() - 1)
+
+    def __len__(self):
+        return self._size
+
+    def _add_count(self, bucket, delta):
+        i = bucket + 1
+        while i <= BUCKETS:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_upto(self, bucket):
+        """Users in buckets 0..bucket."""
+        i, total = bucket + 1, 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _lower_bound(self, count):
+        """Smallest bucket whose cumulative count reaches ``count``."""
+        pos, remaining, step = 0, count, self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= BUCKETS and self._tree[nxt] < remaining:
+                pos = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return pos  # 0-based bucket index
+
+    def add(self, user_id, balance):
+        bucket = bucket_of(balance)
+        insort(self._buckets.setdefault(bucket, []), (-balance, user_id))
+        self._add_count(bucket, 1)
+        self._size += 1
+
+    def remove(self, user_id, balance):
+        bucket = bucket_of(balance)
+        entries = self._buckets.get(bucket)
+        key = (-balance, user_id)
+        if entries:
+            index = bisect_left(entries, key)
+            if index < len(entries) and entries[index] == key:
+                del entries[index]
+                if not entries:
+                    del self._buckets[bucket]
+                self._add_count(bucket, -1)
+                self._size -= 1
+
+    def rank(self, user_id, balance):
+        """1-based position of a user holding ``balance``, counting from the richest."""
+        bucket = bucket_of(balance)
+        richer = self._size - self._count_upto(bucket)
+        return richer + bisect_left(self._buckets.get(bucket, []), (-balance, user_id)) + 1
+
+    def select(self, index):
+        """``(user id, balance)`` of the ``index``-th richest user (0-based)."""
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        bucket = self._lower_bound(self._size - index)
+        offset = index - (self._size - self._count_upto(bucket))
+        negative, user_id = self._buckets[bucket][offset]
+        return user_id, -negative
+
+    def slice(self, start, count):
+        """Up to ``count`` ``(user id, balance)`` pairs from the ``start``-th richest (0-based)."""
+        result = []
+        start = max(start, 0)
+        end = min(start + count, self._size)
+        index = start
+        while index < end:
+            # Jump to the bucket holding this position, then read it off in order
+            bucket = self._lower_bound(self._size - index)
+            offset = index - (self._size - self._count_upto(bucket))
+            for negative, user_id in self._buckets[bucket][offset:offset + end - index]:
+                result.append((user_id, -negative))
+            index = start + len(result)
+        return result
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+DAILY_COOLDOWN_SECONDS = 24 * 60 * 60
+
+# Legacy top-level cooldown fields and the key each one moves to under the
+# compact ``cooldowns`` subdocument. Every cooldown is stored as the epoch
+# second it ends at.
+LEGACY_COOLDOWNS = {
+    "next_work_time": "work",         # float epoch (Work)
+    "last_claim": "daily",            # naive UTC datetime of the last claim (Daily)
+    "rob_cooldown": "rob",            # naive UTC datetime the cooldown ends (Rob)
+    "anti_rob_expires_at": "anti_rob",  # naive UTC datetime the shield ends (Use)
+}
+
+
+def to_epoch(value):
+    """Epoch seconds for a float/int epoch or a naive-UTC / aware datetime."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def from_epoch(value):
+    """Naive UTC datetime for an epoch, for code that still does datetime arithmetic."""
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None) if value else None
+
+
+def normalize_user(user_data):
+    """
+    Convert a legacy ``hxhbot.users`` document to the current shape: an int64
+    ``_id`` and a single ``cooldowns`` subdocument of epoch ints. Documents
+    already in the current shape come back unchanged.
+    """
+    user_data = dict(user_data)
+    user_data["_id"] = int(user_data["_id"])
+
+    cooldowns = dict(user_data.get("cooldowns") or {})
+    for field, key in LEGACY_COOLDOWNS.items():
+        if field not in user_data:
+            continue
+        value = user_data.pop(field)
+        if value is None:
+            continue
+        ends_at = to_epoch(value)
+        if field == "last_claim":
+            ends_at += DAILY_COOLDOWN_SECONDS
+        cooldowns[key] = max(ends_at, cooldowns.get(key, 0))
+
+    if cooldowns:
+        user_data["cooldowns"] = cooldowns
+    return user_data
+
+
+# Counters that may already exist on both the legacy and the int64 document
+# (e.g. a payout flushed under the new id mid-migration); these are summed.
+COUNTERS = ("balance", "anti_rob_items", "chickens_owned", "custom_roles", "custom_role_items")
+
+
+def migration_filter(user_data):
+    """
+    Filter for the int64 counterpart of a legacy document.
+
+    It only matches while that document has not had a legacy copy merged in,
+    so replaying the merge upserts into the existing ``_id`` and fails with a
+    duplicate key error instead of adding the counters twice.
+    """
+    return {"_id": int(user_data["_id"]), "legacy_merged": {"$ne": True}}
+
+
+def migration_update(user_data):
+    """
+    The update that folds a legacy document into its int64 counterpart.
+
+    Counters are added, cooldowns keep whichever ends later and everything
+    else is only written when the int64 document does not exist yet, so it is
+    safe to apply whether or not the bot already created the new document.
+    """
+    user_data = normalize_user(user_data)
+    user_data.pop("_id")
+
+    update = {"$set": {"legacy_merged": True}}
+    for field in COUNTERS:
+        if field in user_data:
+            update.setdefault("$inc", {})[field] = user_data.pop(field)
+    for key, ends_at in user_data.pop("cooldowns", {}).items():
+        update.setdefault("$max", {})[f"cooldowns.{key}"] = ends_at
+    if user_data:
+        update["$setOnInsert"] = user_data
+    return update
@@ -0,0 +1,154 @@
+"""
+Monte Carlo estimates of each wager game's expected value.
+
+The vectorized simulators reproduce the rules in core/games.py with NumPy,
+reading the same payout tables and card lists, and play whole batches of
+rounds per call. :func:`scalar_returns` plays rounds through the real rule
+functions instead; ``tools/house_edge.py`` compares the two so the
+vectorized copy cannot silently drift from the game.
+
+Returns are per coin staked: +1.0 doubles the stake, -1.0 loses it.
+"""
+import random
+import time
+import numpy as np
+from core.games import (
+    CARDS, COIN_SIDES, COLOR_NAMES, SLOT_PAIR_PAYOUT, SLOT_PAYOUTS, SLOT_SYMBOLS,
+    blackjack_payout, draw_card, fight, flip_coin, hand_score, play_dealer, roll_colors, spin_slots,
+)
+
+DEFAULT_BET = 100  # slots round the pair payout down, so the bet size matters slightly
+BLACKJACK_STAND_ON = 17  # simulated players hit below this, like the dealer
+MAX_HAND = 12  # cards drawn per hand; running out needs twelve low cards in a row
+
+
+def coinflip_returns(rng, rounds, bet=DEFAULT_BET):
+    won = rng.integers(0, len(COIN_SIDES), rounds) == 0
+    return np.where(won, 1.0, -1.0)
+
+
+def slots_returns(rng, rounds, bet=DEFAULT_BET):
+    reels = rng.integers(0, len(SLOT_SYMBOLS), (rounds, 3))
+    a, b, c = reels[:, 0], reels[:, 1], reels[:, 2]
+    triple = (a == b) & (b == c)
+    pair = ~triple & ((a == b) | (a == c) | (b == c))
+
+    jackpot = np.array([SLOT_PAYOUTS.get(symbol, 2) for symbol in SLOT_SYMBOLS]) * bet
+    payout = np.where(triple, jackpot[a], np.where(pair, int(bet * SLOT_PAIR_PAYOUT), 0))
+    return payout / bet - 1.0
+
+
+def colorgame_returns(rng, rounds, bet=DEFAULT_BET, colors=1):
+    roll = rng.integers(0, len(COLOR_NAMES), (rounds, 3))
+    # Bets on the first `colors` colors; the dice are symmetric, so which ones does not matter
+    hits = sum((roll == color).sum(axis=1) for color in range(colors))
+    return hits / colors - 1.0
+
+
+def cockfight_returns(rng, rounds, bet=DEFAULT_BET):
+    """Coins only; a lost fight also costs a chicken, which is not counted here."""
+    return np.where(rng.integers(0, 2, rounds) == 1, 1.0, -1.0)
+
+
+def _hand_scores(cards):
+    """Score after each card of every hand (rows), counting aces as 1 where 11 would bust."""
+    totals = np.cumsum(cards, axis=1, dtype=np.int16)
+    aces = np.cumsum(cards == 11, axis=1, dtype=np.int16)
+    # Each ace counted as 1 takes 10 off; only as many as it takes to get to 21
+    reductions = np.minimum(aces, np.maximum((totals - 12) // 10, 0))
+    return totals - 10 * reductions
+
+
+def _final_scores(cards, stand_on):
+    """Score of each hand once it reaches ``stand_on`` (or runs out of cards); the first two cards are always dealt."""
+    scores = _hand_scores(cards)
+    done = scores >= stand_on
+    done[:, 0] = False
+    stop = np.where(done.any(axis=1), done.argmax(axis=1), cards.shape[1] - 1)
+    return scores[np.arange(len(cards)), stop]
+
+
+def blackjack_returns(rng, rounds, bet=DEFAULT_BET, stand_on=BLACKJACK_STAND_ON):
+    deck = np.array(CARDS, dtype=np.int16)
+    player = _final_scores(deck[rng.integers(0, len(deck), (rounds, MAX_HAND), dtype=np.int8)], stand_on)
+    dealer = _final_scores(deck[rng.integers(0, len(deck), (rounds, MAX_HAND), dtype=np.int8)], 17)
+
+    # blackjack_payout, vectorized: the bet was debited up front
+    payout = np.where(
+        player > 21, 0,
+        np.where((dealer > 21) | (player > dealer), 2, np.where(player == dealer, 1, 0))
+    )
+    return payout - 1.0
+
+
+SIMULATORS = {
+    "coinflip": coinflip_returns,
+    "slots": slots_returns,
+    "colorgame": colorgame_returns,
+    "cockfight": cockfight_returns,
+    "blackjack": blackjack_returns,
+}
+
+
+def _blackjack_round(bet, rng, stand_on=BLACKJACK_STAND_ON):
+    player = [draw_card(rng), draw_card(rng)]
+    while hand_score(player) < stand_on:
+        player.append(draw_card(rng))
+    dealer = play_dealer([draw_card(rng), draw_card(rng)], rng)
+    return blackjack_payout(bet, hand_score(player), hand_score(dealer)) / bet - 1.0
+
+
+SCALAR_ROUNDS = {
+    "coinflip": lambda bet, rng: flip_coin(COIN_SIDES[0], bet, rng).net / bet,
+    "slots": lambda bet, rng: spin_slots(bet, rng).net / bet,
+    "colorgame": lambda bet, rng: roll_colors(bet, COLOR_NAMES[:1], rng).net / bet,
+    "cockfight": lambda bet, rng: fight(bet, rng).net / bet,
+    "blackjack": _blackjack_round,
+}
+
+
+def scalar_returns(game, rounds, bet=DEFAULT_BET, seed=None):
+    """Returns of ``rounds`` rounds played one at a time through core/games.py."""
+    rng = random.Random(seed)
+    play = SCALAR_ROUNDS[game]
+    return np.fromiter((play(bet, rng) for _ in range(rounds)), dtype=np.float64, count=rounds)
+
+
+def summarize(returns):
+    """Expected value, variance and standard error per coin staked."""
+    mean = float(returns.mean())
+    variance = float(returns.var())
+    return {
+        "rounds": len(returns),
+        "ev": mean,
+        "house_edge": -mean,
+        "variance": variance,
+        "std_error": (variance / len(returns)) ** 0.5,
+    }
+
+
+def simulate(game, rounds, bet=DEFAULT_BET, seed=None, batch=1_000_000):
+    """Play ``rounds`` rounds of a game in batches and summarize them, with the achieved speed."""
+    rng = np.random.default_rng(seed)
+    simulator = SIMULATORS[game]
+    started = time.perf_counter()
+    total = total_sq = 0.0
+    played = 0
+    while played < rounds:
+        returns = simulator(rng, min(batch, rounds - played), bet)
+        total += float(returns.sum())
+        total_sq += float(np.square(returns).sum())
+        played += len(returns)
+    seconds = time.perf_counter() - started
+
+    mean = total / played
+    variance = max(total_sq / played - mean * mean, 0.0)
+    return {
+        "rounds": played,
+        "ev": mean,
+        "house_edge": -mean,
+        "variance": variance,
+        "std_error": (variance / played) ** 0.5,
+        "seconds": seconds,
+        "rounds_per_second": played / seconds if seconds else float("inf"),
+    }
@@ -0,0 +1,22 @@
+"""
+Storage backends behind ``core.database.Database``.
+
+Each backend hands out collections with the Motor API the cogs use
+(``find_one``, ``find`` with ``sort``/``limit``, ``update_one``,
+``find_one_and_update``, ``insert_one``, ``delete_one``, ``delete_many``,
+``bulk_write``, ...). ``mongo`` is the production backend; ``memory`` and
+``sqlite`` run the bot, load tests and benchmarks without a MongoDB server.
+"""
+
+
+def open_backend(kind, url=None, sqlite_path=None, max_pool_size=50):
+    if kind == "mongo":
+        from core.storage.mongo import MongoBackend
+        return MongoBackend(url, max_pool_size=max_pool_size)
+    if kind == "memory":
+        from core.storage.memory import MemoryBackend
+        return MemoryBackend()
+    if kind == "sqlite":
+        from core.storage.sqlite import SQLiteBackend
+        return SQLiteBackend(sqlite_path)
+    raise ValueError(f"Unknown storage backend {kind!r} (expected mongo, memory or sqlite)")
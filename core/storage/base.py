@@ -0,0 +1,354 @@
+import copy
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+from core.storage.query import apply_update, get_path, matches, new_id, normalize_sort, project, sort_documents, upsert_seed
+
+
+class Cursor:
+    """The chainable part of a Motor cursor: ``sort``, ``skip``, ``limit``, ``to_list`` and ``async for``."""
+
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    async def to_list(self, length=None):
+        limit = self._limit
+        if length:
+            limit = min(limit, length) if limit else length
+        return await self.collection._run(
+            self.collection._find, self.query, self.projection, self._sort, self._skip, limit
+        )
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list():
+            yield doc
+
+    async def explain(self):
+        return await self.collection._run(self.collection._explain, self.query, self._sort)
+
+
+class DocumentCollection:
+    """
+    A collection with the Motor API the cogs use, on top of a key/value store
+    of documents.
+
+    Subclasses provide storage through ``_get``, ``_scan``, ``_put`` and
+    ``_remove``, and ``_run``, which executes one of the synchronous
+    operations below atomically. The operations themselves follow MongoDB:
+    they take the same arguments, return pymongo result objects and raise
+    pymongo errors, so cogs need no backend-specific code.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        # index name -> key fields, for unique indexes only
+        self._unique = {}
+        # index name -> {key value: _id of the document holding it}, so a write
+        # checks uniqueness with one lookup per index instead of a scan
+        self._unique_keys = {}
+
+    # --- storage primitives ---
+
+    def _get(self, _id):
+        raise NotImplementedError
+
+    def _scan(self):
+        raise NotImplementedError
+
+    def _put(self, doc):
+        raise NotImplementedError
+
+    def _remove(self, _id):
+        raise NotImplementedError
+
+    async def _run(self, operation, *args):
+        raise NotImplementedError
+
+    # --- helpers ---
+
+    def _candidates(self, query):
+        # Fast path for lookups by _id, the bot's most common query
+        _id = (query or {}).get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            doc = self._get(_id)
+            return [doc] if doc is not None and matches(doc, query) else []
+        return [doc for doc in self._scan() if matches(doc, query)]
+
+    def _first(self, query, sort=None):
+        docs = self._candidates(query)
+        if sort:
+            sort_documents(docs, normalize_sort(sort))
+        return docs[0] if docs else None
+
+    @staticmethod
+    def _index_key(doc, fields):
+        # repr keeps 1 and "1" apart, as MongoDB does
+        return repr([get_path(doc, field) for field in fields])
+
+    def _check_unique(self, doc):
+        for name, fields in self._unique.items():
+            holder = self._unique_keys[name].get(self._index_key(doc, fields), doc["_id"])
+            if holder != doc["_id"]:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}", 11000)
+
+    def _store(self, doc):
+        self._check_unique(doc)
+        old = self._get(doc["_id"]) if self._unique else None
+        self._put(doc)
+        for name, fields in self._unique.items():
+            keys = self._unique_keys[name]
+            if old is not None:
+                keys.pop(self._index_key(old, fields), None)
+            keys[self._index_key(doc, fields)] = doc["_id"]
+
+    def _delete_doc(self, doc):
+        self._remove(doc["_id"])
+        for name, fields in self._unique.items():
+            self._unique_keys[name].pop(self._index_key(doc, fields), None)
+
+    def _rebuild_unique_keys(self):
+        """Re-read every unique index's keys, e.g. after a transaction was rolled back."""
+        for name, fields in self._unique.items():
+            self._unique_keys[name] = {self._index_key(doc, fields): doc["_id"] for doc in self._scan()}
+
+    def _insert(self, doc):
+        doc = copy.deepcopy(doc)
+        doc = {"_id": doc.pop("_id") if "_id" in doc else new_id(), **doc}
+        if self._get(doc["_id"]) is not None:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.name} index: _id_ dup key: {{ _id: {doc['_id']!r} }}",
+                11000
+            )
+        self._store(doc)
+        return doc["_id"]
+
+    def _update(self, query, update, upsert, multi):
+        """Returns ``(matched, modified, upserted_id, [documents after the update])``."""
+        docs = self._candidates(query)
+        if not multi:
+            docs = docs[:1]
+
+        if not docs:
+            if not upsert:
+                return 0, 0, None, []
+            doc = upsert_seed(query)
+            apply_update(doc, update, inserting=True)
+            _id = self._insert(doc)
+            return 0, 0, _id, [self._get(_id)]
+
+        modified = 0
+        for doc in docs:
+            updated = copy.deepcopy(doc)
+            if apply_update(updated, update):
+                self._store(updated)
+                modified += 1
+        return len(docs), modified, None, [self._get(doc["_id"]) for doc in docs]
+
+    # --- synchronous operations, run through _run ---
+
+    def _find(self, query, projection=None, sort=None, skip=0, limit=0):
+        docs = self._candidates(query)
+        if sort:
+            sort_documents(docs, sort)
+        docs = docs[skip:skip + limit] if limit else docs[skip:]
+        return [project(doc, projection) for doc in docs]
+
+    def _find_one(self, query, projection=None):
+        return project(self._first(query), projection)
+
+    def _update_one(self, query, update, upsert=False):
+        matched, modified, upserted_id, _ = self._update(query, update, upsert, multi=False)
+        return _update_result(matched, modified, upserted_id)
+
+    def _update_many(self, query, update, upsert=False):
+        matched, modified, upserted_id, _ = self._update(query, update, upsert, multi=True)
+        return _update_result(matched, modified, upserted_id)
+
+    def _replace_one(self, query, replacement, upsert=False):
+        if any(key.startswith("$") for key in replacement):
+            raise OperationFailure("Replacement document must not contain update operators")
+        matched, modified, upserted_id, _ = self._update(query, replacement, upsert, multi=False)
+        return _update_result(matched, modified, upserted_id)
+
+    def _find_one_and_update(self, query, update, projection=None, sort=None, upsert=False, return_document=False):
+        before = self._first(query, sort)
+        if before is None and not upsert:
+            return None
+        if before is not None:
+            query = {"_id": before["_id"]}
+        _, _, _, after = self._update(query, update, upsert, multi=False)
+        return project(after[0] if return_document else before, projection)
+
+    def _find_one_and_delete(self, query, projection=None, sort=None):
+        doc = self._first(query, sort)
+        if doc is not None:
+            self._delete_doc(doc)
+        return project(doc, projection)
+
+    def _insert_one(self, doc):
+        return InsertOneResult(self._insert(doc), True)
+
+    def _insert_many(self, docs, ordered=True):
+        ids = []
+        errors = []
+        for index, doc in enumerate(docs):
+            try:
+                ids.append(self._insert(doc))
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": doc})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids), "upserted": [],
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0})
+        return InsertManyResult(ids, True)
+
+    def _delete(self, query, multi):
+        docs = self._candidates(query)
+        if not multi:
+            docs = docs[:1]
+        for doc in docs:
+            self._delete_doc(doc)
+        return DeleteResult({"n": len(docs)}, True)
+
+    def _delete_one(self, query):
+        return self._delete(query, multi=False)
+
+    def _delete_many(self, query):
+        return self._delete(query, multi=True)
+
+    def _count_documents(self, query):
+        return len(self._candidates(query))
+
+    def _bulk_write(self, requests, ordered=True):
+        result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+                  "upserted": [], "writeErrors": []}
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                    matched, modified, upserted_id, _ = self._update(
+                        request._filter, request._doc, request._upsert, multi=isinstance(request, UpdateMany)
+                    )
+                    result["nMatched"] += matched
+                    result["nModified"] += modified
+                    if upserted_id is not None:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": index, "_id": upserted_id})
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    result["nRemoved"] += self._delete(request._filter, isinstance(request, DeleteMany)).deleted_count
+                else:
+                    raise OperationFailure(f"Unsupported bulk operation {type(request).__name__}")
+            except (DuplicateKeyError, OperationFailure) as e:
+                result["writeErrors"].append({"index": index, "code": e.code, "errmsg": str(e)})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        del result["writeErrors"]
+        return BulkWriteResult(result, True)
+
+    def _create_index(self, keys, name=None, unique=False):
+        keys = normalize_sort(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        if unique:
+            fields = [field for field, _ in keys]
+            seen = {}
+            for doc in self._scan():
+                value = self._index_key(doc, fields)
+                if value in seen:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}", 11000)
+                seen[value] = doc["_id"]
+            self._unique[name] = fields
+            self._unique_keys[name] = seen
+        return name
+
+    def _explain(self, query, sort):
+        _id = (query or {}).get("_id")
+        by_id = _id is not None and not isinstance(_id, dict)
+        examined = 1 if by_id else sum(1 for _ in self._scan())
+        plan = {"stage": "IDHACK"} if by_id else {"stage": "COLLSCAN", "filter": query}
+        if sort and not by_id:
+            plan = {"stage": "SORT", "inputStage": plan}
+        return {
+            "queryPlanner": {"winningPlan": plan},
+            "executionStats": {"totalKeysExamined": 1 if by_id else 0, "totalDocsExamined": examined},
+        }
+
+    # --- Motor API (``session`` is accepted for compatibility and ignored) ---
+
+    def find(self, filter=None, projection=None, sort=None, skip=0, limit=0, session=None):
+        cursor = Cursor(self, filter, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, filter=None, projection=None, session=None):
+        return await self._run(self._find_one, filter, projection)
+
+    async def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                                  return_document=False, session=None):
+        return await self._run(self._find_one_and_update, filter, update, projection, sort, upsert,
+                               bool(return_document))
+
+    async def find_one_and_delete(self, filter, projection=None, sort=None, session=None):
+        return await self._run(self._find_one_and_delete, filter, projection, sort)
+
+    async def insert_one(self, document, session=None):
+        return await self._run(self._insert_one, document)
+
+    async def insert_many(self, documents, ordered=True, session=None):
+        return await self._run(self._insert_many, list(documents), ordered)
+
+    async def update_one(self, filter, update, upsert=False, session=None):
+        return await self._run(self._update_one, filter, update, upsert)
+
+    async def update_many(self, filter, update, upsert=False, session=None):
+        return await self._run(self._update_many, filter, update, upsert)
+
+    async def replace_one(self, filter, replacement, upsert=False, session=None):
+        return await self._run(self._replace_one, filter, replacement, upsert)
+
+    async def delete_one(self, filter, session=None):
+        return await self._run(self._delete_one, filter)
+
+    async def delete_many(self, filter, session=None):
+        return await self._run(self._delete_many, filter)
+
+    async def count_documents(self, filter, session=None):
+        return await self._run(self._count_documents, filter)
+
+    async def bulk_write(self, requests, ordered=True, session=None):
+        return await self._run(self._bulk_write, list(requests), ordered)
+
+    async def create_index(self, keys, name=None, unique=False, session=None):
+        return await self._run(self._create_index, keys, name, unique)
+
+
+def _update_result(matched, modified, upserted_id):
+    raw = {"n": matched or (1 if upserted_id is not None else 0), "nModified": modified}
+    if upserted_id is not None:
+        raw["upserted"] = upserted_id
+    return UpdateResult(raw, True)
@@ -0,0 +1,43 @@
+from core.storage.base import DocumentCollection
+
+
+class MemoryCollection(DocumentCollection):
+    """
+    A collection held in a dict. Every operation runs to completion without
+    awaiting, so each one is atomic with respect to the event loop.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._docs = {}
+
+    def _get(self, _id):
+        return self._docs.get(_id)
+
+    def _scan(self):
+        return list(self._docs.values())
+
+    def _put(self, doc):
+        self._docs[doc["_id"]] = doc
+
+    def _remove(self, _id):
+        self._docs.pop(_id, None)
+
+    async def _run(self, operation, *args):
+        return operation(*args)
+
+
+class MemoryBackend:
+    """Process-local storage for tests, benchmarks and profiling. Nothing survives a restart."""
+
+    def __init__(self):
+        self._collections = {}
+
+    def collection(self, database, name):
+        key = f"{database}.{name}"
+        if key not in self._collections:
+            self._collections[key] = MemoryCollection(key)
+        return self._collections[key]
+
+    def close(self):
+        self._collections.clear()
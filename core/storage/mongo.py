@@ -0,0 +1,14 @@
+import motor.motor_asyncio
+
+
+class MongoBackend:
+    """MongoDB through one pooled Motor client; collections are plain Motor collections."""
+
+    def __init__(self, url, max_pool_size=50):
+        self.client = motor.motor_asyncio.AsyncIOMotorClient(url, maxPoolSize=max_pool_size)
+
+    def collection(self, database, name):
+        return self.client[database][name]
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,276 @@
+"""
+The subset of MongoDB query and update semantics the bot relies on, for the
+backends that are not MongoDB.
+
+Filters support equality, ``$eq``/``$ne``/``$gt``/``$gte``/``$lt``/``$lte``,
+``$in``/``$nin``, ``$exists``, ``$type`` and ``$and``/``$or``/``$nor``;
+updates support ``$set``/``$unset``/``$inc``/``$min``/``$max`` and
+``$setOnInsert``. Dotted field names are followed into subdocuments. Anything
+else raises ``OperationFailure`` rather than silently doing the wrong thing.
+"""
+import copy
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+_ABSENT = object()
+
+# BSON comparison order between types; values of different types never
+# match a range operator and sort by this rank
+_TYPE_RANK = [
+    (type(None), 1),
+    (bool, 8),  # before int: bool is an int subclass
+    (int, 2),
+    (float, 2),
+    (str, 3),
+    (dict, 4),
+    (list, 5),
+    (bytes, 6),
+    (ObjectId, 7),
+    (datetime, 9),
+]
+
+_TYPE_NAMES = {
+    "double": (float,),
+    "string": (str,),
+    "object": (dict,),
+    "array": (list,),
+    "binData": (bytes,),
+    "objectId": (ObjectId,),
+    "bool": (bool,),
+    "date": (datetime,),
+    "null": (type(None),),
+    "int": (int,),
+    "long": (int,),
+    "number": (int, float),
+}
+
+
+def _rank(value):
+    for kind, rank in _TYPE_RANK:
+        if isinstance(value, kind):
+            return rank
+    return 10
+
+
+def sort_key(value):
+    """Key that orders mixed values the way MongoDB does."""
+    if value is _ABSENT:
+        return (1, 0)
+    if isinstance(value, dict):
+        return (4, [(k, sort_key(v)) for k, v in value.items()])
+    if isinstance(value, list):
+        return (5, [sort_key(v) for v in value])
+    if value is None:
+        return (1, 0)
+    return (_rank(value), value)
+
+
+def get_path(doc, path):
+    """Value at a dotted path, or ``_ABSENT``."""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _ABSENT
+    return value
+
+
+def _compare(value, target, op):
+    if value is _ABSENT or _rank(value) != _rank(target):
+        return False
+    if op == "$gt":
+        return value > target
+    if op == "$gte":
+        return value >= target
+    if op == "$lt":
+        return value < target
+    return value <= target
+
+
+def _equals(value, target):
+    if value is _ABSENT:
+        return target is None
+    if isinstance(value, list) and not isinstance(target, list):
+        return any(_equals(item, target) for item in value)
+    return _rank(value) == _rank(target) and value == target
+
+
+def _match_condition(value, condition):
+    if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+        return _equals(value, condition)
+
+    for op, target in condition.items():
+        if op == "$eq":
+            ok = _equals(value, target)
+        elif op == "$ne":
+            ok = not _equals(value, target)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            if isinstance(value, list):
+                ok = any(_compare(item, target, op) for item in value)
+            else:
+                ok = _compare(value, target, op)
+        elif op == "$in":
+            ok = any(_equals(value, item) for item in target)
+        elif op == "$nin":
+            ok = not any(_equals(value, item) for item in target)
+        elif op == "$exists":
+            ok = (value is not _ABSENT) == bool(target)
+        elif op == "$type":
+            kinds = _TYPE_NAMES.get(target, ())
+            ok = value is not _ABSENT and isinstance(value, kinds) and not (
+                bool not in kinds and isinstance(value, bool)
+            )
+        else:
+            raise OperationFailure(f"Unsupported query operator {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc, query):
+    """Whether ``doc`` matches the filter ``query``."""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            ok = all(matches(doc, sub) for sub in condition)
+        elif key == "$or":
+            ok = any(matches(doc, sub) for sub in condition)
+        elif key == "$nor":
+            ok = not any(matches(doc, sub) for sub in condition)
+        elif key.startswith("$"):
+            raise OperationFailure(f"Unsupported query operator {key}")
+        else:
+            ok = _match_condition(get_path(doc, key), condition)
+        if not ok:
+            return False
+    return True
+
+
+def _parent(doc, path, create):
+    *parents, field = path.split(".")
+    target = doc
+    for part in parents:
+        child = target.get(part, _ABSENT)
+        if child is _ABSENT:
+            if not create:
+                return None, field
+            child = target[part] = {}
+        if not isinstance(child, dict):
+            raise OperationFailure(f"Cannot traverse non-document field {part!r} in {path!r}")
+        target = child
+    return target, field
+
+
+def apply_update(doc, update, inserting=False):
+    """
+    Apply ``update`` to ``doc`` in place. An update without operators is a
+    replacement document. Returns whether the document changed.
+    """
+    if not any(key.startswith("$") for key in update):
+        replacement = copy.deepcopy(update)
+        replacement["_id"] = doc.get("_id", replacement.get("_id"))
+        changed = replacement != doc
+        doc.clear()
+        doc.update(replacement)
+        return changed
+
+    before = copy.deepcopy(doc)
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            if path == "_id" and op != "$setOnInsert" and doc.get("_id", value) != value:
+                raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'")
+            target, field = _parent(doc, path, create=op != "$unset")
+            if op in ("$set", "$setOnInsert"):
+                target[field] = copy.deepcopy(value)
+            elif op == "$unset":
+                if target is not None:
+                    target.pop(field, None)
+            elif op == "$inc":
+                current = target.get(field, 0)
+                if not isinstance(current, (int, float)) or isinstance(current, bool):
+                    raise OperationFailure(f"Cannot apply $inc to a value of non-numeric type at {path!r}")
+                target[field] = current + value
+            elif op in ("$min", "$max"):
+                current = target.get(field, _ABSENT)
+                if current is _ABSENT or (
+                    sort_key(value) < sort_key(current) if op == "$min" else sort_key(value) > sort_key(current)
+                ):
+                    target[field] = copy.deepcopy(value)
+            else:
+                raise OperationFailure(f"Unsupported update operator {op}")
+    return doc != before
+
+
+def upsert_seed(query):
+    """The document an upsert starts from: the filter's equality conditions."""
+    doc = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if "$eq" not in condition:
+                continue
+            condition = condition["$eq"]
+        target, field = _parent(doc, key, create=True)
+        target[field] = copy.deepcopy(condition)
+    return doc
+
+
+def project(doc, projection):
+    """Apply an inclusion or exclusion projection to a copy of ``doc``."""
+    if doc is None:
+        return None
+    if not projection:
+        return copy.deepcopy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+
+    include_id = projection.get("_id", 1)
+    fields = {path: flag for path, flag in projection.items() if path != "_id"}
+
+    if fields and all(flag for flag in fields.values()):
+        result = {}
+        for path in fields:
+            value = get_path(doc, path)
+            if value is _ABSENT:
+                continue
+            target, field = _parent(result, path, create=True)
+            target[field] = copy.deepcopy(value)
+    else:
+        result = copy.deepcopy(doc)
+        for path in fields:
+            target, field = _parent(result, path, create=False)
+            if target is not None:
+                target.pop(field, None)
+
+    if include_id and "_id" in doc:
+        result["_id"] = doc["_id"]
+    else:
+        result.pop("_id", None)
+    return result
+
+
+def normalize_sort(key_or_list, direction=None):
+    """Turn ``sort("balance", -1)`` / ``sort([("balance", -1)])`` into a list of pairs."""
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+def sort_documents(docs, sort):
+    """Sort documents in place by a list of ``(field, direction)`` pairs."""
+    # Stable sorts applied from the least to the most significant key
+    for field, direction in reversed(sort):
+        docs.sort(key=lambda doc: sort_key(get_path(doc, field)), reverse=direction < 0)
+    return docs
+
+
+def new_id():
+    return ObjectId()
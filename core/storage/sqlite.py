@@ -0,0 +1,100 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import bson
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from core.storage.base import DocumentCollection
+
+
+def _key(_id):
+    # BSON-encode the id so 1 and "1" stay distinct keys, as in MongoDB
+    return bson.encode({"_id": _id})
+
+
+class SQLiteCollection(DocumentCollection):
+    """A collection stored as BSON documents in one SQLite table, keyed by ``_id``."""
+
+    def __init__(self, backend, name):
+        super().__init__(name)
+        self.backend = backend
+        self.table = '"' + name.replace('"', '""') + '"'
+        self.backend.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key BLOB PRIMARY KEY, doc BLOB NOT NULL)")
+        self.backend.conn.commit()
+
+    def _get(self, _id):
+        row = self.backend.conn.execute(f"SELECT doc FROM {self.table} WHERE key = ?", (_key(_id),)).fetchone()
+        return bson.decode(row[0]) if row else None
+
+    def _scan(self):
+        return [bson.decode(row[0]) for row in self.backend.conn.execute(f"SELECT doc FROM {self.table}")]
+
+    def _put(self, doc):
+        self.backend.conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, doc) VALUES (?, ?)", (_key(doc["_id"]), bson.encode(doc))
+        )
+
+    def _remove(self, _id):
+        self.backend.conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (_key(_id),))
+
+    async def _run(self, operation, *args):
+        try:
+            return await self.backend.run(operation, *args)
+        except BulkWriteError:
+            # Committed with the operations that succeeded, like the index maps
+            raise
+        except Exception:
+            # The transaction was rolled back; the unique index maps may hold its writes
+            if self._unique:
+                await self.backend.run(self._rebuild_unique_keys)
+            raise
+
+
+class SQLiteBackend:
+    """
+    Single-file storage for a small deployment without MongoDB.
+
+    All statements run on one worker thread, so the event loop never blocks
+    on disk I/O and operations are serialized: each one runs in its own
+    transaction and is atomic like a single-document MongoDB write, except
+    that a bulk write or insert_many keeps the operations that succeeded
+    when it raises ``BulkWriteError``, as MongoDB does. Queries
+    other than lookups by ``_id`` scan the table. SQLite errors surface as
+    pymongo's ``DuplicateKeyError`` or ``OperationFailure``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._collections = {}
+
+    def collection(self, database, name):
+        key = f"{database}.{name}"
+        if key not in self._collections:
+            self._collections[key] = SQLiteCollection(self, key)
+        return self._collections[key]
+
+    def _transaction(self, operation, args):
+        # Callers handle pymongo errors (see base.py), so a lock or constraint
+        # failure must not escape as a raw sqlite3 error
+        try:
+            with self.conn:
+                try:
+                    return operation(*args)
+                except BulkWriteError:
+                    # Callers such as Economy.bulk_adjust treat only writeErrors as not applied
+                    self.conn.commit()
+                    raise
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e)) from e
+        except sqlite3.Error as e:
+            raise OperationFailure(f"SQLite error: {e}") from e
+
+    async def run(self, operation, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._transaction, operation, args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.conn.close()
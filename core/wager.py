@@ -0,0 +1,167 @@
+import time
+import discord
+from core.games import Outcome
+
+EMOJI = "<:arcadiacoin:1378656679704395796>"
+
+
+class WagerMetrics:
+    """Per-game counters, shown by ``$gamestats``."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rounds = 0
+        self.wins = 0
+        self.rejected = 0  # bets the player could not afford (or failed ``require``)
+        self.wagered = 0
+        self.paid_out = 0
+        self.db_ops = 0
+        self.db_seconds = 0.0
+
+    def record(self, outcome):
+        self.rounds += 1
+        self.wins += outcome.won
+        self.wagered += outcome.stake
+        self.paid_out += outcome.payout
+
+    @property
+    def return_to_player(self):
+        """Share of wagered coins paid back (1.0 is break-even for players)."""
+        return self.paid_out / self.wagered if self.wagered else 0.0
+
+
+# Game name -> WagerMetrics, for every WagerGame cog loaded
+WAGER_METRICS = {}
+
+
+class Responder:
+    """Replies to a prefix command's Context or a slash command's Interaction through one interface."""
+
+    def __init__(self, target):
+        self.target = target
+        self.is_slash = isinstance(target, discord.Interaction)
+        self.user = target.user if self.is_slash else target.author
+        self.channel = target.channel
+
+    async def defer(self):
+        if self.is_slash and not self.target.response.is_done():
+            await self.target.response.defer()
+
+    async def send(self, content=None, embed=None, view=None, ephemeral=False, file=None):
+        """Send a message and return it, so it can be edited later."""
+        kwargs = {key: value for key, value in (("embed", embed), ("view", view), ("file", file)) if value is not None}
+        if not self.is_slash:
+            return await self.target.send(content, **kwargs)
+        if not self.target.response.is_done():
+            await self.target.response.send_message(content, ephemeral=ephemeral, **kwargs)
+            return await self.target.original_response()
+        return await self.target.followup.send(content, ephemeral=ephemeral, **kwargs)
+
+
+class WagerGame:
+    """
+    Bet pipeline shared by the game cogs: validate, resolve, settle, respond.
+
+    A game cog mixes this in, calls :meth:`setup_wager` and implements
+    :meth:`resolve` (pure rules from core/games.py) and :meth:`present`.
+    :meth:`play` then runs a round with exactly one database write: the
+    outcome is known before anything is written, so the bet is debited and
+    the payout credited by a single guarded ``Economy.charge``. The player's
+    lock is held for the whole round, animation included.
+
+    Games whose outcome depends on later input (blackjack) use
+    :meth:`open_wager` to debit the stake and :meth:`settle` (or
+    :meth:`settle_many`, for a table of players) to pay out.
+    """
+
+    game_name = "game"
+    require = None  # extra charge() conditions, e.g. owning a chicken
+
+    def setup_wager(self, bot):
+        self.economy = bot.economy
+        self.user_locks = bot.user_locks
+        self.metrics = WAGER_METRICS.setdefault(self.game_name, WagerMetrics(self.game_name))
+
+    def validate(self, amount, **options):
+        """An error message for a bet that cannot be played, or ``None``."""
+        if amount <= 0:
+            return "❌ Bet must be greater than ₱0."
+        return None
+
+    def resolve(self, amount, **options):
+        raise NotImplementedError
+
+    async def present(self, responder, outcome, balance):
+        raise NotImplementedError
+
+    async def reject(self, responder, outcome):
+        """Tell the player why the bet was refused. Only runs on that path, so it may read more."""
+        balance = await self.economy.get_balance(responder.user.id)
+        await responder.send(
+            f"❌ Not enough coins! You bet ₱{outcome.stake:,} but your balance is ₱{balance:,} {EMOJI}",
+            ephemeral=True
+        )
+
+    async def _charge(self, user_id, cost, delta=None, inc=None):
+        started = time.perf_counter()
+        try:
+            return await self.economy.charge(user_id, cost, delta=delta, inc=inc, require=self.require)
+        finally:
+            self.metrics.db_ops += 1
+            self.metrics.db_seconds += time.perf_counter() - started
+
+    async def play(self, target, amount, **options):
+        responder = Responder(target)
+        error = self.validate(amount, **options)
+        if error:
+            return await responder.send(error, ephemeral=True)
+
+        await responder.defer()
+        async with self.user_locks.hold(responder.user.id):
+            outcome = self.resolve(amount, **options)
+            user_data = await self._charge(responder.user.id, outcome.stake, delta=outcome.net, inc=outcome.inc)
+            if user_data is None:
+                self.metrics.rejected += 1
+                return await self.reject(responder, outcome)
+
+            self.metrics.record(outcome)
+            await self.present(responder, outcome, user_data)
+
+    async def open_wager(self, responder, amount):
+        """Debit ``amount`` for a game settled later. Returns False (and tells the player) if it was refused."""
+        error = self.validate(amount)
+        if error:
+            await responder.send(error, ephemeral=True)
+            return False
+        if await self._charge(responder.user.id, amount) is None:
+            self.metrics.rejected += 1
+            await self.reject(responder, Outcome(amount, 0))
+            return False
+        return True
+
+    async def settle(self, user_id, outcome):
+        """Pay out a game opened with :meth:`open_wager`; its stake is already debited."""
+        if outcome.payout:
+            started = time.perf_counter()
+            await self.economy.credit(user_id, outcome.payout)
+            self.metrics.db_ops += 1
+            self.metrics.db_seconds += time.perf_counter() - started
+        self.metrics.record(outcome)
+
+    async def settle_many(self, outcomes):
+        """
+        Pay out ``{user id: Outcome}`` for games opened with :meth:`open_wager`,
+        in one bulk write. Returns the set of user ids whose payout was not
+        applied, for the caller to retry or refund.
+        """
+        payouts = {user_id: outcome.payout for user_id, outcome in outcomes.items() if outcome.payout}
+        failed = set()
+        if payouts:
+            started = time.perf_counter()
+            failed = set(payouts).difference(await self.economy.bulk_adjust(payouts))
+            self.metrics.db_ops += 1
+            self.metrics.db_seconds += time.perf_counter() - started
+        for user_id, outcome in outcomes.items():
+            if user_id not in failed:
+                self.metrics.record(outcome)
+        return failed
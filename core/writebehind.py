@@ -0,0 +1,142 @@
+import asyncio
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+class BalanceBuffer:
+    """
+    Write-behind buffer for blind ``$inc`` updates on ``hxhbot.users``.
+
+    Increments are merged per user id in memory and written with one
+    unordered ``bulk_write`` every ``interval`` seconds, or as soon as
+    ``max_ops`` increments have been queued. Ten payouts to the same user
+    between flushes cost one write instead of ten.
+    """
+
+    def __init__(self, users, cache=None, interval=0.05, max_ops=500):
+        self.users = users
+        self.cache = cache
+        self.interval = interval
+        self.max_ops = max_ops
+
+        self.pending = {}  # user id -> {field: delta}
+        self.inflight = {}  # user id -> {field: delta} being written, for users the cache could not absorb
+        self.queued_ops = 0
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+
+        # Counters, so the saving is visible
+        self.ops_buffered = 0
+        self.bulk_writes = 0
+        self.docs_written = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, user_id, inc):
+        self._merge(user_id, inc)
+        self.queued_ops += 1
+        self.ops_buffered += 1
+        if self.queued_ops >= self.max_ops:
+            self._wake.set()
+
+    def peek(self, user_id):
+        """Pending (and uncached in-flight) increments for a user, without removing them."""
+        pending, inflight = self.pending.get(user_id), self.inflight.get(user_id)
+        if not inflight:
+            return pending or {}
+        merged = dict(inflight)
+        for field, delta in (pending or {}).items():
+            merged[field] = merged.get(field, 0) + delta
+        return merged
+
+    def take(self, user_id):
+        """Remove and return a user's pending increments, e.g. to fold them into another write."""
+        return self.pending.pop(user_id, {})
+
+    def restore(self, user_id, inc):
+        """Put back increments taken with :meth:`take` when the write they were folded into failed."""
+        if inc:
+            self._merge(user_id, inc)
+
+    def _merge(self, user_id, inc):
+        entry = self.pending.setdefault(user_id, {})
+        for field, delta in inc.items():
+            entry[field] = entry.get(field, 0) + delta
+
+    def _requeue(self, user_id, inc):
+        self._merge(user_id, inc)
+        if self.cache is not None:
+            self.cache.invalidate(user_id)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            batch, self.pending = self.pending, {}
+            self.queued_ops = 0
+            user_ids = list(batch)
+            ops = [UpdateOne({"_id": user_id}, {"$inc": batch[user_id]}, upsert=True) for user_id in user_ids]
+
+            # Move the increments into the cached documents before awaiting, so
+            # reads keep seeing them while they are no longer pending. Increments
+            # of uncached users stay visible through peek() instead, and their
+            # cache fills are fenced: a read during the write may still return
+            # the old document, which must not be cached
+            if self.cache is None:
+                self.inflight = batch
+            else:
+                self.cache.fence(user_ids)
+                self.inflight = {
+                    user_id: batch[user_id] for user_id in user_ids
+                    if not self.cache.patch(user_id, {"$inc": batch[user_id]}, upsert=True)
+                }
+
+            try:
+                result = await self.users.bulk_write(ops, ordered=False)
+                self.docs_written += result.upserted_count + result.modified_count
+            except BulkWriteError as e:
+                # Unordered: everything except the reported failures was applied
+                failed = [error["index"] for error in e.details.get("writeErrors", [])]
+                print(f"[BalanceBuffer] {len(failed)} of {len(ops)} updates failed, requeueing them.")
+                for index in failed:
+                    self._requeue(user_ids[index], batch[user_ids[index]])
+            except asyncio.CancelledError:
+                # Cancelled mid-write (e.g. by stop()): keep the batch for the next flush
+                for user_id, inc in batch.items():
+                    self._requeue(user_id, inc)
+                raise
+            except Exception as e:
+                print(f"[BalanceBuffer] Flush failed, requeueing {len(ops)} updates: {e}")
+                for user_id, inc in batch.items():
+                    self._requeue(user_id, inc)
+            finally:
+                self.inflight = {}
+                if self.cache is not None:
+                    self.cache.unfence(user_ids)
+                self.bulk_writes += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[BalanceBuffer] Unexpected flush error: {e}")
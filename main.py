@@ -4,7 +4,16 @@ import os
 import asyncio
 from keep_alive import keep_alive # Assuming keep_alive.py is in the same directory
 # Make sure these are defined in your config.py
-from config import BOT_TOKEN, VANITY_LINK, ROLE_ID, VANITY_LOG_CHANNEL_ID, VANITY_IMAGE_URL
+from config import BOT_TOKEN, MONGO_URL, VANITY_LINK, ROLE_ID, VANITY_LOG_CHANNEL_ID, VANITY_IMAGE_URL, USER_SCHEMA_COMPAT
+from config import STORAGE_BACKEND, SQLITE_PATH, ANIMATION_MODE, ANIMATION_BASE_URL, ANIMATION_DIR
+from core.database import Database
+from core.economy import Economy
+from core.ledger import Ledger, set_source
+from core.leaderboard import TopBalances
+from core.cooldowns import Cooldowns
+from core.locks import UserLocks
+from core.animation import Animator, AnimationAssets
+from core.indexes import ensure_indexes
 
 # --- 1. Define Intents ---
 intents = discord.Intents.default()
@@ -15,6 +24,18 @@ intents.members = True
 # --- 2. Initialize the Bot ---
 bot = commands.Bot(command_prefix="$", intents=intents) # Prefix is now just "$"
 
+# Attribute ledger entries to the command being run (see core/ledger.py)
+@bot.before_invoke
+async def set_ledger_source(ctx):
+    set_source(f"${ctx.command.qualified_name}", ctx.message.id)
+
+async def ledger_interaction_check(interaction: discord.Interaction) -> bool:
+    if interaction.command is not None:
+        set_source(f"/{interaction.command.qualified_name}", interaction.id)
+    return True
+
+bot.tree.interaction_check = ledger_interaction_check
+
 # --- 3. Bot Events ---
 
 @bot.event
@@ -165,6 +186,26 @@ async def main():
     """
     Main function to load cogs, start keep-alive, and run the bot.
     """
+    # Shared storage connection (MongoDB, SQLite or memory), used by every cog through bot.db
+    bot.db = Database(MONGO_URL, backend=STORAGE_BACKEND, sqlite_path=SQLITE_PATH)
+    bot.economy = Economy(bot.db.users, ledger=Ledger(bot.db.ledger), compat=USER_SCHEMA_COMPAT)
+    bot.economy.start()
+    # Per-user locks the game cogs hold for a whole bet
+    bot.user_locks = UserLocks()
+    # Per-channel budget for game animations (slots, colorgame), or their pre-rendered GIFs
+    assets = None
+    if ANIMATION_MODE in ("file", "url"):
+        assets = AnimationAssets(ANIMATION_DIR, mode=ANIMATION_MODE, base_url=ANIMATION_BASE_URL)
+        print(f"[Animation] {len(assets)} pre-rendered outcomes ({ANIMATION_MODE} mode).")
+    bot.animator = Animator(assets=assets)
+    await ensure_indexes(bot.db)
+    # In-memory sorted balances, kept current by the economy (serves /leaderboard)
+    bot.top_balances = TopBalances(bot.db.users, bot.economy)
+    await bot.top_balances.start()
+    # Running cooldowns, answered from memory (work, daily, rob)
+    bot.cooldowns = Cooldowns(bot.db.users, cache=bot.economy.cache)
+    await bot.cooldowns.start()
+
     # Load all other cogs from /cogs
     for filename in os.listdir("./cogs"):
         if filename.endswith(".py"):
@@ -175,7 +216,14 @@ async def main():
     keep_alive()
     
     # Run the bot with your token
-    await bot.start(BOT_TOKEN)
+    try:
+        await bot.start(BOT_TOKEN)
+    finally:
+        # Write out buffered balance changes before the connection goes away
+        await bot.top_balances.stop()
+        await bot.cooldowns.stop()
+        await bot.economy.close()
+        bot.db.close()
 
 # --- 8. Run the Bot ---
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""
+Pre-render an animated GIF for every slots and colorgame outcome.
+
+Slots has 5³ = 125 outcomes and colorgame 3³ = 27, so each is drawn once
+here instead of being animated with message edits on every play. The GIFs
+and a manifest.json listing them are written to ``--out`` (config's
+ANIMATION_DIR); the bot serves them when ANIMATION_MODE is ``file`` or
+``url`` (see core/animation.py). Outcomes already on disk from the same
+RENDER_VERSION are skipped, and rendering is seeded per outcome, so
+rebuilding produces identical files.
+
+    python -m tools.build_animations                 # render what is missing
+    python -m tools.build_animations --force         # re-render everything
+    python -m tools.build_animations --game slots
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+from PIL import Image, ImageDraw, ImageFont
+from config import ANIMATION_DIR
+from core.animation import SYMBOL_NAMES, animation_name
+from core.games import COLOR_NAMES, SLOT_SYMBOLS
+
+# Bump when the drawing changes, so existing GIFs are re-rendered
+RENDER_VERSION = 1
+
+TILE = 96
+GAP = 12
+WIDTH = 3 * TILE + 4 * GAP
+HEIGHT = TILE + 2 * GAP
+BACKGROUND = (47, 49, 54)
+REEL = (32, 34, 37)
+HIGHLIGHT = (250, 200, 40)
+
+SPIN_FRAME_MS = 80
+SPIN_FRAMES = 6  # frames before the first reel stops
+STOP_FRAMES = 4  # frames between reel stops
+FINAL_FRAME_MS = 5000
+
+COLOR_FILLS = {"green": (67, 181, 129), "yellow": (250, 200, 40), "pink": (240, 110, 170)}
+
+
+def load_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has a single bitmap size
+        return ImageFont.load_default()
+
+
+SEVEN_FONT = load_font(72)
+
+
+# --- Symbols ---
+def draw_slot_symbol(draw, name, x, y):
+    """Draw a slots symbol into the tile whose top-left corner is ``(x, y)``."""
+    cx, cy = x + TILE // 2, y + TILE // 2
+    if name == "cherry":
+        draw.line([(cx - 14, cy + 8), (cx + 4, cy - 28), (cx + 16, cy + 4)], fill=(60, 160, 70), width=4)
+        draw.ellipse([cx - 32, cy, cx - 4, cy + 28], fill=(210, 30, 45))
+        draw.ellipse([cx + 2, cy - 4, cx + 30, cy + 24], fill=(210, 30, 45))
+    elif name == "lemon":
+        draw.ellipse([cx - 34, cy - 22, cx + 34, cy + 22], fill=(245, 215, 50), outline=(200, 170, 20), width=3)
+    elif name == "diamond":
+        draw.polygon([(cx - 32, cy - 10), (cx - 16, cy - 28), (cx + 16, cy - 28), (cx + 32, cy - 10), (cx, cy + 30)],
+                     fill=(90, 200, 240), outline=(40, 140, 200))
+        draw.line([(cx - 32, cy - 10), (cx + 32, cy - 10)], fill=(40, 140, 200), width=2)
+    elif name == "clover":
+        for dx, dy in ((0, -15), (0, 15), (-15, 0), (15, 0)):
+            draw.ellipse([cx + dx - 14, cy + dy - 14, cx + dx + 14, cy + dy + 14], fill=(60, 170, 80))
+        draw.line([(cx, cy), (cx + 10, cy + 34)], fill=(40, 120, 55), width=4)
+    elif name == "seven":
+        draw.text((cx, cy), "7", font=SEVEN_FONT, fill=(220, 35, 45), anchor="mm")
+
+
+def draw_color_symbol(draw, name, x, y):
+    draw.rounded_rectangle([x + 14, y + 14, x + TILE - 14, y + TILE - 14], radius=14, fill=COLOR_FILLS[name])
+
+
+# game -> (outcome symbols, function drawing one into a tile)
+GAMES = {
+    "slots": (SLOT_SYMBOLS, draw_slot_symbol),
+    "colorgame": (COLOR_NAMES, draw_color_symbol),
+}
+
+
+# --- Frames ---
+def render_frame(draw_symbol, names, highlight=()):
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    for i, name in enumerate(names):
+        x, y = GAP + i * (TILE + GAP), GAP
+        outline = HIGHLIGHT if i in highlight else REEL
+        draw.rounded_rectangle([x, y, x + TILE, y + TILE], radius=12, fill=REEL, outline=outline, width=4)
+        draw_symbol(draw, name, x, y)
+    return image
+
+
+def winning_reels(names):
+    """Reels to outline on the last frame: the matching symbols of a slots pair or jackpot."""
+    return {i for i, name in enumerate(names) if names.count(name) > 1}
+
+
+def render_outcome(game, symbols):
+    """Frames and durations (ms) of one outcome: all reels spinning, then stopping left to right."""
+    choices, draw_symbol = GAMES[game]
+    names = [SYMBOL_NAMES.get(symbol, symbol) for symbol in symbols]
+    pool = [SYMBOL_NAMES.get(symbol, symbol) for symbol in choices]
+    rng = random.Random(animation_name(game, symbols))
+
+    frames, durations = [], []
+    for step in range(SPIN_FRAMES + 2 * STOP_FRAMES):
+        stopped = 0 if step < SPIN_FRAMES else 1 + (step - SPIN_FRAMES) // STOP_FRAMES
+        shown = names[:stopped] + [rng.choice(pool) for _ in range(3 - stopped)]
+        frames.append(render_frame(draw_symbol, shown))
+        durations.append(SPIN_FRAME_MS)
+
+    highlight = winning_reels(names) if game == "slots" else ()
+    frames.append(render_frame(draw_symbol, names, highlight))
+    durations.append(FINAL_FRAME_MS)
+    return frames, durations
+
+
+def build(out, games, force=False):
+    manifest_path = os.path.join(out, "manifest.json")
+    manifest = {"version": RENDER_VERSION, "files": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    if manifest.get("version") != RENDER_VERSION:
+        manifest["files"], force = [], True
+    existing = set(manifest["files"])
+
+    rendered = skipped = 0
+    for game in games:
+        choices, _ = GAMES[game]
+        os.makedirs(os.path.join(out, game), exist_ok=True)
+        for symbols in itertools.product(choices, repeat=3):
+            name = animation_name(game, symbols)
+            path = os.path.join(out, name)
+            if not force and name in existing and os.path.exists(path):
+                skipped += 1
+                continue
+            frames, durations = render_outcome(game, symbols)
+            # No loop count: the spin plays once and stays on the result
+            frames[0].save(path, save_all=True, append_images=frames[1:], duration=durations, optimize=True)
+            existing.add(name)
+            rendered += 1
+
+    with open(manifest_path, "w") as f:
+        json.dump({"version": RENDER_VERSION, "files": sorted(existing)}, f, indent=2)
+        f.write("\n")
+    print(f"[Animation] {rendered} rendered, {skipped} already built; {len(existing)} outcomes in {out}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=ANIMATION_DIR)
+    parser.add_argument("--game", choices=sorted(GAMES), action="append", help="Only these games (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Re-render outcomes that are already built")
+    args = parser.parse_args()
+    build(args.out, args.game or sorted(GAMES), force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure each wager game's expected value and fail if it moved.
+
+Every game in core/simulation.py is played for ``--rounds`` vectorized
+rounds and compared with tools/house_edge_baseline.json; the script exits
+with status 1 if any game's EV differs from its baseline by more than
+``--tolerance`` (coins per coin staked). A smaller run through the real
+rule functions in core/games.py checks that the vectorized copy still
+matches them.
+
+    python -m tools.house_edge                  # check against the baseline
+    python -m tools.house_edge --update         # accept the current EVs as the new baseline
+    python -m tools.house_edge --game slots --rounds 20000000
+"""
+import argparse
+import json
+import os
+from core.simulation import DEFAULT_BET, SIMULATORS, scalar_returns, simulate, summarize
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "house_edge_baseline.json")
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--game", choices=sorted(SIMULATORS), action="append", help="Only these games (repeatable)")
+    parser.add_argument("--rounds", type=int, default=5_000_000)
+    parser.add_argument("--bet", type=int, default=DEFAULT_BET)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.005, help="Allowed EV change from the baseline")
+    parser.add_argument("--crosscheck-rounds", type=int, default=100_000,
+                        help="Rounds played through core/games.py to validate the simulator (0 to skip)")
+    parser.add_argument("--update", action="store_true", help="Write the measured EVs as the new baseline")
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    measured, failures = {}, []
+    print(f"{'game':<10} {'EV':>9} {'edge':>8} {'variance':>9} {'baseline':>9} {'rounds/s':>12}  check")
+    for game in args.game or sorted(SIMULATORS):
+        result = simulate(game, args.rounds, bet=args.bet, seed=args.seed)
+        measured[game] = round(result["ev"], 4) + 0.0  # no "-0.0" in the baseline
+
+        checks = []
+        expected = baseline.get(game)
+        if expected is not None and abs(result["ev"] - expected) > args.tolerance:
+            checks.append(f"EV moved {result['ev'] - expected:+.4f}")
+
+        if args.crosscheck_rounds:
+            scalar = summarize(scalar_returns(game, args.crosscheck_rounds, bet=args.bet, seed=args.seed))
+            # Two independent estimates; four combined standard errors apart is not noise
+            allowed = 4 * (scalar["std_error"] ** 2 + result["std_error"] ** 2) ** 0.5
+            if abs(scalar["ev"] - result["ev"]) > allowed:
+                checks.append(f"simulator disagrees with core/games.py ({scalar['ev']:+.4f})")
+
+        if checks:
+            failures.append(game)
+        print(
+            f"{game:<10} {result['ev']:>+9.4f} {result['house_edge']:>8.2%} {result['variance']:>9.3f} "
+            f"{'—' if expected is None else format(expected, '+.4f'):>9} {result['rounds_per_second']:>12,.0f}  "
+            f"{'; '.join(checks) or 'ok'}"
+        )
+
+    if args.update:
+        baseline.update(measured)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[HouseEdge] Baseline written to {BASELINE_PATH}.")
+    elif failures:
+        print(f"[HouseEdge] {len(failures)} game(s) failed: {', '.join(failures)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Rebuild or verify ``hxhbot.users`` balances from ``hxhbot.ledger``.
+
+A user's balance is their latest opening entry plus every delta recorded
+after it. Both collections are streamed in user id order and merged, so
+memory use does not grow with the number of users.
+
+Legacy string-id documents are left out until they are merged into their
+int64 document; the merge adds their balance as a ``migration`` entry.
+
+    python -m tools.ledger snapshot            # once, with the bot stopped: record opening balances
+    python -m tools.ledger verify [--user ID]  # report users whose balance differs from the ledger
+    python -m tools.ledger rebuild [--user ID] # set balances to the ledger's values
+"""
+import argparse
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne
+from config import MONGO_URL
+
+OPENING = "ledger.opening"
+
+
+def ledger_balances(ledger, user_id=None):
+    """Yield ``(user id, balance)`` per user in the ledger, in user id order."""
+    query = {} if user_id is None else {"u": user_id}
+    current, balance = None, 0
+    for entry in ledger.find(query, {"u": 1, "d": 1, "s": 1}, sort=[("u", 1), ("t", 1)]):
+        if entry["u"] != current:
+            if current is not None:
+                yield current, balance
+            current, balance = entry["u"], 0
+        balance = entry["d"] if entry["s"] == OPENING else balance + entry["d"]
+    if current is not None:
+        yield current, balance
+
+
+def stored_balances(users, user_id=None):
+    """Yield ``(user id, balance)`` per user document, in user id order."""
+    query = {"_id": {"$type": "number"}} if user_id is None else {"_id": user_id}
+    for doc in users.find(query, {"balance": 1}, sort=[("_id", 1)]):
+        yield doc["_id"], int(doc.get("balance", 0))
+
+
+def compare(users, ledger, user_id=None):
+    """Yield ``(user id, stored balance, ledger balance)`` for every user, merging both streams."""
+    stored, rebuilt = stored_balances(users, user_id), ledger_balances(ledger, user_id)
+    a, b = next(stored, None), next(rebuilt, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            yield a[0], a[1], 0
+            a = next(stored, None)
+        elif a is None or b[0] < a[0]:
+            yield b[0], None, b[1]
+            b = next(rebuilt, None)
+        else:
+            yield a[0], a[1], b[1]
+            a, b = next(stored, None), next(rebuilt, None)
+
+
+def snapshot(users, ledger, batch_size):
+    now = datetime.utcnow()
+    batch, written = [], 0
+    for user_id, balance in stored_balances(users):
+        batch.append({"u": user_id, "d": balance, "s": OPENING, "r": None, "t": now})
+        if len(batch) >= batch_size:
+            ledger.insert_many(batch, ordered=False)
+            written += len(batch)
+            batch = []
+            print(f"[Ledger] {written:,} opening balances recorded")
+    if batch:
+        ledger.insert_many(batch, ordered=False)
+        written += len(batch)
+    print(f"[Ledger] Snapshot done: {written:,} opening balances recorded.")
+
+
+def verify(users, ledger, user_id):
+    checked = mismatched = 0
+    for uid, stored, rebuilt in compare(users, ledger, user_id):
+        checked += 1
+        if stored != rebuilt:
+            mismatched += 1
+            print(f"[Ledger] {uid}: stored {stored if stored is not None else 'missing'}, ledger {rebuilt} "
+                  f"({(stored or 0) - rebuilt:+,})")
+    print(f"[Ledger] Verified {checked:,} user(s): {mismatched:,} mismatch(es).")
+    return mismatched
+
+
+def rebuild(users, ledger, user_id, batch_size):
+    ops, fixed = [], 0
+    for uid, stored, rebuilt in compare(users, ledger, user_id):
+        if stored == rebuilt:
+            continue
+        ops.append(UpdateOne({"_id": uid}, {"$set": {"balance": rebuilt}}, upsert=True))
+        if len(ops) >= batch_size:
+            users.bulk_write(ops, ordered=False)
+            fixed += len(ops)
+            ops = []
+            print(f"[Ledger] {fixed:,} balances rebuilt")
+    if ops:
+        users.bulk_write(ops, ordered=False)
+        fixed += len(ops)
+    print(f"[Ledger] Rebuild done: {fixed:,} balance(s) corrected.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", choices=["snapshot", "verify", "rebuild"])
+    parser.add_argument("--user", type=int, help="Only this user id")
+    parser.add_argument("--mongo-url", default=MONGO_URL)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_url)
+    users, ledger = client["hxhbot"]["users"], client["hxhbot"]["ledger"]
+    try:
+        if args.action == "snapshot":
+            snapshot(users, ledger, args.batch_size)
+        elif args.action == "verify":
+            raise SystemExit(1 if verify(users, ledger, args.user) else 0)
+        else:
+            rebuild(users, ledger, args.user, args.batch_size)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
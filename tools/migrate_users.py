@@ -0,0 +1,133 @@
+"""
+Migrate ``hxhbot.users`` to int64 ids and a single ``cooldowns`` subdocument.
+
+Streams every document still keyed by a string id, in ``_id`` order, and
+rewrites it in ``bulk_write`` chunks. The last migrated ``_id`` is written to
+a checkpoint file after each chunk, so an interrupted run picks up where it
+stopped. Safe to run while the bot is up with ``USER_SCHEMA_COMPAT = True``:
+both sides merge through ``core.schema.migration_update`` and a document is
+never merged twice. Each merged balance is recorded in ``hxhbot.ledger`` as
+a ``migration`` entry, so ``tools/ledger.py verify`` still balances.
+
+    python -m tools.migrate_users [--batch-size 500] [--dry-run]
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from pymongo import DeleteOne, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+from config import MONGO_URL
+from core.ledger import MIGRATION
+from core.schema import migration_filter, migration_update, normalize_user
+
+DUPLICATE_KEY = 11000
+
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read().strip() or None
+    return None
+
+
+def save_checkpoint(path, last_id):
+    with open(path, "w") as f:
+        f.write(last_id)
+
+
+def migrate_batch(users, ledger, batch):
+    """Merge a batch of legacy documents, record their balances, then delete the ones that made it across."""
+    merged = set(range(len(batch)))
+    applied = set(merged)  # merged by this run, not earlier by the bot
+    try:
+        users.bulk_write(
+            [UpdateOne(migration_filter(doc), migration_update(doc), upsert=True) for doc in batch],
+            ordered=False
+        )
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            applied.discard(error["index"])
+            # A duplicate key means the int64 document was already merged
+            if error.get("code") != DUPLICATE_KEY:
+                merged.discard(error["index"])
+                print(f"[Migrate] Could not migrate {batch[error['index']]['_id']}: {error.get('errmsg')}")
+
+    now = datetime.utcnow()
+    entries = []
+    for i in sorted(applied):
+        balance = int(normalize_user(batch[i]).get("balance", 0))
+        if balance:
+            entries.append({"u": int(batch[i]["_id"]), "d": balance, "s": MIGRATION, "r": None, "t": now})
+    if entries:
+        ledger.insert_many(entries, ordered=False)
+
+    if merged:
+        users.bulk_write([DeleteOne({"_id": batch[i]["_id"]}) for i in sorted(merged)], ordered=False)
+    return len(merged), len(batch) - len(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=MONGO_URL)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--checkpoint", default=".migrate_users.checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Count and validate documents without writing")
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_url)
+    users, ledger = client["hxhbot"]["users"], client["hxhbot"]["ledger"]
+
+    query = {"_id": {"$type": "string"}}
+    last_id = None if args.dry_run else load_checkpoint(args.checkpoint)
+    if last_id is not None:
+        query["_id"]["$gt"] = last_id
+        print(f"[Migrate] Resuming after _id {last_id}")
+
+    total = users.count_documents(query)
+    print(f"[Migrate] {total:,} legacy user document(s) to migrate")
+
+    migrated = failed = skipped = seen = 0
+    started = time.monotonic()
+    batch = []
+
+    def flush():
+        nonlocal migrated, failed
+        if not args.dry_run:
+            ok, bad = migrate_batch(users, ledger, batch)
+            migrated += ok
+            failed += bad
+            save_checkpoint(args.checkpoint, batch[-1]["_id"])
+        else:
+            for doc in batch:
+                migration_update(doc)
+            migrated += len(batch)
+        rate = seen / max(time.monotonic() - started, 1e-6)
+        print(f"[Migrate] {seen:,}/{total:,} scanned, {migrated:,} migrated, {skipped:,} skipped ({rate:,.0f} docs/s)")
+        batch.clear()
+
+    cursor = users.find(query, sort=[("_id", 1)], batch_size=args.batch_size, no_cursor_timeout=True)
+    try:
+        for doc in cursor:
+            seen += 1
+            if not doc["_id"].isdigit():
+                skipped += 1
+                print(f"[Migrate] Skipping non-numeric _id {doc['_id']!r}")
+                continue
+            batch.append(doc)
+            if len(batch) >= args.batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        cursor.close()
+        client.close()
+
+    print(
+        f"[Migrate] Done{' (dry run)' if args.dry_run else ''}: "
+        f"{migrated:,} migrated, {failed:,} failed, {skipped:,} skipped."
+    )
+
+
+if __name__ == "__main__":
+    main()